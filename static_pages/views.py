@@ -1,5 +1,7 @@
 from django.views.generic.base import TemplateView
 
+from tasks.prerender import PrerenderedMixin
 
-class About(TemplateView):
+
+class About(PrerenderedMixin, TemplateView):
     template_name = 'static_pages/about.html'
@@ -1,5 +1,187 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import InvalidPage
+from django.template.response import TemplateResponse
+from django.utils import timezone
 
+from . import cache
 from .models import Task
+from .pagination import KeysetPaginator
+from .sqlite import write_transaction
+from .thumbnails import delete_unused_images
+from .utils import QUERY_BATCH
 
-admin.site.register(Task)
+# Parámetro de la URL con el cursor de la página
+CURSOR_VAR = 'cursor'
+# Las tareas filtradas o buscadas se cuentan como mucho hasta aquí
+FILTERED_COUNT_LIMIT = 10000
+
+
+class TaskChangeList(ChangeList):
+    """Lista del admin para tablas con millones de tareas.
+
+    Pagina por cursor sobre la clave primaria (como TaskList) en lugar
+    de OFFSET, y muestra el número de tareas del contador de TaskStat
+    (Task.objects.total_count()) en lugar de COUNT(*).
+    """
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_queryset(self, request):
+        # Solo las columnas de list_display: text e image no se cargan
+        return super().get_queryset(request).only(
+            *self.model_admin.list_fields)
+
+    def get_results(self, request):
+        paginator = KeysetPaginator(self.queryset, self.list_per_page)
+        try:
+            page = paginator.page(request.GET.get(CURSOR_VAR))
+        except InvalidPage:
+            raise IncorrectLookupParameters
+        # Los filtros, la búsqueda y el resto de enlaces empiezan de nuevo
+        # en la primera página
+        self.params.pop(CURSOR_VAR, None)
+        full_result_count = Task.objects.total_count()
+        if self.queryset.query.where:
+            result_count = (self.queryset.order_by()
+                            [:FILTERED_COUNT_LIMIT].count())
+        else:
+            result_count = full_result_count
+
+        self.result_count = result_count
+        self.full_result_count = full_result_count
+        self.show_full_result_count = True
+        self.show_admin_actions = True
+        self.result_list = page.object_list
+        self.can_show_all = False
+        self.multi_page = page.has_other_pages()
+        self.paginator = paginator
+        self.page = page
+
+    def next_url(self):
+        return self.get_query_string({CURSOR_VAR: self.page.next_cursor})
+
+    def previous_url(self):
+        return self.get_query_string({CURSOR_VAR: self.page.previous_cursor})
+
+
+class HasImageFilter(admin.SimpleListFilter):
+    """Filtro por imagen; usa el índice de la columna image."""
+    title = 'imagen'
+    parameter_name = 'has_image'
+
+    def lookups(self, request, model_admin):
+        return (('yes', 'Con imagen'), ('no', 'Sin imagen'))
+
+    def queryset(self, request, queryset):
+        if self.value() == 'yes':
+            return queryset.filter(image__gt='')
+        if self.value() == 'no':
+            return queryset.exclude(image__gt='')
+        return queryset
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('title', 'slug', 'updated_at')
+    list_fields = ('id', 'title', 'slug', 'updated_at')
+    # updated_at tiene índice; el filtro por fechas no consulta la tabla
+    list_filter = ('updated_at', HasImageFilter)
+    # Se busca con el índice FTS5 (ver get_search_results())
+    search_fields = ('title', 'text')
+    # El orden es siempre el de la paginación por cursor
+    sortable_by = ()
+    actions = ['delete_tasks', 'remove_images']
+
+    def get_changelist(self, request, **kwargs):
+        return TaskChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.matching(search_term), False
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # delete_selected carga, muestra y borra las tareas una a una
+        actions.pop('delete_selected', None)
+        return actions
+
+    def delete_tasks(self, request, queryset):
+        """Borra las tareas con un DELETE por lote."""
+        if request.POST.get('post') != 'yes':
+            selected = request.POST.getlist(helpers.ACTION_CHECKBOX_NAME)
+            select_across = request.POST.get('select_across') == '1'
+            return TemplateResponse(
+                request, 'admin/tasks/task/delete_tasks_confirmation.html', {
+                    **self.admin_site.each_context(request),
+                    'opts': self.model._meta,
+                    **self.action_count(queryset, selected, select_across),
+                    'selected': selected,
+                    'select_across': select_across,
+                    'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+                })
+        deleted = 0
+        for batch in self.batches(queryset):
+            with write_transaction():
+                deleted += Task.objects.filter(
+                    pk__in=[pk for pk, _, _ in batch]).delete_in_bulk()
+            cache.invalidate(*(slug for _, slug, _ in batch))
+            delete_unused_images(image for _, _, image in batch if image)
+        self.message_user(
+            request, f'Borradas {deleted} tareas.', messages.SUCCESS)
+
+    @staticmethod
+    def action_count(queryset, selected, select_across):
+        """Número de tareas de la acción para la confirmación, sin COUNT(*).
+
+        Sin filtros es el número de tareas de la tabla; con filtros se
+        cuenta como mucho hasta FILTERED_COUNT_LIMIT, como en la lista.
+        """
+        if not select_across:
+            return {'count': len(selected), 'more': False}
+        if not queryset.query.where:
+            return {'count': Task.objects.total_count(), 'more': False}
+        count = queryset.order_by()[:FILTERED_COUNT_LIMIT].count()
+        return {'count': count, 'more': count == FILTERED_COUNT_LIMIT}
+
+    @staticmethod
+    def batches(queryset):
+        """Lotes de (id, slug, image) de las tareas, por cursor sobre id.
+
+        Cada lote se lee después de borrar o cambiar el anterior, así que
+        la memoria no depende del número de tareas seleccionadas.
+        """
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')
+                         .values_list('pk', 'slug', 'image')[:QUERY_BATCH])
+            if not batch:
+                return
+            yield batch
+            last_pk = batch[-1][0]
+
+    delete_tasks.short_description = 'Borrar las tareas seleccionadas'
+    delete_tasks.allowed_permissions = ('delete',)
+
+    def remove_images(self, request, queryset):
+        """Quita la imagen de las tareas con un UPDATE por lote."""
+        updated = 0
+        for batch in self.batches(queryset.filter(image__gt='')):
+            with write_transaction():
+                # update() no actualiza updated_at por sí mismo
+                updated += Task.objects.filter(
+                    pk__in=[pk for pk, _, _ in batch]).update(
+                        image='', updated_at=timezone.now())
+            cache.invalidate(*(slug for _, slug, _ in batch))
+            delete_unused_images(image for _, _, image in batch)
+        self.message_user(
+            request, f'Quitada la imagen de {updated} tareas.',
+            messages.SUCCESS)
+
+    remove_images.short_description = 'Quitar la imagen de las tareas'
+    remove_images.allowed_permissions = ('change',)
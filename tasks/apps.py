@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 
 class TasksConfig(AppConfig):
-    name = 'ejercicios'
+    name = 'tasks'
+
+    def ready(self):
+        # Receptores de señales y manejadores de la cola de trabajos
+        from . import signals, thumbnails  # noqa: F401
@@ -0,0 +1,69 @@
+"""Usuario de la petición sin consultas a la base de datos.
+
+Con SESSION_ENGINE = signed_cookies la sesión viaja firmada en la
+cookie, y CachedAuthenticationMiddleware lee el usuario de la caché
+TASKS_AUTH_CACHE en lugar de auth_user. Igual que
+django.contrib.auth.get_user(), se comprueba el hash de la contraseña
+guardado en la sesión, así que cambiar la contraseña cierra las demás
+sesiones. Las señales de tasks.signals borran el usuario de la caché
+al guardarlo, borrarlo o cerrar su sesión.
+
+Con varios procesos, TASKS_AUTH_CACHE debe ser una caché compartida:
+en LocMemCache cada proceso puede tener una copia antigua del usuario
+hasta TASKS_AUTH_CACHE_TIMEOUT.
+"""
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+
+def user_cache():
+    return caches[settings.TASKS_AUTH_CACHE]
+
+
+def user_key(pk):
+    return f'tasks:user:{pk}'
+
+
+def invalidate_user(pk):
+    user_cache().delete(user_key(pk))
+
+
+def get_user(request):
+    """Como django.contrib.auth.get_user(), pero con el usuario en caché."""
+    session = request.session
+    try:
+        pk = auth.get_user_model()._meta.pk.to_python(
+            session[auth.SESSION_KEY])
+        backend_path = session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+    cache = user_cache()
+    key = user_key(pk)
+    user = cache.get(key)
+    if user is None:
+        user = auth.load_backend(backend_path).get_user(pk)
+        if user is None:
+            return AnonymousUser()
+        cache.set(key, user, settings.TASKS_AUTH_CACHE_TIMEOUT)
+    session_hash = session.get(auth.HASH_SESSION_KEY)
+    if not (session_hash and constant_time_compare(
+            session_hash, user.get_session_auth_hash())):
+        # La contraseña ha cambiado desde que se inició la sesión
+        session.flush()
+        return AnonymousUser()
+    user.backend = backend_path
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware que no consulta auth_user en cada petición."""
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
@@ -0,0 +1,80 @@
+"""Caché por slug de las tareas que muestra TaskDetail.
+
+Se guarda la fila serializada, no la página: la plantilla se sigue
+renderizando, pero la consulta a la base de datos solo se hace en un
+fallo de caché. Las señales de tasks.signals borran la entrada cuando
+se confirma la transacción que guarda o borra la tarea. QuerySet.update()
+y delete() en bloque no envían señales: después de usarlos hay que
+llamar a invalidate().
+
+La caché se comparte entre todos los navegadores, así que en un fallo la
+fila se lee siempre de la base de datos de escritura, nunca de una
+réplica que puede ir con retraso.
+"""
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+
+from .models import Task
+
+DETAIL_FIELDS = ('id', 'title', 'text', 'slug', 'image', 'updated_at')
+# Se incrementa al cambiar DETAIL_FIELDS para no leer filas antiguas
+DETAIL_CACHE_VERSION = 2
+
+
+class CacheStats:
+    """Contadores de aciertos y fallos de la caché en este proceso."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+stats = CacheStats()
+
+
+def detail_cache():
+    return caches[settings.TASKS_DETAIL_CACHE]
+
+
+def detail_key(slug):
+    return f'tasks:detail:{slug}'
+
+
+def get_task(slug):
+    """Devuelve la tarea con ese slug o lanza Task.DoesNotExist."""
+    cache = detail_cache()
+    key = detail_key(slug)
+    row = cache.get(key, version=DETAIL_CACHE_VERSION)
+    if row is None:
+        stats.miss()
+        row = (Task.objects.using(router.db_for_write(Task))
+               .filter(slug=slug).values_list(*DETAIL_FIELDS).first())
+        if row is None:
+            raise Task.DoesNotExist(f'No existe la tarea {slug}')
+        cache.set(key, row, settings.TASKS_DETAIL_CACHE_TIMEOUT,
+                  version=DETAIL_CACHE_VERSION)
+    else:
+        stats.hit()
+    return Task.from_db(router.db_for_write(Task), DETAIL_FIELDS, row)
+
+
+def invalidate(*slugs):
+    detail_cache().delete_many(
+        [detail_key(slug) for slug in slugs if slug],
+        version=DETAIL_CACHE_VERSION
+    )
@@ -0,0 +1,125 @@
+"""Cambios de las tareas para la sincronización incremental.
+
+Cada escritura de tareas recibe un número de cambio creciente
+(ChangeCounter): Task.seq es el del último cambio de la tarea y las
+tareas borradas dejan una lápida (TaskTombstone) con el número del
+borrado. Un cliente que ya tiene las tareas hasta un token solo pide las
+filas con (seq, id) mayor, en orden y por lotes, sin volver a descargar
+la lista entera.
+
+Las lápidas se borran con manage.py prune_tombstones; un token anterior
+a las lápidas borradas ya no sirve y el cliente tiene que volver a
+empezar sin token.
+"""
+import time
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .models import ChangeCounter, Task, TaskTombstone
+
+CHANGE_FIELDS = ('id', 'title', 'text', 'slug', 'image', 'updated_at', 'seq')
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+def encode_token(seq, pk):
+    """Convierte el último cambio leído (seq, id) en un token opaco."""
+    return urlsafe_base64_encode(force_bytes(f'{seq}.{pk}'))
+
+
+def decode_token(token):
+    """Devuelve la pareja (seq, id) del token; (0, 0) sin token."""
+    if not token:
+        return 0, 0
+    try:
+        seq, pk = force_str(urlsafe_base64_decode(token)).split('.')
+        seq, pk = int(seq), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidToken('Token no válido')
+    if seq < 0 or pk < 0:
+        raise InvalidToken('Token no válido')
+    return seq, pk
+
+
+def after(seq, pk, id_field):
+    """Condición (seq, id) > (seq, pk) que usa el índice de (seq, id)."""
+    return (Q(seq__gte=seq)
+            & (Q(seq__gt=seq) | Q(**{f'{id_field}__gt': pk})))
+
+
+class Changes:
+    """Un lote de cambios en orden y el token para pedir los siguientes."""
+    def __init__(self, items, token, more):
+        self.items = items
+        self.token = token
+        self.more = more
+
+    def as_json(self):
+        return {'changes': self.items, 'next': self.token, 'more': self.more}
+
+
+def task_change(row):
+    image = row['image']
+    return {
+        'id': row['id'],
+        'slug': row['slug'],
+        'deleted': False,
+        'title': row['title'],
+        'text': row['text'],
+        'image': Task._meta.get_field('image').storage.url(image)
+        if image else None,
+        'updated_at': row['updated_at'],
+    }
+
+
+def read_changes(seq, pk, limit, using):
+    """Hasta limit cambios posteriores a (seq, pk).
+
+    Son dos consultas por rango sobre los índices de (seq, id) de las
+    tareas y de las lápidas; se mezclan en orden y se corta en limit.
+    """
+    tasks = (
+        Task.objects.using(using).filter(after(seq, pk, 'id'))
+        .order_by('seq', 'id').values(*CHANGE_FIELDS)[:limit + 1]
+    )
+    tombstones = (
+        TaskTombstone.objects.using(using).filter(after(seq, pk, 'task_id'))
+        .order_by('seq', 'task_id').values('task_id', 'slug', 'seq')
+        [:limit + 1]
+    )
+    rows = sorted(
+        [((row['seq'], row['id']), task_change(row)) for row in tasks]
+        + [((row['seq'], row['task_id']),
+            {'id': row['task_id'], 'slug': row['slug'], 'deleted': True})
+           for row in tombstones],
+        key=lambda row: row[0])
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        seq, pk = rows[-1][0]
+    return Changes([item for _, item in rows], encode_token(seq, pk), more)
+
+
+def wait_for_changes(seq, pk, limit, timeout, using):
+    """Como read_changes(), pero espera hasta timeout segundos a que los haya.
+
+    Mientras espera solo lee la fila de ChangeCounter cada
+    TASKS_CHANGES_POLL_INTERVAL segundos; las tablas de tareas y lápidas
+    se vuelven a consultar cuando el contador avanza.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        last_seq = ChangeCounter.current(using)[0]
+        changes = read_changes(seq, pk, limit, using)
+        if changes.items:
+            return changes
+        while ChangeCounter.current(using)[0] == last_seq:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return changes
+            time.sleep(min(settings.TASKS_CHANGES_POLL_INTERVAL, remaining))
@@ -0,0 +1,129 @@
+"""Compresión de las respuestas con gzip y brotli.
+
+CompressionMiddleware comprime las páginas dinámicas (TaskList, ...)
+según Accept-Encoding. Las respuestas con ETag no cambian mientras no
+cambie el ETag, así que el cuerpo comprimido se guarda en la caché
+COMPRESSION_CACHE con el ETag en la clave: las peticiones siguientes no
+vuelven a comprimir los mismos bytes. Las páginas prerenderizadas
+(tasks.prerender) ya llegan comprimidas y no se tocan.
+
+Igual que con GZipMiddleware de Django, comprimir páginas que muestran
+secretos (el token CSRF) junto a texto del usuario expone a ataques
+como BREACH; Django enmascara el token CSRF en cada respuesta.
+
+brotli es opcional (pip install brotli): sin él solo se usa gzip.
+"""
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Codificaciones en orden de preferencia
+ENCODINGS = ('br', 'gzip')
+# Niveles para las páginas dinámicas: rápidos, porque se comprime en la
+# petición; las prerenderizadas usan los máximos
+FAST_LEVELS = {'br': 5, 'gzip': 6}
+BEST_LEVELS = {'br': 11, 'gzip': 9}
+# Por debajo de este tamaño la compresión no compensa
+MIN_LENGTH = 200
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript',
+                      'application/xml', 'image/svg+xml')
+
+
+def available_encodings():
+    return [encoding for encoding in ENCODINGS
+            if encoding != 'br' or brotli is not None]
+
+
+def compress(content, encoding, levels=FAST_LEVELS):
+    if encoding == 'br':
+        return brotli.compress(content, quality=levels['br'])
+    # mtime=0: el mismo contenido da siempre los mismos bytes
+    return gzip.compress(content, compresslevel=levels['gzip'], mtime=0)
+
+
+def accepted_encodings(header):
+    """Codificaciones de la cabecera Accept-Encoding con q > 0."""
+    accepted = set()
+    for item in header.split(','):
+        name, _, parameters = item.partition(';')
+        quality = 1.0
+        parameters = parameters.strip()
+        if parameters.startswith('q='):
+            try:
+                quality = float(parameters[2:])
+            except ValueError:
+                quality = 0.0
+        name = name.strip().lower()
+        if name and quality > 0:
+            accepted.add(name)
+    return accepted
+
+
+def choose_encoding(request, encodings):
+    """La primera de encodings que acepta el cliente, o 'identity'."""
+    accepted = accepted_encodings(
+        request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    for encoding in encodings:
+        if encoding in accepted or '*' in accepted:
+            return encoding
+    return 'identity'
+
+
+def is_compressible(response):
+    return (
+        not response.streaming
+        and response.status_code == 200
+        and not response.has_header('Content-Encoding')
+        and response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+        and len(response.content) >= MIN_LENGTH
+    )
+
+
+def cache_key(request, etag, encoding):
+    key = f'{request.get_full_path()}|{etag}|{encoding}'
+    return 'compressed:' + hashlib.md5(key.encode()).hexdigest()
+
+
+class CompressionMiddleware:
+    """Comprime las respuestas y guarda las comprimidas por ETag."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request, available_encodings())
+        if encoding == 'identity':
+            return response
+        content = response.content
+        etag = response.get('ETag')
+        body = None
+        if etag:
+            cache = caches[settings.COMPRESSION_CACHE]
+            key = cache_key(request, etag, encoding)
+            cached = cache.get(key)
+            # La longitud protege de un ETag que no cambió con el contenido
+            if cached is not None and cached[0] == len(content):
+                body = cached[1]
+        if body is None:
+            body = compress(content, encoding)
+            if etag:
+                cache.set(key, (len(content), body),
+                          settings.COMPRESSION_CACHE_TIMEOUT)
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        if etag and not etag.startswith('W/'):
+            # El ETag fuerte identifica los bytes sin comprimir
+            response['ETag'] = 'W/' + etag
+        return response
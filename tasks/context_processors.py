@@ -0,0 +1,9 @@
+from django.utils.functional import SimpleLazyObject
+
+from . import stats
+
+
+def task_stats(request):
+    """task_stats: los totales de TaskStat, leídos solo si se usan."""
+    return {'task_stats': SimpleLazyObject(
+        lambda: stats.request_totals(request))}
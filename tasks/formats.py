@@ -0,0 +1,63 @@
+"""Formatos de intercambio de tareas: JSON Lines (NDJSON) y CSV.
+
+Las funciones trabajan con iteradores para que la memoria no dependa
+del número de tareas.
+"""
+import csv
+import json
+
+# Campos que se exportan e importan por defecto
+EXPORT_FIELDS = ('title', 'text', 'slug', 'image')
+FORMATS = ('jsonl', 'csv')
+
+
+class Echo:
+    """Pseudobúfer para csv.writer: devuelve la línea en vez de guardarla."""
+    def write(self, value):
+        return value
+
+
+def guess_format(path, default='jsonl'):
+    """Deduce el formato por la extensión del archivo."""
+    if path.lower().endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def iter_jsonl(rows, fields):
+    """Convierte tuplas de valores en líneas JSON."""
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), ensure_ascii=False) + '\n'
+
+
+def iter_csv(rows, fields):
+    """Convierte tuplas de valores en líneas CSV con cabecera."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(['' if value is None else value
+                               for value in row])
+
+
+def iter_lines(rows, fields, format):
+    if format == 'csv':
+        return iter_csv(rows, fields)
+    return iter_jsonl(rows, fields)
+
+
+def read_jsonl(lines):
+    """Lee diccionarios de un archivo JSON Lines; ignora las líneas vacías."""
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_csv(lines):
+    """Lee diccionarios de un archivo CSV con cabecera."""
+    return csv.DictReader(lines)
+
+
+def read_rows(lines, format):
+    if format == 'csv':
+        return read_csv(lines)
+    return read_jsonl(lines)
@@ -1,6 +1,5 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from pytils.translit import slugify
 
 from .models import Task
 
@@ -16,12 +15,40 @@ class TaskCreateForm(forms.ModelForm):
     # Validar el campo slug
     def clean_slug(self):
         """Procesa los casos en los que el slug no es único."""
-        cleaned_data = super().clean()
-        slug = cleaned_data['slug']
-        if not slug:
-            title = cleaned_data['title']
-            slug = slugify(title)[:100]
-        if Task.objects.filter(slug=slug).exists():
-            raise ValidationError(f'El slug "{slug}" ya existe, '
-                                  'introduce un valor único')
+        slug = self.cleaned_data['slug']
+        # Un slug vacío no se consulta: Task.save() lo genera
+        # y le añade un sufijo (-2, -3...) si ya existe
+        if slug and Task.objects.filter(slug=slug).exists():
+            raise ValidationError(self.slug_exists_message(slug))
         return slug
+
+    def validate_unique(self):
+        # clean_slug() ya ha comprobado el slug: se excluye para no
+        # repetir la consulta en la validación de unicidad del modelo
+        exclude = self._get_validation_exclusions()
+        exclude.append('slug')
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as e:
+            self._update_errors(e)
+
+    def add_slug_conflict_error(self):
+        """El slug se ocupó entre la validación y el guardado."""
+        slug = self.cleaned_data['slug']
+        self.add_error('slug', self.slug_exists_message(slug))
+
+    @staticmethod
+    def slug_exists_message(slug):
+        return f'El slug "{slug}" ya existe, introduce un valor único'
+
+
+class TaskBatchForm(TaskCreateForm):
+    """Una tarea de la creación en bloque (vista TaskBatchCreate)."""
+    class Meta(TaskCreateForm.Meta):
+        # Las imágenes no se envían en JSON
+        fields = ('title', 'text', 'slug')
+
+    def clean_slug(self):
+        # Los slugs de todo el lote se comprueban juntos con
+        # Task.objects.allocate_slugs(), en una sola consulta
+        return self.cleaned_data['slug']
@@ -0,0 +1,219 @@
+"""Cola local de trabajos en segundo plano guardada en la tabla Job.
+
+Solo necesita la base de datos del proyecto (también SQLite), así que
+funciona igual en un único servidor y en las pruebas. Los trabajos se
+registran con @register('nombre'), se encolan con enqueue() y los
+ejecuta el comando manage.py run_worker.
+"""
+import json
+import logging
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+# Reintentos cuando SQLite responde «database is locked» más allá de su
+# propio tiempo de espera
+LOCK_RETRIES = 5
+
+
+def register(name):
+    """Registra la función como manejador de los trabajos name."""
+    def decorator(function):
+        HANDLERS[name] = function
+        return function
+    return decorator
+
+
+def enqueue(name, payload=None, key=None, delay=0, max_attempts=None):
+    """Encola un trabajo salvo que haya otro sin terminar con la misma clave.
+
+    El manejador recibirá payload como argumentos con nombre. La clave
+    se libera cuando el trabajo termina (bien o tras el último intento),
+    así que se puede volver a encolar más tarde. Es un único INSERT que
+    ignora el conflicto con la clave, así que se puede llamar dentro de
+    la transacción que guarda el objeto: si esa transacción se revierte,
+    el trabajo tampoco queda encolado.
+    """
+    job = Job(
+        name=name,
+        payload=json.dumps(payload or {}),
+        idempotency_key=key,
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.TASKS_JOBS_MAX_ATTEMPTS,
+    )
+    Job.objects.bulk_create([job], ignore_conflicts=True)
+
+
+def _retry_locked(function, *args, **kwargs):
+    """Repite una operación de la cola si la base de datos está bloqueada."""
+    for attempt in range(LOCK_RETRIES):
+        try:
+            return function(*args, **kwargs)
+        except OperationalError as e:
+            if 'locked' not in str(e) or attempt == LOCK_RETRIES - 1:
+                raise
+            time.sleep(0.05 * (attempt + 1))
+
+
+def _claimable(now):
+    stale = now - timedelta(seconds=settings.TASKS_JOBS_TIMEOUT)
+    # Un trabajo bloqueado hace demasiado tiempo es de un proceso caído
+    return (Q(status=Job.PENDING, run_after__lte=now)
+            | Q(status=Job.RUNNING, locked_at__lt=stale))
+
+
+def claim_next():
+    """Bloquea el siguiente trabajo disponible y devuelve su id (o None).
+
+    El UPDATE condicional garantiza que dos procesos no se queden
+    con el mismo trabajo.
+    """
+    now = timezone.now()
+    candidates = list(
+        Job.objects.filter(_claimable(now))
+        .values_list('pk', flat=True)[:10]
+    )
+    for pk in candidates:
+        claimed = (
+            Job.objects.filter(_claimable(now), pk=pk)
+            .update(status=Job.RUNNING, locked_at=now,
+                    attempts=F('attempts') + 1)
+        )
+        if claimed:
+            return pk
+    return None
+
+
+def execute(pk):
+    """Ejecuta el trabajo ya bloqueado; devuelve True si ha terminado bien."""
+    job = _retry_locked(Job.objects.get, pk=pk)
+    try:
+        if job.attempts > job.max_attempts:
+            raise RuntimeError('Se ha superado el número de intentos')
+        handler = HANDLERS.get(job.name)
+        if handler is None:
+            raise LookupError(f'Trabajo desconocido: {job.name}')
+        handler(**json.loads(job.payload))
+    except Exception:
+        logger.exception('Error en el trabajo %s (%s)', pk, job.name)
+        _retry_locked(_retry_or_fail, job, traceback.format_exc())
+        return False
+    _retry_locked(
+        Job.objects.filter(pk=pk).update,
+        status=Job.DONE, locked_at=None, last_error='', idempotency_key=None)
+    return True
+
+
+def _execute_in_pool(pk):
+    # Los hilos y procesos del grupo reutilizan su conexión entre trabajos,
+    # como las peticiones: se cierra si ha caducado o ha fallado
+    close_old_connections()
+    try:
+        return execute(pk)
+    finally:
+        close_old_connections()
+
+
+def _retry_or_fail(job, error):
+    if job.attempts >= job.max_attempts:
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.FAILED, locked_at=None, last_error=error,
+            idempotency_key=None)
+        return
+    # Espera exponencial: 1, 2, 4, 8... veces TASKS_JOBS_RETRY_DELAY
+    delay = settings.TASKS_JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.PENDING,
+        locked_at=None,
+        last_error=error,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def run_pending():
+    """Ejecuta en este hilo todos los trabajos disponibles.
+
+    Devuelve el número de trabajos ejecutados.
+    """
+    count = 0
+    while True:
+        pk = claim_next()
+        if pk is None:
+            return count
+        execute(pk)
+        count += 1
+
+
+def _init_process():
+    # Cada proceso hijo abre sus propias conexiones
+    import django
+    django.setup()
+    connections.close_all()
+
+
+class Worker:
+    """Ejecuta trabajos con un grupo de hilos o de procesos.
+
+    stop() deja de bloquear trabajos nuevos y espera a que terminen
+    los que están en marcha. Con drain=True, run() termina en cuanto
+    no quedan trabajos disponibles.
+    """
+    def __init__(self, concurrency=4, pool='thread', poll_interval=1.0):
+        self.concurrency = concurrency
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    def _executor(self):
+        if self.pool == 'process':
+            # Aquí y no arriba: importa multiprocessing, que los procesos
+            # web no necesitan
+            from concurrent.futures import ProcessPoolExecutor
+            connections.close_all()
+            return ProcessPoolExecutor(
+                self.concurrency, initializer=_init_process)
+        return ThreadPoolExecutor(self.concurrency)
+
+    def run(self, drain=False):
+        """Devuelve el número de trabajos ejecutados."""
+        executor = self._executor()
+        running = set()
+        count = 0
+        try:
+            while not self._stopping.is_set():
+                idle = False
+                while len(running) < self.concurrency:
+                    pk = _retry_locked(claim_next)
+                    if pk is None:
+                        idle = True
+                        break
+                    running.add(executor.submit(_execute_in_pool, pk))
+                    count += 1
+                if drain and idle and not running:
+                    break
+                if running:
+                    done, running = wait(
+                        running, timeout=self.poll_interval,
+                        return_when=FIRST_COMPLETED)
+                else:
+                    self._stopping.wait(self.poll_interval)
+        finally:
+            # Al parar se terminan los trabajos en marcha
+            wait(running)
+            executor.shutdown()
+        return count
@@ -0,0 +1,271 @@
+import itertools
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from tasks.models import Task
+from tasks.utils import batched
+
+HOST = 'testserver'
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, percent):
+    """Percentil por rango más cercano de una lista ordenada."""
+    if not values:
+        return None
+    rank = max(int(round(percent / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+class QueryCounter:
+    """execute_wrapper que cuenta las consultas de cada hilo."""
+    def __init__(self):
+        self.local = threading.local()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.local.count = getattr(self.local, 'count', 0) + 1
+        return execute(sql, params, many, context)
+
+    def take(self):
+        count = getattr(self.local, 'count', 0)
+        self.local.count = 0
+        return count
+
+
+class WSGIClient:
+    """Hace peticiones directamente a la aplicación WSGI, sin servidor."""
+    def __init__(self, application, cookies):
+        self.application = application
+        self.cookie_header = '; '.join(
+            f'{name}={value}' for name, value in cookies.items())
+        self.csrf_token = cookies.get(settings.CSRF_COOKIE_NAME, '')
+
+    def request(self, method, path, data=None):
+        path, _, query = path.partition('?')
+        body = urlencode(data).encode() if data else b''
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SCRIPT_NAME': '',
+            'SERVER_NAME': HOST,
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1',
+            'HTTP_HOST': HOST,
+            'HTTP_COOKIE': self.cookie_header,
+            'HTTP_X_CSRFTOKEN': self.csrf_token,
+            'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': BytesIO(),
+            'wsgi.url_scheme': 'http',
+            'wsgi.version': (1, 0),
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        status = []
+
+        def start_response(status_line, headers, exc_info=None):
+            status.append(int(status_line.split()[0]))
+
+        response = self.application(environ, start_response)
+        try:
+            for _ in response:
+                pass
+        finally:
+            # Como en un servidor real: envía request_finished
+            if hasattr(response, 'close'):
+                response.close()
+        return status[0]
+
+
+class Command(BaseCommand):
+    help = ('Mide las peticiones por segundo y la latencia (p50/p95/p99) de '
+            'cada página a través de la aplicación WSGI, con varios hilos a '
+            'la vez, sobre una base de datos de pruebas. El resultado es '
+            'JSON, para comparar entre commits.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tasks', type=int, default=1000,
+            help='Tareas que se crean antes de medir.')
+        parser.add_argument(
+            '--requests', type=int, default=500,
+            help='Peticiones por ruta.')
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='Hilos que hacen peticiones a la vez.')
+        parser.add_argument(
+            '--routes',
+            help='Rutas que se miden, separadas por comas (por defecto '
+                 'todas).')
+        parser.add_argument(
+            '--output', default='-',
+            help='Archivo JSON de resultados; "-" para la salida estándar.')
+
+    def handle(self, *args, **options):
+        connection = connections['default']
+        test_settings = connection.settings_dict['TEST']
+        directory = None
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            # La base de datos en memoria compartida no admite escrituras
+            # desde varios hilos: se usa un archivo temporal
+            directory = tempfile.mkdtemp()
+            test_settings['NAME'] = os.path.join(directory, 'bench.sqlite3')
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(DEBUG=False,
+                                   ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS,
+                                                  HOST]):
+                slugs = self.seed(options['tasks'])
+                client = self.client()
+                results = self.run_routes(client, slugs, options)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if directory:
+                test_settings['NAME'] = None
+                # Con WAL quedan también los archivos -wal y -shm
+                shutil.rmtree(directory, ignore_errors=True)
+        report = {
+            'tasks': options['tasks'],
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'routes': results,
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output'] == '-':
+            self.stdout.write(output)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
+
+    def seed(self, count):
+        tasks = [
+            Task(title=f'Tarea de prueba {number}',
+                 text=f'Descripción de la tarea de prueba número {number}')
+            for number in range(count)
+        ]
+        for batch in batched(tasks, 1000):
+            Task.objects.allocate_slugs(batch)
+            with transaction.atomic():
+                Task.objects.bulk_create(batch)
+        return [task.slug for task in tasks]
+
+    def client(self):
+        """Cliente con la sesión iniciada y la cookie CSRF."""
+        user = get_user_model().objects.create_user(username='bench')
+        login = Client()
+        login.force_login(user)
+        login.get(reverse('tasks:home'))
+        cookies = {name: morsel.value
+                   for name, morsel in login.cookies.items()}
+        from todo.wsgi import application
+        return WSGIClient(application, cookies)
+
+    def routes(self, slugs):
+        """[(nombre, método, función que devuelve (ruta, datos))]"""
+        counter = itertools.count()
+        # Cada hilo elige tareas al azar, pero la serie es reproducible
+        chooser = random.Random(0)
+        lock = threading.Lock()
+
+        def random_detail():
+            with lock:
+                slug = chooser.choice(slugs)
+            return reverse('tasks:task_detail', args=[slug]), None
+
+        def new_task():
+            number = next(counter)
+            return reverse('tasks:home'), {
+                'title': f'Tarea nueva {number}',
+                'text': 'Creada por manage.py bench',
+                'slug': '',
+            }
+
+        def fixed(name):
+            return lambda: (reverse(name), None)
+
+        return [
+            ('tasks:home', 'GET', fixed('tasks:home')),
+            ('tasks:home', 'POST', new_task),
+            ('tasks:task_list', 'GET', fixed('tasks:task_list')),
+            ('tasks:task_detail', 'GET', random_detail),
+            ('tasks:task_added', 'GET', fixed('tasks:task_added')),
+            ('static_pages:about', 'GET', fixed('static_pages:about')),
+        ]
+
+    def run_routes(self, client, slugs, options):
+        selected = options['routes']
+        selected = set(selected.split(',')) if selected else None
+        counter = QueryCounter()
+        results = {}
+        for name, method, target in self.routes(slugs):
+            if selected and name not in selected:
+                continue
+            key = f'{method} {name}'
+            self.stderr.write(f'{key}...')
+            results[key] = self.measure(
+                client, method, target, counter, options)
+        return results
+
+    def measure(self, client, method, target, counter, options):
+        # Una petición de calentamiento antes de medir
+        client.request(method, *target())
+        wrappers = []
+
+        def one(_):
+            # Las conexiones son por hilo: el contador se instala en
+            # la conexión de cada hilo del grupo
+            connection = connections['default']
+            if counter not in connection.execute_wrappers:
+                connection.execute_wrappers.append(counter)
+                wrappers.append(connection)
+            path, data = target()
+            started = time.perf_counter()
+            status = client.request(method, path, data)
+            return time.perf_counter() - started, status, counter.take()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            samples = list(executor.map(one, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        for connection in wrappers:
+            connection.execute_wrappers.remove(counter)
+
+        latencies = sorted(latency for latency, _, _ in samples)
+        queries = [count for _, _, count in samples]
+        statuses = Counter(str(status) for _, status, _ in samples)
+        errors = sum(1 for _, status, _ in samples if status >= 400)
+        result = {
+            'requests': len(samples),
+            'errors': errors,
+            'statuses': dict(sorted(statuses.items())),
+            'requests_per_second': round(len(samples) / elapsed, 1),
+        }
+        for percent in PERCENTILES:
+            result[f'p{percent}_ms'] = round(
+                percentile(latencies, percent) * 1000, 2)
+        result['queries_mean'] = round(sum(queries) / len(queries), 2)
+        result['queries_max'] = max(queries)
+        return result
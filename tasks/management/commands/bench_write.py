@@ -0,0 +1,216 @@
+import itertools
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.test.utils import override_settings
+from PIL import Image
+
+from tasks import search, stats
+from tasks.forms import TaskCreateForm
+from tasks.models import ChangeCounter, Task
+from tasks.slugs import slugify
+from tasks.utils import batched
+
+STORAGES = ('memory', 'disk')
+# Filas por INSERT al preparar la tabla
+SEED_BATCH = 10000
+
+
+def seed_slug(number):
+    return f'seed-task-{number}'
+
+
+def measure(step, number, repeat):
+    """Operaciones por segundo de step en repeat series de number llamadas."""
+    counter = itertools.count()
+    # Una serie de calentamiento que no se cuenta
+    for _ in range(number):
+        step(next(counter))
+    rates = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            step(next(counter))
+        rates.append(number / (time.perf_counter() - started))
+    return {
+        'ops_per_second': round(statistics.mean(rates), 1),
+        'stdev': round(statistics.stdev(rates), 1) if repeat > 1 else 0.0,
+        'min': round(min(rates), 1),
+        'max': round(max(rates), 1),
+    }
+
+
+def png_bytes():
+    output = BytesIO()
+    Image.new('RGB', (64, 64), 'teal').save(output, 'PNG')
+    return output.getvalue()
+
+
+class Command(BaseCommand):
+    help = ('Micro-benchmarks de cada paso de la creación de una tarea '
+            '(validación de TaskCreateForm, Task.save() con slug generado, '
+            'imagen) sobre SQLite en memoria y en disco con varios tamaños '
+            'de tabla. El resultado es JSON, para comparar entre commits.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,100000,1000000',
+            help='Tareas en la tabla antes de medir, separadas por comas.')
+        parser.add_argument(
+            '--storage', default=','.join(STORAGES),
+            help='SQLite en memoria ("memory"), en disco ("disk") o ambos.')
+        parser.add_argument(
+            '--number', type=int, default=200,
+            help='Operaciones por serie.')
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Series por paso; se informa de la media y la desviación.')
+        parser.add_argument(
+            '--output', default='-',
+            help='Archivo JSON de resultados; "-" para la salida estándar.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Los micro-benchmarks usan SQLite.')
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        storages = options['storage'].split(',')
+        unknown = set(storages) - set(STORAGES)
+        if unknown:
+            raise CommandError(
+                f'Almacenamiento desconocido: {", ".join(sorted(unknown))}')
+        results = []
+        media = tempfile.mkdtemp()
+        try:
+            with override_settings(DEBUG=False, MEDIA_ROOT=media):
+                for storage in storages:
+                    for size in sizes:
+                        self.stderr.write(f'{storage}, {size} tareas...')
+                        results.append({
+                            'storage': storage,
+                            'size': size,
+                            'steps': self.run_size(storage, size, options),
+                        })
+        finally:
+            shutil.rmtree(media, ignore_errors=True)
+        report = {
+            'number': options['number'],
+            'repeat': options['repeat'],
+            'results': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output'] == '-':
+            self.stdout.write(output)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
+
+    def run_size(self, storage, size, options):
+        test_settings = connection.settings_dict['TEST']
+        directory = None
+        if storage == 'disk':
+            directory = tempfile.mkdtemp()
+            test_settings['NAME'] = os.path.join(directory, 'bench.sqlite3')
+        else:
+            # Un nombre propio por tamaño: la base de datos en memoria
+            # vive mientras siga abierta
+            test_settings['NAME'] = (
+                f'file:bench_{size}?mode=memory&cache=shared')
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.seed(size)
+            return {
+                name: measure(step, options['number'], options['repeat'])
+                for name, step in self.steps()
+            }
+        finally:
+            if storage == 'memory':
+                # close() de SQLite no cierra las bases de datos en
+                # memoria; la de BaseDatabaseWrapper libera la memoria
+                BaseDatabaseWrapper.close(connection)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = None
+            if directory:
+                shutil.rmtree(directory, ignore_errors=True)
+
+    def seed(self, size):
+        """Llena la tabla con INSERT directos y reconstruye índice y contadores."""
+        search.drop_triggers()
+        with transaction.atomic(), connection.cursor() as cursor:
+            first_seq = ChangeCounter.allocate(size, connection.alias) - size + 1
+            rows = (
+                (f'Seed task {number}', f'Texto de la tarea {number}',
+                 seed_slug(number), '', first_seq + number)
+                for number in range(size)
+            )
+            for batch in batched(rows, SEED_BATCH):
+                cursor.executemany(
+                    'INSERT INTO tasks_task (title, text, slug, image, seq, '
+                    'created_at, updated_at) VALUES '
+                    "(%s, %s, %s, %s, %s, datetime('now'), datetime('now'))",
+                    batch)
+        search.rebuild_index()
+        stats.rebuild()
+
+    def steps(self):
+        """[(nombre, función que recibe el número de operación)]"""
+        image = png_bytes()
+
+        def form_data(number, slug=''):
+            return {'title': f'Bench task {number}', 'text': 'Texto',
+                    'slug': slug}
+
+        def form_blank_slug(number):
+            assert TaskCreateForm(form_data(number)).is_valid()
+
+        def form_new_slug(number):
+            # clean_slug() comprueba que el slug no existe
+            form = TaskCreateForm(form_data(number, f'new-slug-{number}'))
+            assert form.is_valid()
+
+        def form_taken_slug(number):
+            form = TaskCreateForm(form_data(number, seed_slug(0)))
+            assert not form.is_valid()
+
+        def form_with_image(number):
+            files = {'image': SimpleUploadedFile(
+                f'bench-{number}.png', image, 'image/png')}
+            assert TaskCreateForm(form_data(number), files).is_valid()
+
+        def slugify_title(number):
+            slugify.__wrapped__(f'Bench task {number}')
+
+        def save_generated_slug(number):
+            Task(title=f'Bench save {number}', text='Texto').save()
+
+        def save_repeated_title(number):
+            # El slug ya existe: se busca el primer sufijo libre
+            Task(title=f'Seed task {number % 10}', text='Texto').save()
+
+        def save_form_with_image(number):
+            files = {'image': SimpleUploadedFile(
+                f'bench-{number}.png', image, 'image/png')}
+            form = TaskCreateForm(
+                form_data(f'image {number}'), files)
+            assert form.is_valid()
+            form.save()
+
+        return [
+            ('form_blank_slug', form_blank_slug),
+            ('form_new_slug', form_new_slug),
+            ('form_taken_slug', form_taken_slug),
+            ('form_with_image', form_with_image),
+            ('slugify', slugify_title),
+            ('save_generated_slug', save_generated_slug),
+            ('save_repeated_title', save_repeated_title),
+            ('save_form_with_image', save_form_with_image),
+        ]
@@ -0,0 +1,103 @@
+import posixpath
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.storage import task_images
+from tasks.thumbnails import FORMATS, MANIFEST_EXTENSION
+
+
+def walk(storage, directory):
+    """Nombres de todos los archivos bajo directory."""
+    directories, files = storage.listdir(directory)
+    for filename in files:
+        yield posixpath.join(directory, filename)
+    for subdirectory in directories:
+        yield from walk(storage, posixpath.join(directory, subdirectory))
+
+
+class Command(BaseCommand):
+    help = ('Borra las imágenes de las tareas (y sus versiones reducidas) que '
+            'no usa ninguna tarea: las imágenes reemplazadas al editar una '
+            'tarea, las subidas interrumpidas y las versiones de anchos o '
+            'formatos que ya no están en la configuración.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=float, default=3600,
+            help='Solo se borran los archivos con más de este número de '
+                 'segundos, para no borrar una imagen recién subida cuya '
+                 'tarea aún no se ha guardado.')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Muestra los archivos que se borrarían sin borrarlos.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        directory = Task._meta.get_field('image').upload_to.rstrip('/')
+        if not task_images.exists(directory):
+            self.stderr.write('No hay imágenes.')
+            return
+        referenced = set(
+            Task.objects.exclude(image='').exclude(image=None)
+            .order_by().values_list('image', flat=True).distinct()
+            .iterator())
+        # Raíces (directorio, nombre sin extensión) de las imágenes usadas
+        # y finales de los nombres de sus versiones reducidas y su índice
+        roots = {posixpath.splitext(name)[0] for name in referenced}
+        suffixes = {
+            f'-{width}w.{FORMATS[format][1]}'
+            for format in settings.TASKS_THUMBNAIL_FORMATS
+            for width in settings.TASKS_THUMBNAIL_WIDTHS
+        }
+        suffixes.add(MANIFEST_EXTENSION)
+        cutoff = timezone.now() - timedelta(seconds=options['min_age'])
+        deleted = size = 0
+        for name in walk(task_images, directory):
+            parent, filename = posixpath.split(name)
+            if posixpath.basename(parent) == 'thumbs':
+                storage = default_storage
+                if self.is_used_thumbnail(parent, filename, roots, suffixes):
+                    continue
+            else:
+                storage = task_images
+                if name in referenced:
+                    continue
+            if storage is task_images and not options['dry_run']:
+                try:
+                    file_size = storage.size(name)
+                except FileNotFoundError:
+                    continue
+                # Con el bloqueo de _save(): una subida que reutiliza el
+                # archivo entretanto renueva su fecha y no se borra
+                if not task_images.delete_if_old(name, options['min_age']):
+                    continue
+            else:
+                if storage.get_modified_time(name) > cutoff:
+                    continue
+                file_size = storage.size(name)
+                if options['dry_run']:
+                    self.stdout.write(name)
+                else:
+                    storage.delete(name)
+            deleted += 1
+            size += file_size
+        elapsed = time.monotonic() - started
+        action = 'Se borrarían' if options['dry_run'] else 'Borrados'
+        self.stderr.write(
+            f'{action} {deleted} archivos ({size} bytes) de '
+            f'{len(referenced)} imágenes en uso en {elapsed:.2f} s')
+
+    @staticmethod
+    def is_used_thumbnail(parent, filename, roots, suffixes):
+        directory = posixpath.dirname(parent)
+        for suffix in suffixes:
+            if filename.endswith(suffix):
+                root = filename[:-len(suffix)]
+                return posixpath.join(directory, root) in roots
+        return False
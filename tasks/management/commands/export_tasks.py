@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.formats import EXPORT_FIELDS, FORMATS, guess_format, iter_lines
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = ('Exporta las tareas en JSON Lines o CSV. Las filas se leen por '
+            'bloques, así que la memoria no depende del tamaño de la tabla.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output', nargs='?', default='-',
+            help='Archivo de salida; "-" para la salida estándar.')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Formato de salida; por defecto se deduce de la extensión.')
+        parser.add_argument(
+            '--fields', default=','.join(EXPORT_FIELDS),
+            help='Campos que se exportan, separados por comas.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Filas que se leen de la base de datos en cada bloque.')
+
+    def handle(self, *args, **options):
+        path = options['output']
+        format = options['format'] or guess_format(path)
+        fields = [field for field in options['fields'].split(',') if field]
+        unknown = set(fields) - set(EXPORT_FIELDS)
+        if unknown:
+            raise CommandError(
+                f'Campos desconocidos: {", ".join(sorted(unknown))}')
+        rows = (
+            Task.objects.order_by('pk')
+            .values_list(*fields)
+            .iterator(chunk_size=options['chunk_size'])
+        )
+        started = time.monotonic()
+        count = 0
+        if path == '-':
+            output = self.stdout
+        else:
+            output = open(path, 'w', encoding='utf-8', newline='')
+        try:
+            for line in iter_lines(rows, fields, format):
+                output.write(line)
+                count += 1
+        finally:
+            if output is not self.stdout:
+                output.close()
+        if format == 'csv':
+            # La primera línea es la cabecera
+            count -= 1
+        elapsed = time.monotonic() - started
+        self.stderr.write(
+            f'Exportadas {count} tareas en {elapsed:.2f} s '
+            f'({count / elapsed if elapsed else 0:.0f} filas/s)'
+        )
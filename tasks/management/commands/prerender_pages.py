@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks import prerender
+
+
+class Command(BaseCommand):
+    help = ('Renderiza las páginas de PRERENDER_PAGES y las guarda en '
+            'PRERENDER_ROOT sin comprimir, con gzip y con brotli, para que '
+            'se sirvan sin pasar por las plantillas. Hay que ejecutarlo al '
+            'desplegar.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        manifest = prerender.build()
+        for name, entry in manifest.items():
+            sizes = ', '.join(f'{encoding} {size} B'
+                              for encoding, size in entry['sizes'].items())
+            self.stdout.write(f'{name}: {sizes}')
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{len(manifest)} páginas en {settings.PRERENDER_ROOT} '
+            f'({elapsed:.2f} s)')
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Max
+from django.utils import timezone
+
+from tasks.models import ChangeCounter, TaskTombstone
+from tasks.sqlite import write_transaction
+
+
+class Command(BaseCommand):
+    help = ('Borra las lápidas de las tareas borradas hace más de '
+            'TASKS_TOMBSTONE_DAYS días. Los clientes con un token anterior '
+            'reciben 410 en tasks:changes y vuelven a descargar las tareas.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=float, default=settings.TASKS_TOMBSTONE_DAYS,
+            help='Días que se guardan las lápidas.')
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Base de datos cuyas lápidas se borran.')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        with write_transaction(using=using):
+            old = TaskTombstone.objects.using(using).filter(
+                deleted_at__lt=cutoff)
+            pruned_seq = old.aggregate(last=Max('seq'))['last']
+            if pruned_seq is None:
+                self.stdout.write('No hay lápidas que borrar')
+                return
+            # Se borran todas las lápidas hasta ese cambio, para que no
+            # quede un hueco en la secuencia
+            deleted, _ = TaskTombstone.objects.using(using).filter(
+                seq__lte=pruned_seq).delete()
+            ChangeCounter.objects.using(using).filter(pk=1).update(
+                pruned_seq=pruned_seq)
+        self.stdout.write(
+            f'Borradas {deleted} lápidas hasta el cambio {pruned_seq}')
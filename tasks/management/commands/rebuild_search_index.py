@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from tasks import search
+
+
+class Command(BaseCommand):
+    help = ('Crea si hace falta el índice FTS5 de búsqueda de tareas y lo '
+            'reconstruye a partir de la tabla de tareas.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Base de datos cuyo índice se reconstruye.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if not search.rebuild_index(options['database']):
+            raise CommandError(
+                'La base de datos no admite FTS5: la búsqueda usará '
+                'icontains.')
+        elapsed = time.monotonic() - started
+        self.stdout.write(f'Índice de búsqueda reconstruido en {elapsed:.2f} s')
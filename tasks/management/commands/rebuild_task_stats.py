@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from tasks import stats
+from tasks.models import TaskStat
+
+
+class Command(BaseCommand):
+    help = ('Vuelve a calcular los contadores de tareas (TaskStat) a partir '
+            'de la tabla de tareas, por ejemplo después de escribir tareas '
+            'con SQL directo o de bulk_create(ignore_conflicts=True).')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Base de datos cuyos contadores se recalculan.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        counters = stats.rebuild(options['database'])
+        elapsed = time.monotonic() - started
+        days = len(counters) - len(TaskStat.TOTALS)
+        self.stdout.write(
+            f'{counters[TaskStat.TOTAL]} tareas '
+            f'({counters[TaskStat.WITH_IMAGE]} con imagen) en {days} días; '
+            f'contadores recalculados en {elapsed:.2f} s')
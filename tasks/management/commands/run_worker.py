@@ -0,0 +1,41 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from tasks.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = ('Ejecuta los trabajos en segundo plano de la cola local. '
+            'SIGTERM o Ctrl+C dejan de tomar trabajos nuevos y esperan '
+            'a que terminen los que están en marcha.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='Número de hilos o procesos.')
+        parser.add_argument(
+            '--pool', choices=('thread', 'process'), default='thread',
+            help='Tipo de grupo de ejecución.')
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Segundos entre consultas cuando la cola está vacía.')
+        parser.add_argument(
+            '--drain', action='store_true',
+            help='Termina cuando no quedan trabajos disponibles.')
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options['concurrency'],
+            pool=options['pool'],
+            poll_interval=options['poll_interval'],
+        )
+
+        def stop(signum, frame):
+            self.stderr.write('Parando: se terminan los trabajos en marcha...')
+            worker.stop()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        count = worker.run(drain=options['drain'])
+        self.stderr.write(f'Trabajos ejecutados: {count}')
@@ -0,0 +1,140 @@
+import json
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Las URL públicas que mide por defecto: no necesitan sesión ni base
+# de datos
+DEFAULT_URLS = ('tasks:home', 'static_pages:about', 'tasks:task_added')
+
+# Se ejecuta en un proceso nuevo con python -X importtime: mide cuánto
+# tarda en importarse la aplicación WSGI, como al arrancar un proceso de
+# gunicorn, y solo después importa lo que necesita para las peticiones
+MARKER = 'startup_profile: application ready\n'
+CHILD = f'''
+import importlib, json, sys, time
+MARKER = {MARKER!r}
+started = time.perf_counter()
+from django.conf import settings
+module_name, _, name = settings.WSGI_APPLICATION.rpartition('.')
+module = importlib.import_module(module_name)
+application = getattr(module, name)
+seconds = time.perf_counter() - started
+sys.stderr.write(MARKER)
+sys.stderr.flush()
+from tasks.management.commands import startup_profile
+print(json.dumps(startup_profile.first_requests(
+    application, getattr(module, 'warm_up_report', None), seconds,
+    sys.argv[1:])))
+'''
+
+
+def first_requests(application, warm_up, seconds, url_names):
+    """Informe del proceso hijo: arranque y primeras peticiones."""
+    from django.test.utils import override_settings
+    from django.urls import reverse
+
+    from tasks.management.commands.bench import HOST, WSGIClient
+
+    client = WSGIClient(application, {})
+    requests = []
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, HOST]):
+        for url_name in url_names:
+            path = reverse(url_name)
+            timings = []
+            # La primera petición del proceso y una segunda, ya en caliente
+            for _ in range(2):
+                started = time.perf_counter()
+                status = client.request('GET', path)
+                elapsed = time.perf_counter() - started
+                timings.append(round(elapsed * 1000, 2))
+            requests.append({'url': url_name, 'path': path, 'status': status,
+                             'first_ms': timings[0], 'second_ms': timings[1]})
+    return {
+        'startup_profile': settings.TASKS_STARTUP_PROFILE,
+        'application_seconds': round(seconds, 4),
+        'warm_up': warm_up,
+        'requests': requests,
+    }
+
+
+def parse_importtime(output):
+    """[(módulo, propio µs, acumulado µs)] de la salida de -X importtime.
+
+    Solo cuenta los módulos importados hasta tener la aplicación WSGI.
+    """
+    modules = []
+    for line in output.splitlines():
+        if line == MARKER.strip():
+            break
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(own), int(cumulative)))
+    return modules
+
+
+class Command(BaseCommand):
+    help = ('Mide el arranque en frío de un proceso web: tiempo de importación '
+            'de cada módulo (python -X importtime), tiempo hasta tener la '
+            'aplicación WSGI y latencia de la primera petición a cada URL '
+            'frente a la segunda. Se ejecuta en un proceso nuevo con la '
+            'configuración actual (TASKS_STARTUP_PROFILE incluido). El '
+            'resultado es JSON, para comparar entre versiones.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', action='append', dest='urls',
+            help='Nombre de una URL sin argumentos que se pide (se puede '
+                 f'repetir; por defecto {", ".join(DEFAULT_URLS)}).')
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help='Módulos y paquetes más lentos que se muestran.')
+        parser.add_argument(
+            '--output', default='-',
+            help='Archivo JSON de resultados; "-" para la salida estándar.')
+
+    def handle(self, *args, **options):
+        # El proceso hereda DJANGO_SETTINGS_MODULE (también con --settings)
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CHILD,
+             *(options['urls'] or DEFAULT_URLS)],
+            cwd=settings.BASE_DIR,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        if result.returncode:
+            raise CommandError(
+                'El proceso medido ha fallado:\n'
+                + '\n'.join(line for line in result.stderr.splitlines()
+                            if not line.startswith('import time:')))
+        report = json.loads(result.stdout.splitlines()[-1])
+        modules = parse_importtime(result.stderr)
+        packages = Counter()
+        for name, own, _ in modules:
+            packages[name.split('.')[0]] += own
+        top = options['top']
+        report['imports'] = {
+            'modules': len(modules),
+            'seconds': round(sum(own for _, own, _ in modules) / 1e6, 4),
+            'packages': [
+                {'package': name, 'ms': round(own / 1000, 2)}
+                for name, own in packages.most_common(top)
+            ],
+            'slowest': [
+                {'module': name, 'self_ms': round(own / 1000, 2),
+                 'cumulative_ms': round(cumulative / 1000, 2)}
+                for name, own, cumulative in
+                sorted(modules, key=lambda module: -module[2])[:top]
+            ],
+        }
+        output = json.dumps(report, indent=2)
+        if options['output'] == '-':
+            self.stdout.write(output)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
@@ -0,0 +1,48 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = ('Copia la base de datos SQLite default en las réplicas de '
+            'TASKS_READ_DATABASES con la API de copia de seguridad de '
+            'SQLite, que se puede usar mientras la aplicación escribe.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases', nargs='*',
+            help='Réplicas que se copian; por defecto TASKS_READ_DATABASES.')
+        parser.add_argument(
+            '--interval', type=float,
+            help='Repite la copia cada este número de segundos.')
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or settings.TASKS_READ_DATABASES
+        if not aliases:
+            raise CommandError('No hay réplicas en TASKS_READ_DATABASES.')
+        for alias in [DEFAULT_DB_ALIAS, *aliases]:
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(f'{alias} no es una base de datos SQLite.')
+        while True:
+            for alias in aliases:
+                started = time.monotonic()
+                self.copy(alias)
+                self.stdout.write(
+                    f'{alias}: copiada en {time.monotonic() - started:.2f} s')
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
+
+    def copy(self, alias):
+        source = connections[DEFAULT_DB_ALIAS]
+        source.ensure_connection()
+        target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+        try:
+            # Copia por páginas: los lectores de la réplica esperan
+            # (busy_timeout) solo mientras se escribe cada tramo
+            source.connection.backup(target, pages=1024)
+        finally:
+            target.close()
@@ -1,6 +1,307 @@
-from django.db import models
-# Necesitas instalar la librería pytils: pip install pytils.
-from pytils.translit import slugify
+from collections import Counter
+
+from django.conf import settings
+from django.db import (IntegrityError, connections, models, router,
+                       transaction)
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import search as fts
+from .slugs import slugify
+from .sqlite import write_transaction
+from .storage import task_images
+from .utils import QUERY_BATCH, batched
+
+SLUG_MAX_LENGTH = 100
+# Intentos de guardar la tarea con un slug generado antes de rendirse
+SLUG_ATTEMPTS = 10
+# Slug de las tareas cuyo título no deja ningún carácter válido
+EMPTY_SLUG = 'tarea'
+
+
+class SlugConflictError(IntegrityError):
+    """El slug indicado explícitamente ya está ocupado."""
+
+
+def is_slug_conflict(error):
+    """Comprueba si el IntegrityError viene de la restricción UNIQUE del slug.
+
+    Se mira la restricción o la columna que nombra la base de datos, no
+    si el mensaje contiene «slug» (también aparece en otras tablas).
+    """
+    table = Task._meta.db_table
+    column = Task._meta.get_field('slug').column
+    # PostgreSQL (psycopg2) da el nombre de la restricción
+    diag = getattr(error.__cause__, 'diag', None)
+    if diag is not None and diag.constraint_name:
+        return diag.constraint_name == f'{table}_{column}_key'
+    message = str(error)
+    # SQLite: «UNIQUE constraint failed: tasks_task.slug»; MySQL 8:
+    # «Duplicate entry ... for key 'tasks_task.slug'»
+    return f'{table}.{column}' in message
+
+
+def slug_base(title):
+    """Slug generado a partir del título; nunca vacío."""
+    return slugify(title)[:SLUG_MAX_LENGTH] or EMPTY_SLUG
+
+
+def slug_series_range(base):
+    """Límites (inclusivo, exclusivo) de los slugs base-2, base-3...
+
+    Es una consulta por rango sobre el índice UNIQUE del slug, a diferencia
+    de LIKE, que en SQLite recorre toda la tabla.
+    """
+    if len(base) <= SLUG_MAX_LENGTH - 11:
+        prefix = base + '-'
+    else:
+        # Un slug largo se recorta para dejar sitio al sufijo
+        # de hasta diez cifras
+        prefix = base[:SLUG_MAX_LENGTH - 11]
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def first_free_slug(base, taken):
+    """Devuelve el primer slug de la serie base-2, base-3... que no está en taken."""
+    number = 2
+    while True:
+        suffix = f'-{number}'
+        candidate = base[:SLUG_MAX_LENGTH - len(suffix)] + suffix
+        if candidate not in taken:
+            return candidate
+        number += 1
+
+
+def contains_all(terms):
+    """Condición icontains que exige todas las palabras en title o text."""
+    condition = models.Q()
+    for term in terms:
+        condition &= (models.Q(title__icontains=term)
+                      | models.Q(text__icontains=term))
+    return condition
+
+
+class TaskQuerySet(models.QuerySet):
+    # Campos que necesita una tarjeta de la lista de tareas;
+    # text e image no se leen de la base de datos
+    LIST_FIELDS = ('id', 'title', 'slug')
+
+    def for_list(self):
+        """Solo carga las columnas que se muestran en las listas."""
+        return self.only(*self.LIST_FIELDS)
+
+    def list_version(self):
+        """Número del último cambio de las tareas (ver ChangeCounter).
+
+        Toda escritura de tareas lo incrementa, también update() y los
+        borrados en bloque. Es la lectura de una fila por clave primaria.
+        """
+        return ChangeCounter.current(self.db)[0]
+
+    def search(self, query):
+        """Tareas que contienen todas las palabras de query.
+
+        Con el índice FTS5 las tareas se ordenan por bm25 (mejor primero)
+        y cada una lleva snippet, un fragmento con las coincidencias
+        marcadas (ver tasks.search.highlight()); solo se ordenan las
+        TASKS_SEARCH_CANDIDATES coincidencias más recientes. Sin el índice
+        se filtra con icontains, que recorre toda la tabla.
+        """
+        terms = fts.search_terms(query)
+        if not terms:
+            return self.none()
+        if not fts.fts_available(self.db):
+            # text hace falta para construir el fragmento en Python
+            return self.filter(contains_all(terms)).defer(None)
+        table = fts.FTS_TABLE
+        match = fts.match_expression(terms)
+        return self.extra(
+            select={
+                'rank': f'bm25({table}, %s, %s)',
+                'snippet': f'snippet({table}, -1, %s, %s, %s, %s)',
+            },
+            select_params=(
+                fts.TITLE_WEIGHT, fts.TEXT_WEIGHT,
+                fts.MARK_START, fts.MARK_END, fts.ELLIPSIS,
+                fts.SNIPPET_TOKENS,
+            ),
+            tables=[table],
+            where=[
+                f'{table}.rowid = {self.model._meta.db_table}.id',
+                f'{table} MATCH %s',
+                # Solo se ordenan las coincidencias más recientes: con
+                # palabras muy frecuentes, bm25 y snippet no recorren
+                # cientos de miles de filas
+                f'{table}.rowid >= (SELECT MIN(rowid) FROM ('
+                f'SELECT rowid FROM {table} WHERE {table} MATCH %s '
+                f'ORDER BY rowid DESC LIMIT %s))',
+            ],
+            params=[match, match, settings.TASKS_SEARCH_CANDIDATES],
+            order_by=['rank'],
+        )
+
+    def matching(self, query):
+        """Como search(), pero sin ordenar por relevancia ni fragmentos.
+
+        Es un filtro que se combina con cualquier orden y paginación; con
+        el índice FTS5 no recorre la tabla de tareas.
+        """
+        terms = fts.search_terms(query)
+        if not terms:
+            return self.none()
+        if not fts.fts_available(self.db):
+            return self.filter(contains_all(terms))
+        table = fts.FTS_TABLE
+        return self.extra(
+            where=[f'{self.model._meta.db_table}.id IN ('
+                   f'SELECT rowid FROM {table} WHERE {table} MATCH %s)'],
+            params=[fts.match_expression(terms)],
+        )
+
+    def total_count(self):
+        """Número de tareas de la tabla, sin recorrerla.
+
+        Es el contador TaskStat.TOTAL, que mantienen las escrituras: una
+        lectura por clave primaria en lugar de COUNT(*).
+        """
+        return (TaskStat.objects.using(self.db).filter(name=TaskStat.TOTAL)
+                .values_list('value', flat=True).first() or 0)
+
+    def delete_in_bulk(self):
+        """Borra las tareas con un único DELETE, sin cargarlas.
+
+        A diferencia de delete(), no envía post_delete: quien llama
+        invalida la caché de TaskDetail y libera las imágenes. Las
+        lápidas de las tareas borradas (TaskTombstone) se copian con un
+        único INSERT ... SELECT y los contadores de TaskStat se restan
+        con una consulta GROUP BY sobre las tareas borradas.
+        """
+        self._for_write = True
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        tombstones = connection.ops.quote_name(TaskTombstone._meta.db_table)
+        sql, params = self.order_by().values('pk').query.sql_with_params()
+        with write_transaction(using=self.db), connection.cursor() as cursor:
+            TaskStat.add(self.stat_deltas(-1), self.db)
+            seq = ChangeCounter.allocate(1, self.db)
+            cursor.execute(
+                f'INSERT INTO {tombstones} (task_id, slug, seq, deleted_at) '
+                f'SELECT id, slug, %s, %s FROM {table} WHERE id IN ({sql})',
+                [seq, connection.ops.adapt_datetimefield_value(timezone.now()),
+                 *params])
+            cursor.execute(f'DELETE FROM {table} WHERE id IN ({sql})', params)
+            return cursor.rowcount
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """bulk_create() que numera los cambios y cuenta las tareas nuevas."""
+        objs = list(objs)
+        self._for_write = True
+        with write_transaction(using=self.db):
+            last = ChangeCounter.allocate(len(objs), self.db)
+            for seq, task in enumerate(objs, last - len(objs) + 1):
+                task.seq = seq
+            created = super().bulk_create(objs, *args, **kwargs)
+            # Con ignore_conflicts no se sabe qué filas se han insertado:
+            # los contadores se corrigen con manage.py rebuild_task_stats
+            if not kwargs.get('ignore_conflicts'):
+                TaskStat.add(task_stat_deltas(created), self.db)
+            return created
+
+    def update(self, **kwargs):
+        """update() que numera el cambio; todas las filas comparten seq."""
+        self._for_write = True
+        with write_transaction(using=self.db):
+            if 'image' in kwargs:
+                # Las tareas que pasan a tener imagen o a no tenerla
+                if kwargs['image']:
+                    changed = self.exclude(image__gt='').count()
+                else:
+                    changed = -self.filter(image__gt='').count()
+                TaskStat.add({TaskStat.WITH_IMAGE: changed}, self.db)
+            kwargs['seq'] = ChangeCounter.allocate(1, self.db)
+            return super().update(**kwargs)
+
+    def stat_deltas(self, sign=1):
+        """Contadores de TaskStat de las tareas del queryset, por sign."""
+        rows = (
+            self.order_by()
+            .annotate(day=TruncDate('created_at'))
+            .values('day')
+            .annotate(count=models.Count('id'),
+                      images=models.Count(
+                          'id', filter=models.Q(image__gt='')))
+        )
+        deltas = Counter()
+        for row in rows:
+            deltas[TaskStat.TOTAL] += sign * row['count']
+            deltas[TaskStat.WITH_IMAGE] += sign * row['images']
+            deltas[TaskStat.day_name(row['day'])] += sign * row['count']
+        return deltas
+
+    def taken_slugs(self, slugs):
+        """Devuelve cuáles de los slugs ya existen."""
+        taken = set()
+        for chunk in batched(slugs, QUERY_BATCH):
+            taken.update(
+                self.filter(slug__in=chunk).order_by()
+                .values_list('slug', flat=True))
+        return taken
+
+    def taken_slug_series(self, bases):
+        """Devuelve los slugs ocupados de las series base-2, base-3..."""
+        taken = set()
+        ranges = sorted({slug_series_range(base) for base in bases})
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        column = connection.ops.quote_name(
+            self.model._meta.get_field('slug').column)
+        condition = f'({column} >= %s AND {column} < %s)'
+        # SQL directo: construir miles de Q() cuesta más que la propia
+        # consulta. Los grupos de 200 rangos respetan el límite de 999
+        # parámetros y la profundidad máxima de una expresión en SQLite.
+        with connection.cursor() as cursor:
+            for chunk in batched(ranges, 200):
+                cursor.execute(
+                    f'SELECT {column} FROM {table} WHERE '
+                    + ' OR '.join([condition] * len(chunk)),
+                    [limit for pair in chunk for limit in pair]
+                )
+                taken.update(row[0] for row in cursor.fetchall())
+        return taken
+
+    def allocate_slugs(self, tasks):
+        """Asigna slugs únicos a tareas nuevas antes de un bulk_create().
+
+        Las tareas sin slug reciben el de su título, con sufijo (-2, -3...)
+        si ya existe en la base de datos o en el propio lote. Las tareas con
+        un slug explícito ocupado no se modifican: se devuelven para que no
+        se inserten. Hace una consulta por cada 500 tareas más una por cada
+        cien títulos repetidos.
+        """
+        generated = set()
+        for task in tasks:
+            if not task.slug:
+                task.slug = slug_base(task.title)
+                generated.add(id(task))
+        taken = self.taken_slugs({task.slug for task in tasks})
+        seen = set()
+        repeated = []
+        conflicts = []
+        for task in tasks:
+            if task.slug in taken or task.slug in seen:
+                if id(task) in generated:
+                    repeated.append(task)
+                else:
+                    conflicts.append(task)
+                continue
+            seen.add(task.slug)
+        if repeated:
+            taken |= self.taken_slug_series(task.slug for task in repeated)
+            taken |= seen
+            for task in repeated:
+                task.slug = first_free_slug(task.slug, taken)
+                taken.add(task.slug)
+        return conflicts
 
 
 class Task(models.Model):
@@ -16,27 +317,322 @@ class Task(models.Model):
     )
     slug = models.SlugField(
         'El slug de la URL para la página de la tarea',
-        max_length=100,
+        max_length=SLUG_MAX_LENGTH,
         unique=True,
         blank=True,
         help_text=('Introduce una URL única para la página de la tarea. Utiliza solo '
                    'Caracteres latinos, números, guiones y guiones bajos')
     )
+    # Los archivos se nombran por su contenido y se comparten entre tareas
+    # (ver tasks.storage); el índice sirve para contar sus referencias
     image = models.ImageField(
         'Imagen',
         upload_to='tasks/',
+        storage=task_images,
         blank=True,
         null=True,
+        db_index=True,
         help_text='Sube una imagen'
     )
+    # Lo actualiza save() (y bulk_create()); QuerySet.update() no lo hace
+    updated_at = models.DateTimeField(
+        'Modificada',
+        auto_now=True,
+        db_index=True
+    )
+    created_at = models.DateTimeField('Creada', auto_now_add=True)
+    # Número del último cambio de la tarea (ver ChangeCounter y
+    # tasks.changes); lo asignan save(), bulk_create() y update()
+    seq = models.BigIntegerField('Cambio', default=0, editable=False)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        # Orden determinista sobre la clave primaria (ya indexada),
+        # necesario para la paginación por cursor
+        ordering = ('-id',)
+        # Para leer los cambios en orden (seq, id) sin ordenar la tabla
+        indexes = [models.Index(fields=['seq', 'id'])]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Se recuerda el slug leído para invalidar la caché si cambia
+        if 'slug' in field_names:
+            instance._loaded_slug = values[field_names.index('slug')]
+        # Y la imagen, para el contador de TaskStat y para encolar sus
+        # versiones reducidas solo si cambia
+        if 'image' in field_names:
+            instance._loaded_image = values[field_names.index('image')] or ''
+        return instance
+
     # Amplía el método save() por defecto: si no se especifica el campo slug,
     # transliterar el valor del campo del título en caracteres latinos (100 caracteres como máximo)
     # (100 characters max)
+    # La unicidad no se consulta antes de guardar: la garantiza la restricción
+    # UNIQUE, y si un slug generado ya existe se le añade un sufijo (-2, -3...)
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)[:100]
-        super().save(*args, **kwargs)
+        if kwargs.get('update_fields'):
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'seq'}
+        if self.slug:
+            try:
+                with write_transaction(using=kwargs.get('using')):
+                    return self.save_change(*args, **kwargs)
+            except IntegrityError as e:
+                if is_slug_conflict(e):
+                    raise SlugConflictError(str(e)) from e
+                raise
+        base = slug_base(self.title)
+        self.slug = base
+        for attempt in range(SLUG_ATTEMPTS):
+            try:
+                with write_transaction(using=kwargs.get('using')):
+                    return self.save_change(*args, **kwargs)
+            except IntegrityError as e:
+                if not is_slug_conflict(e) or attempt == SLUG_ATTEMPTS - 1:
+                    self.slug = ''
+                    raise
+                self.slug = self.next_free_slug(base)
+
+    def delete(self, using=None, keep_parents=False):
+        # La señal pre_delete lee la tarea antes del DELETE
+        using = using or router.db_for_write(type(self), instance=self)
+        with write_transaction(using=using):
+            return super().delete(using, keep_parents)
+
+    def save_change(self, *args, **kwargs):
+        """Guarda la tarea con el número del cambio siguiente.
+
+        Se llama dentro de la transacción del guardado: si falla, el
+        número se devuelve al contador y los contadores de TaskStat no
+        cambian.
+        """
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self)
+        adding = self._state.adding
+        self.seq = ChangeCounter.allocate(1, using)
+        result = super().save(*args, **kwargs)
+        if adding:
+            deltas = task_stat_deltas([self])
+        else:
+            update_fields = kwargs.get('update_fields')
+            deltas = {}
+            # Una imagen que no se ha leído tampoco se guarda
+            if hasattr(self, '_loaded_image') and (
+                    update_fields is None or 'image' in update_fields):
+                deltas[TaskStat.WITH_IMAGE] = (
+                    bool(self.image) - bool(self._loaded_image))
+        TaskStat.add(deltas, using)
+        self._loaded_image = self.image.name or ''
+        return result
+
+    @classmethod
+    def next_free_slug(cls, base):
+        """Devuelve el primer slug libre de la serie base, base-2, base-3...
+
+        Todos los slugs ocupados de la serie se leen en una sola consulta.
+        """
+        taken = cls._default_manager.taken_slug_series([base])
+        return first_free_slug(base, taken)
+
+
+def supports_returning(connection):
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return connection.vendor == 'postgresql'
+
+
+class ChangeCounter(models.Model):
+    """Contador de los cambios de las tareas (una única fila).
+
+    Cada escritura de tareas incrementa last_seq dentro de su
+    transacción. La fila queda bloqueada hasta el COMMIT, así que los
+    números se confirman en orden: un cliente que ha leído hasta el
+    cambio N no se pierde después un cambio menor que N (con el id
+    autoincremental de una tabla de cambios sí podría ocurrir).
+    """
+    last_seq = models.BigIntegerField('Último cambio', default=0)
+    # Las lápidas hasta este cambio ya se han borrado
+    # (manage.py prune_tombstones)
+    pruned_seq = models.BigIntegerField('Lápidas borradas hasta', default=0)
+
+    @classmethod
+    def allocate(cls, count, using):
+        """Reserva count números de cambio y devuelve el último.
+
+        Es un único UPDATE ... RETURNING (SQLite 3.35+, PostgreSQL); las
+        demás bases de datos leen el contador después del UPDATE.
+        """
+        connection = connections[using]
+        table = connection.ops.quote_name(cls._meta.db_table)
+        increment = (f'UPDATE {table} SET last_seq = last_seq + %s '
+                     f'WHERE id = 1')
+        while True:
+            with connection.cursor() as cursor:
+                if supports_returning(connection):
+                    cursor.execute(increment + ' RETURNING last_seq', [count])
+                    rows = cursor.fetchall()
+                else:
+                    cursor.execute(increment, [count])
+                    rows = []
+                    if cursor.rowcount:
+                        cursor.execute(
+                            f'SELECT last_seq FROM {table} WHERE id = 1')
+                        rows = cursor.fetchall()
+            if rows:
+                return rows[0][0]
+            cls.create_row(using)
+
+    @classmethod
+    def create_row(cls, using):
+        """Crea la fila del contador; la señal post_migrate la crea."""
+        try:
+            with transaction.atomic(using=using):
+                cls.objects.using(using).create(pk=1)
+        except IntegrityError:
+            # Otra transacción la ha creado a la vez
+            pass
+
+    @classmethod
+    def current(cls, using):
+        """(último cambio, lápidas borradas hasta) sin bloquear nada."""
+        row = (cls.objects.using(using).filter(pk=1)
+               .values_list('last_seq', 'pruned_seq').first())
+        return row or (0, 0)
+
+
+class TaskTombstone(models.Model):
+    """Tarea borrada, para que los clientes sincronizados la borren."""
+    task_id = models.IntegerField('Tarea')
+    slug = models.SlugField(max_length=SLUG_MAX_LENGTH, db_index=False)
+    seq = models.BigIntegerField('Cambio')
+    deleted_at = models.DateTimeField('Borrada', default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['seq', 'task_id'])]
+
+    def __str__(self):
+        return self.slug
+
+
+def task_stat_deltas(tasks, sign=1):
+    """Cambios de los contadores de TaskStat al crear (o borrar) tasks."""
+    deltas = Counter()
+    for task in tasks:
+        deltas[TaskStat.TOTAL] += sign
+        deltas[TaskStat.WITH_IMAGE] += sign * bool(task.image)
+        day = timezone.localdate(task.created_at)
+        deltas[TaskStat.day_name(day)] += sign
+    return deltas
+
+
+def supports_upsert(connection):
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 24)
+    return connection.vendor == 'postgresql'
+
+
+class TaskStat(models.Model):
+    """Contador de las tareas que se mantiene al escribirlas.
+
+    Los totales (TOTALS) y las tareas creadas cada día ('created:fecha')
+    se leen por clave primaria, sin COUNT(*) ni GROUP BY sobre la tabla
+    de tareas (ver tasks.stats). Los actualizan Task.save(), la señal
+    post_delete, bulk_create(), update() y delete_in_bulk() dentro de su
+    transacción; manage.py rebuild_task_stats los vuelve a calcular.
+    """
+    TOTAL = 'tasks'
+    WITH_IMAGE = 'tasks_with_image'
+    TOTALS = (TOTAL, WITH_IMAGE)
+    DAY_PREFIX = 'created:'
+
+    name = models.CharField('Contador', max_length=50, primary_key=True)
+    value = models.BigIntegerField('Valor', default=0)
+
+    def __str__(self):
+        return f'{self.name}: {self.value}'
+
+    @classmethod
+    def day_name(cls, day):
+        return f'{cls.DAY_PREFIX}{day.isoformat()}'
+
+    @classmethod
+    def add(cls, deltas, using):
+        """Suma deltas ({contador: cambio}) a los contadores.
+
+        Es un único INSERT ... ON CONFLICT DO UPDATE (SQLite 3.24+,
+        PostgreSQL); en las demás bases de datos, un UPDATE por contador.
+        """
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        connection = connections[using]
+        if not supports_upsert(connection):
+            for name, delta in deltas.items():
+                counter = cls.objects.using(using).filter(name=name)
+                if not counter.update(value=models.F('value') + delta):
+                    try:
+                        with transaction.atomic(using=using):
+                            cls.objects.using(using).create(
+                                name=name, value=delta)
+                    except IntegrityError:
+                        counter.update(value=models.F('value') + delta)
+            return
+        table = connection.ops.quote_name(cls._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (name, value) VALUES '
+                + ', '.join(['(%s, %s)'] * len(deltas))
+                + f' ON CONFLICT (name) DO UPDATE SET '
+                  f'value = {table}.value + excluded.value',
+                [value for item in sorted(deltas.items()) for value in item])
+
+    @classmethod
+    def create_totals(cls, using):
+        """Crea los totales a 0; la señal post_migrate los crea."""
+        for name in cls.TOTALS:
+            cls.objects.using(using).get_or_create(name=name)
+
+
+class Job(models.Model):
+    """Trabajo pendiente de la cola local (ver tasks.jobs)."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pendiente'),
+        (RUNNING, 'En ejecución'),
+        (DONE, 'Terminado'),
+        (FAILED, 'Fallido'),
+    )
+
+    name = models.CharField('Nombre', max_length=100)
+    payload = models.TextField('Datos en JSON', default='{}')
+    idempotency_key = models.CharField(
+        'Clave de idempotencia',
+        max_length=255,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text='Mientras un trabajo no termina, no se encola otro con '
+                  'la misma clave'
+    )
+    status = models.CharField(
+        'Estado', max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField('Intentos', default=0)
+    max_attempts = models.PositiveIntegerField('Intentos máximos', default=5)
+    run_after = models.DateTimeField('Ejecutar a partir de', default=timezone.now)
+    locked_at = models.DateTimeField('Bloqueado en', null=True, blank=True)
+    last_error = models.TextField('Último error', blank=True)
+    created_at = models.DateTimeField('Creado', auto_now_add=True)
+
+    class Meta:
+        ordering = ('run_after', 'id')
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
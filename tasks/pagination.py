@@ -0,0 +1,116 @@
+from django.core.paginator import InvalidPage
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+# Prefijos del cursor: 'a' (after) avanza hacia registros más antiguos,
+# 'b' (before) retrocede hacia registros más nuevos
+AFTER = 'a'
+BEFORE = 'b'
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(direction, pk):
+    """Convierte la dirección y el pk límite en un token opaco."""
+    return urlsafe_base64_encode(force_bytes(f'{direction}{pk}'))
+
+
+def decode_cursor(cursor):
+    """Devuelve la pareja (dirección, pk) codificada en el token."""
+    try:
+        raw = force_str(urlsafe_base64_decode(cursor))
+        direction, pk = raw[0], int(raw[1:])
+    except (ValueError, IndexError, UnicodeDecodeError):
+        raise InvalidCursor('Cursor no válido')
+    if direction not in (AFTER, BEFORE):
+        raise InvalidCursor('Cursor no válido')
+    return direction, pk
+
+
+class KeysetPage:
+    """Una página de la paginación por cursor."""
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<KeysetPage>'
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Paginación por cursor sobre la clave primaria (orden descendente).
+
+    A diferencia de OFFSET, cada página cuesta lo mismo sin importar
+    la profundidad: primero se buscan en el índice de pk los límites
+    de la página y después se cargan solo las filas de ese rango.
+    """
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+
+    def page(self, cursor=None):
+        if not cursor:
+            return self._page_after(None)
+        direction, pk = decode_cursor(cursor)
+        if direction == AFTER:
+            return self._page_after(pk)
+        return self._page_before(pk)
+
+    def _boundaries(self, lookup, ordering):
+        # Solo se leen los pk: la consulta se resuelve con el índice
+        return list(
+            self.queryset.filter(**lookup)
+            .order_by(ordering)
+            .values_list('pk', flat=True)[:self.per_page + 1]
+        )
+
+    def _window(self, low, high):
+        return self.queryset.filter(pk__gte=low, pk__lte=high).order_by('-pk')
+
+    def _page_after(self, pk):
+        lookup = {} if pk is None else {'pk__lt': pk}
+        pks = self._boundaries(lookup, '-pk')
+        if not pks:
+            previous_cursor = None
+            if pk is not None:
+                previous_cursor = encode_cursor(BEFORE, pk - 1)
+            return KeysetPage(self.queryset.none(),
+                              previous_cursor=previous_cursor)
+        has_more = len(pks) > self.per_page
+        pks = pks[:self.per_page]
+        high, low = pks[0], pks[-1]
+        return KeysetPage(
+            self._window(low, high),
+            next_cursor=encode_cursor(AFTER, low) if has_more else None,
+            previous_cursor=(
+                encode_cursor(BEFORE, high) if pk is not None else None
+            ),
+        )
+
+    def _page_before(self, pk):
+        pks = self._boundaries({'pk__gt': pk}, 'pk')
+        if len(pks) <= self.per_page:
+            # No hay más registros por delante: es la primera página
+            return self._page_after(None)
+        pks = pks[:self.per_page]
+        low, high = pks[0], pks[-1]
+        return KeysetPage(
+            self._window(low, high),
+            next_cursor=encode_cursor(AFTER, low),
+            previous_cursor=encode_cursor(BEFORE, high),
+        )
@@ -0,0 +1,160 @@
+"""Páginas sin datos por petición renderizadas de antemano.
+
+manage.py prerender_pages renderiza las vistas de PRERENDER_PAGES y
+guarda en PRERENDER_ROOT el HTML tal cual, comprimido con gzip y con
+brotli (si está instalado) al nivel máximo, y un manifest.json con el
+ETag de cada página. PrerenderedMixin responde con esos bytes sin
+pasar por las plantillas; si la página no se ha prerenderizado, la
+vista renderiza la plantilla como siempre.
+
+Hay que volver a ejecutar el comando al desplegar cambios en las
+plantillas de estas páginas.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import resolve, reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+
+from .compression import (BEST_LEVELS, available_encodings, choose_encoding,
+                          compress)
+from .utils import patch_revalidate
+
+MANIFEST = 'manifest.json'
+EXTENSIONS = {'br': '.br', 'gzip': '.gz'}
+
+_lock = threading.Lock()
+# Páginas leídas de PRERENDER_ROOT. key: (ruta y fecha del manifiesto);
+# pages: nombre de la URL -> Page
+_loaded = {'key': None, 'pages': {}}
+
+
+class Page:
+    """Una página prerenderizada, en memoria con todas sus codificaciones."""
+    def __init__(self, etag, content_type, bodies):
+        self.etag = etag
+        self.content_type = content_type
+        # 'identity', 'br', 'gzip' -> bytes
+        self.bodies = bodies
+
+    def response(self, request):
+        encoding = choose_encoding(
+            request, [encoding for encoding in EXTENSIONS
+                      if encoding in self.bodies])
+        # Cada codificación es una representación distinta
+        etag = quote_etag(
+            self.etag if encoding == 'identity'
+            else f'{self.etag}-{encoding}')
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                self.bodies[encoding], content_type=self.content_type)
+            if encoding != 'identity':
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Accept-Encoding',))
+        patch_revalidate(response, public=True)
+        return response
+
+
+def page_file(name):
+    return name.replace(':', os.sep) + '.html'
+
+
+def get_page(name):
+    """La página prerenderizada de la URL name, o None."""
+    manifest_path = os.path.join(settings.PRERENDER_ROOT, MANIFEST)
+    try:
+        key = (manifest_path, os.stat(manifest_path).st_mtime_ns)
+    except OSError:
+        return None
+    if _loaded['key'] != key:
+        with _lock:
+            if _loaded['key'] != key:
+                _loaded['pages'] = load_pages(manifest_path)
+                _loaded['key'] = key
+    return _loaded['pages'].get(name)
+
+
+def load_pages(manifest_path):
+    with open(manifest_path, encoding='utf-8') as file:
+        manifest = json.load(file)
+    pages = {}
+    for name, entry in manifest.items():
+        path = os.path.join(settings.PRERENDER_ROOT, entry['file'])
+        bodies = {}
+        for encoding in ['identity', *entry['encodings']]:
+            with open(path + EXTENSIONS.get(encoding, ''), 'rb') as file:
+                bodies[encoding] = file.read()
+        pages[name] = Page(entry['etag'], entry['content_type'], bodies)
+    return pages
+
+
+def render_page(name):
+    """Renderiza la vista de la URL name como en una petición anónima."""
+    # django.test tarda en importarse y solo lo usa prerender_pages
+    from django.test import RequestFactory
+    path = reverse(name)
+    view_class = resolve(path).func.view_class
+    response = view_class.as_view(prerendered=False)(
+        RequestFactory().get(path))
+    if hasattr(response, 'render'):
+        response.render()
+    if response.status_code != 200:
+        raise ValueError(f'{name} responde {response.status_code}')
+    return response.content, response['Content-Type']
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as file:
+        file.write(content)
+    os.replace(path + '.tmp', path)
+
+
+def build():
+    """Prerenderiza PRERENDER_PAGES y devuelve el manifiesto escrito."""
+    root = settings.PRERENDER_ROOT
+    manifest = {}
+    for name in settings.PRERENDER_PAGES:
+        content, content_type = render_page(name)
+        path = os.path.join(root, page_file(name))
+        write_file(path, content)
+        sizes = {'identity': len(content)}
+        for encoding in available_encodings():
+            compressed = compress(content, encoding, BEST_LEVELS)
+            # En una página muy corta la compresión no ahorra nada
+            if len(compressed) < len(content):
+                write_file(path + EXTENSIONS[encoding], compressed)
+                sizes[encoding] = len(compressed)
+        manifest[name] = {
+            'file': page_file(name),
+            'etag': hashlib.sha256(content).hexdigest()[:32],
+            'content_type': content_type,
+            'encodings': [encoding for encoding in sizes
+                          if encoding != 'identity'],
+            'sizes': sizes,
+        }
+    # El manifiesto se escribe al final: las vistas no ven páginas a medias
+    write_file(os.path.join(root, MANIFEST),
+               json.dumps(manifest, indent=2).encode())
+    return manifest
+
+
+class PrerenderedMixin:
+    """Sirve la página prerenderizada por manage.py prerender_pages."""
+    prerendered = True
+
+    def get(self, request, *args, **kwargs):
+        match = request.resolver_match
+        page = None
+        if self.prerendered and match:
+            page = get_page(match.view_name)
+        if page is None:
+            return super().get(request, *args, **kwargs)
+        return page.response(request)
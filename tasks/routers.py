@@ -0,0 +1,81 @@
+"""Lecturas de las tareas desde réplicas de solo lectura.
+
+Las vistas con read_replica = True (TaskList, TaskExport, TaskChanges,
+TaskStats) leen las tareas de uno de los alias de TASKS_READ_DATABASES;
+todo lo demás (validación de formularios, Task.save(), sesiones,
+usuarios) usa 'default'. TaskDetail lee de la caché por slug, que se
+llena desde 'default' (ver tasks.cache). Después de una petición que
+escribe (POST, ...), una cookie hace que ese navegador lea de 'default'
+durante TASKS_READ_STICKY_SECONDS, así ve lo que acaba de guardar
+aunque la réplica vaya con retraso.
+
+Para probarlo en local con dos archivos SQLite, manage.py sync_replicas
+copia 'default' en las réplicas.
+"""
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Cookie que envía las lecturas a 'default' después de escribir
+PRIMARY_COOKIE = 'tasks_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_state = threading.local()
+
+
+def read_databases():
+    return settings.TASKS_READ_DATABASES
+
+
+class ReadReplicaRouter:
+    """Lecturas de la app tasks en la réplica activa; escrituras en default."""
+    app_label = 'tasks'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return getattr(_state, 'alias', None)
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Explícito: si no, Django escribiría en la base de datos de la
+        # que se leyó la instancia, que puede ser una réplica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Las réplicas tienen los mismos datos que default
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in read_databases():
+            return False
+        return None
+
+
+class ReadReplicaMiddleware:
+    """Activa las réplicas en las vistas con read_replica = True."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.alias = None
+        if (read_databases() and request.method not in SAFE_METHODS
+                and response.status_code < 400):
+            # Lecturas propias: este navegador acaba de escribir
+            response.set_cookie(
+                PRIMARY_COOKIE, '1',
+                max_age=settings.TASKS_READ_STICKY_SECONDS, httponly=True)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if (read_databases() and getattr(view_class, 'read_replica', False)
+                and PRIMARY_COOKIE not in request.COOKIES):
+            # Hasta el final de la petición, también al renderizar la
+            # plantilla, que es cuando se evalúan los QuerySet
+            _state.alias = random.choice(read_databases())
+        return None
@@ -0,0 +1,172 @@
+"""Índice de búsqueda de texto completo de las tareas (SQLite FTS5).
+
+La tabla virtual tasks_task_fts indexa el título y el texto de
+tasks_task sin duplicar el contenido (content='tasks_task'). Unos
+disparadores la mantienen al día en cada INSERT, UPDATE y DELETE,
+también con bulk_create() y QuerySet.update(), que no envían señales.
+El índice se crea al ejecutar migrate; manage.py rebuild_search_index
+lo reconstruye desde la tabla de tareas.
+
+Si la base de datos no es SQLite o no se ha compilado con FTS5,
+Task.objects.search() recurre a icontains (ver fts_available()).
+"""
+import re
+
+from django.db import DatabaseError, connections
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+FTS_TABLE = 'tasks_task_fts'
+# Pesos de bm25() por columna: una coincidencia en el título vale más
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+# Marcas del fragmento resaltado; no pueden aparecer en el texto
+# escrito en el formulario, así que se sustituyen después de escapar
+MARK_START = '\x02'
+MARK_END = '\x03'
+ELLIPSIS = '…'
+# Palabras del fragmento alrededor de la coincidencia
+SNIPPET_TOKENS = 16
+
+SCHEMA = [
+    # remove_diacritics 2: «reunion» encuentra «reunión»;
+    # prefix: índices para las búsquedas por prefijo de 2 y 3 letras
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, text,
+        content='tasks_task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF title, text ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END""",
+]
+
+TRIGGERS = [f'{FTS_TABLE}_insert', f'{FTS_TABLE}_delete', f'{FTS_TABLE}_update']
+
+WORD_RE = re.compile(r'\w+')
+
+# Resultado de fts_available() por base de datos
+_available = {}
+
+
+def _key(connection):
+    return connection.alias, connection.settings_dict['NAME']
+
+
+def fts_available(using='default'):
+    """Comprueba si existe el índice FTS5 en la base de datos using."""
+    connection = connections[using]
+    key = _key(connection)
+    if key not in _available:
+        _available[key] = (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _available[key]
+
+
+def create_index(using='default'):
+    """Crea la tabla FTS5 y sus disparadores si no existen.
+
+    Devuelve False si la base de datos no admite FTS5.
+    """
+    connection = connections[using]
+    available = False
+    if connection.vendor == 'sqlite':
+        try:
+            with connection.cursor() as cursor:
+                for statement in SCHEMA:
+                    cursor.execute(statement)
+            available = True
+        except DatabaseError:
+            # SQLite compilado sin FTS5
+            pass
+    _available[_key(connection)] = available
+    return available
+
+
+def rebuild_index(using='default'):
+    """Vuelve a indexar todas las tareas y compacta el índice."""
+    if not create_index(using):
+        return False
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return True
+
+
+def drop_triggers(using='default'):
+    """Desactiva la actualización del índice, para cargas masivas.
+
+    Cada fila insertada con los disparadores actualiza el índice por
+    separado; después de la carga, rebuild_index() vuelve a crearlos
+    e indexa toda la tabla de una vez, que es mucho más rápido.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for trigger in TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+
+
+def search_terms(query):
+    """Palabras de la búsqueda, sin signos de puntuación."""
+    return WORD_RE.findall(query.lower())
+
+
+def match_expression(terms):
+    """Expresión MATCH que exige todas las palabras.
+
+    La última palabra es un prefijo, para buscar mientras se escribe; las
+    demás se buscan enteras, que es mucho más barato que expandir cada
+    prefijo. Las palabras van entre comillas, así que los operadores de
+    FTS5 escritos en el formulario (AND, NEAR, *, ...) no dan errores.
+    """
+    *words, last = terms
+    return ' '.join([f'"{term}"' for term in words] + [f'"{last}"*'])
+
+
+def text_snippet(text, terms):
+    """Fragmento marcado de text cuando no hay índice FTS5."""
+    words = text.split()
+    position = next(
+        (index for index, word in enumerate(words)
+         if any(term in word.lower() for term in terms)),
+        0
+    )
+    start = max(position - SNIPPET_TOKENS // 2, 0)
+    fragment = [
+        f'{MARK_START}{word}{MARK_END}'
+        if any(term in word.lower() for term in terms) else word
+        for word in words[start:start + SNIPPET_TOKENS]
+    ]
+    snippet = ' '.join(fragment)
+    if start > 0:
+        snippet = ELLIPSIS + snippet
+    if start + SNIPPET_TOKENS < len(words):
+        snippet += ELLIPSIS
+    return snippet
+
+
+def highlight(snippet):
+    """Escapa el fragmento y convierte las marcas en <mark>."""
+    html = escape(snippet or '')
+    html = html.replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+    return mark_safe(html)
@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.db.backends.signals import connection_created
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_migrate, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from . import auth, cache, search, sqlite, thumbnails
+from .models import (ChangeCounter, Task, TaskStat, TaskTombstone,
+                     task_stat_deltas)
+
+
+@receiver(post_save, sender=Task)
+def enqueue_thumbnails(sender, instance, raw=False, **kwargs):
+    """Encola la creación de las versiones reducidas de la imagen.
+
+    Solo si la imagen es nueva o ha cambiado: editar el resto de la
+    tarea no vuelve a encolarla. La clave de idempotencia evita dos
+    trabajos pendientes para el mismo archivo.
+    """
+    if raw or not instance.image:
+        return
+    # post_save llega antes de que save_change() actualice _loaded_image
+    if instance.image.name == getattr(instance, '_loaded_image', None):
+        return
+    thumbnails.request_thumbnails(instance.image.name)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_detail_cache(sender, instance, using, **kwargs):
+    """Borra de la caché la tarea guardada o borrada (y su slug anterior).
+
+    Se borra al confirmar la transacción: antes, otra petición podría
+    volver a guardar en la caché la fila sin el cambio.
+    """
+    slugs = (instance.slug, getattr(instance, '_loaded_slug', None))
+    transaction.on_commit(lambda: cache.invalidate(*slugs), using=using)
+    instance._loaded_slug = instance.slug
+
+
+@receiver(pre_delete, sender=Task)
+def count_deleted_task(sender, instance, using, **kwargs):
+    """Resta la tarea que se va a borrar de los contadores de TaskStat.
+
+    En pre_delete la fila aún existe, por si image o created_at no se
+    habían leído; va en la misma transacción que el borrado.
+    """
+    TaskStat.add(task_stat_deltas([instance], -1), using)
+
+
+@receiver(post_delete, sender=Task)
+def record_tombstone(sender, instance, using, **kwargs):
+    """Deja la lápida de la tarea borrada para los clientes sincronizados.
+
+    post_delete se envía dentro de la transacción del borrado.
+    """
+    TaskTombstone.objects.using(using).create(
+        task_id=instance.pk, slug=instance.slug,
+        seq=ChangeCounter.allocate(1, using))
+
+
+@receiver(post_delete, sender=Task)
+def release_image(sender, instance, using, **kwargs):
+    """Borra la imagen de la tarea borrada si ninguna otra tarea la usa.
+
+    Las tareas con la misma imagen comparten el archivo (ver
+    tasks.storage). Se comprueba al confirmar la transacción, para no
+    borrar el archivo si se deshace el borrado de la tarea.
+    """
+    if not instance.image:
+        return
+    name = instance.image.name
+
+    transaction.on_commit(
+        lambda: thumbnails.delete_unused_images([name], using), using=using)
+
+
+@receiver(post_migrate)
+def create_search_index(sender, using='default', **kwargs):
+    """Crea el índice FTS5 de las tareas después de migrate."""
+    if sender.name == 'tasks':
+        search.create_index(using)
+
+
+@receiver(post_migrate)
+def create_change_counter(sender, using='default', **kwargs):
+    """Crea las filas de los contadores de cambios y de tareas."""
+    if sender.name == 'tasks':
+        ChangeCounter.create_row(using)
+        TaskStat.create_totals(using)
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Aplica el perfil de producción a las conexiones de SQLite."""
+    if settings.TASKS_SQLITE_PROFILE:
+        sqlite.apply_profile(connection)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Borra de la caché el usuario guardado (contraseña, permisos...)."""
+    auth.invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        auth.invalidate_user(user.pk)
@@ -0,0 +1,99 @@
+"""Generación de slugs compatible con pytils.translit.slugify, pero más rápida.
+
+pytils recorre la tabla de transliteración carácter a carácter en Python
+en cada llamada. Aquí la tabla se convierte una sola vez, al importar el
+módulo, en una tabla para str.translate(); los títulos solo ASCII no se
+transliteran, y los resultados se guardan en una caché LRU acotada.
+
+Micro-benchmark: python -m tasks.slugs
+"""
+import re
+from functools import lru_cache
+
+# Necesitas instalar la librería pytils: pip install pytils.
+from pytils import translit
+
+# Número máximo de títulos distintos que se guardan en la caché
+SLUG_CACHE_SIZE = 4096
+
+AMPERSAND_RE = re.compile(r'\&amp\;|\&')
+SPACES_RE = re.compile(r'[-\s]+')
+# En ASCII, del slug de pytils solo sobreviven letras, cifras y guiones
+ASCII_DISALLOWED_RE = re.compile(r'[^a-z0-9-]')
+# pytils elimina al final todo lo que no sea [\w\s-]
+NON_WORD_RE = re.compile(r'[^\w\s-]')
+
+
+def _build_table():
+    """Convierte TRANSTABLE de pytils en una tabla para str.translate().
+
+    Cada carácter admitido por pytils se traduce directamente a su
+    resultado final (ya sin los símbolos que pytils borra al terminar).
+    Para los caracteres repetidos en TRANSTABLE gana la primera pareja,
+    igual que con las sustituciones sucesivas de pytils.
+    """
+    replacements = {}
+    for symb_in, symb_out in translit.TRANSTABLE:
+        if len(symb_in) == 1:
+            replacements.setdefault(symb_in, symb_out)
+    table = {}
+    for symb in translit.ALPHABET:
+        # Las entradas de varios caracteres ('Sch', '...') nunca
+        # coinciden con un único carácter del texto
+        if len(symb) != 1:
+            continue
+        table[ord(symb)] = NON_WORD_RE.sub('', replacements.get(symb, symb))
+    return table
+
+
+TRANSLATE_TABLE = _build_table()
+DISALLOWED_RE = re.compile(
+    '[^%s]' % ''.join(re.escape(chr(code)) for code in TRANSLATE_TABLE)
+)
+
+
+@lru_cache(maxsize=SLUG_CACHE_SIZE)
+def slugify(in_string):
+    """Devuelve el mismo slug que pytils.translit.slugify()."""
+    slug = str(in_string).lower()
+    slug = AMPERSAND_RE.sub(' and ', slug)
+    slug = SPACES_RE.sub('-', slug)
+    if slug.isascii():
+        # Sin caracteres que transliterar: basta con una expresión regular
+        return ASCII_DISALLOWED_RE.sub('', slug)
+    return DISALLOWED_RE.sub('', slug).translate(TRANSLATE_TABLE)
+
+
+def benchmark(number=20000):
+    """Compara los slugs por segundo de pytils y de este módulo."""
+    import timeit
+
+    titles = [
+        'Comprar pan y leche',
+        'Revisar el informe & enviar',
+        'Reunión con el equipo de diseño',
+        'Купить хлеб и молоко',
+        'Щука — это рыба',
+        'Tarea número 42',
+    ]
+
+    def run(function):
+        def loop():
+            for title in titles:
+                function(title)
+        seconds = min(timeit.repeat(loop, number=number // len(titles),
+                                    repeat=3))
+        return number / seconds
+
+    results = {
+        'pytils': run(translit.slugify),
+        'sin caché': run(slugify.__wrapped__),
+        'con caché': run(slugify),
+    }
+    for name, rate in results.items():
+        print(f'{name:>10}: {rate:12,.0f} slugs/s')
+    return results
+
+
+if __name__ == '__main__':
+    benchmark()
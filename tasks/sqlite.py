@@ -0,0 +1,82 @@
+"""Perfil de conexión de SQLite para producción.
+
+Con TASKS_SQLITE_PROFILE = True, cada conexión nueva a una base de
+datos SQLite en archivo recibe estos pragmas (ver la señal
+connection_created en tasks.signals):
+
+- journal_mode=WAL: los lectores no esperan a los escritores ni al
+  revés; solo las escrituras se hacen de una en una.
+- synchronous=NORMAL: con WAL no se pierde la integridad, solo puede
+  perderse la última transacción si se cae el sistema operativo.
+- busy_timeout: una escritura espera al bloqueo en lugar de fallar con
+  «database is locked».
+- cache_size y mmap_size: más páginas en memoria y lecturas sin copias.
+
+Las transacciones que escriben se abren con write_transaction() en
+lugar de atomic(): empiezan con BEGIN IMMEDIATE y toman el bloqueo de
+escritura al empezar. Una transacción diferida que lee y después
+escribe, si otro proceso ha escrito entretanto, falla al instante
+(SQLITE_BUSY_SNAPSHOT) sin respetar busy_timeout. Las transacciones de
+solo lectura siguen con atomic() y BEGIN diferido, así que no hacen
+esperar a los escritores.
+
+El mismo perfil activa CONN_MAX_AGE en settings.py, así que los pragmas
+se aplican una vez por conexión y no en cada petición.
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    # En KiB cuando es negativo: 64 MiB de caché de páginas
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def pragmas():
+    """PRAGMAS con los cambios de TASKS_SQLITE_PRAGMAS."""
+    return {**PRAGMAS, **settings.TASKS_SQLITE_PRAGMAS}
+
+
+def apply_profile(connection):
+    """Aplica los pragmas a una conexión de SQLite recién abierta."""
+    if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas().items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+    begin = connection._start_transaction_under_autocommit
+
+    def start_transaction():
+        if getattr(connection, 'begin_immediate', False):
+            connection.cursor().execute('BEGIN IMMEDIATE')
+        else:
+            begin()
+
+    # Django 2.2 no permite elegir el tipo de transacción de SQLite
+    connection._start_transaction_under_autocommit = start_transaction
+
+
+@contextmanager
+def write_transaction(using=None):
+    """atomic() para las transacciones que escriben.
+
+    Con el perfil, en SQLite empieza con BEGIN IMMEDIATE; en las demás
+    bases de datos es atomic(). Dentro de otra transacción es un punto
+    de guardado, como atomic().
+    """
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    previous = getattr(connection, 'begin_immediate', False)
+    connection.begin_immediate = True
+    try:
+        with transaction.atomic(using=using):
+            yield
+    finally:
+        connection.begin_immediate = previous
@@ -0,0 +1,77 @@
+"""Estadísticas de las tareas leídas de los contadores de TaskStat.
+
+Los contadores se actualizan en cada escritura de tareas (ver
+TaskStat), así que leerlos es una consulta por clave primaria que no
+depende del tamaño de la tabla. manage.py rebuild_task_stats los vuelve
+a calcular desde cero, por ejemplo después de escribir tareas con SQL
+directo.
+"""
+from datetime import timedelta
+
+from django.db import router
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Task, TaskStat
+from .sqlite import write_transaction
+
+
+def get_totals(using=None):
+    """{contador: valor} de TaskStat.TOTALS."""
+    using = using or router.db_for_read(TaskStat)
+    totals = dict.fromkeys(TaskStat.TOTALS, 0)
+    totals.update(
+        TaskStat.objects.using(using).filter(name__in=TaskStat.TOTALS)
+        .values_list('name', 'value'))
+    return totals
+
+
+def request_totals(request):
+    """Los totales de la petición; se leen como mucho una vez."""
+    if not hasattr(request, '_task_totals'):
+        request._task_totals = get_totals()
+    return request._task_totals
+
+
+def created_per_day(days, using=None):
+    """[(fecha, tareas creadas)] de los últimos days días, del más antiguo."""
+    using = using or router.db_for_read(TaskStat)
+    today = timezone.localdate()
+    dates = [today - timedelta(days=offset)
+             for offset in range(days - 1, -1, -1)]
+    # Un rango sobre la clave primaria: las fechas ISO se ordenan como texto
+    counts = dict(
+        TaskStat.objects.using(using)
+        .filter(name__range=(TaskStat.day_name(dates[0]),
+                             TaskStat.day_name(today)))
+        .values_list('name', 'value'))
+    return [(day, counts.get(TaskStat.day_name(day), 0)) for day in dates]
+
+
+def rebuild(using='default'):
+    """Vuelve a calcular todos los contadores a partir de la tabla de tareas.
+
+    Recorre la tabla con un GROUP BY por día, en una transacción que
+    bloquea las escrituras de tareas mientras tanto.
+    """
+    rows = (
+        Task.objects.using(using).order_by()
+        .annotate(day=TruncDate('created_at'))
+        .values('day')
+        .annotate(count=Count('id'),
+                  images=Count('id', filter=Q(image__gt='')))
+    )
+    with write_transaction(using=using):
+        # El DELETE va primero: en SQLite toma el bloqueo de escritura
+        # antes de leer las tareas
+        TaskStat.objects.using(using).all().delete()
+        counters = {name: 0 for name in TaskStat.TOTALS}
+        for row in rows:
+            counters[TaskStat.TOTAL] += row['count']
+            counters[TaskStat.WITH_IMAGE] += row['images']
+            counters[TaskStat.day_name(row['day'])] = row['count']
+        TaskStat.objects.using(using).bulk_create(
+            [TaskStat(name=name, value=value)
+             for name, value in counters.items()])
+    return counters
@@ -0,0 +1,185 @@
+"""Almacenamiento de las imágenes de las tareas por contenido.
+
+ContentAddressedStorage guarda cada archivo con el nombre del SHA-256 de
+su contenido (tasks/3f/3fa4...e1.jpg): la misma imagen subida muchas
+veces ocupa un único archivo. El hash se calcula por partes mientras se
+escribe (o mientras se recibe la subida, con los manejadores
+Hashing*UploadHandler de FILE_UPLOAD_HANDLERS), así que la memoria no
+depende del tamaño del archivo.
+
+Varias tareas pueden compartir un archivo: la señal post_delete de
+tasks.signals solo lo borra cuando ninguna otra tarea lo usa, y
+manage.py collect_images borra los archivos que ya no usa ninguna tarea
+(por ejemplo, la imagen anterior de una tarea editada).
+
+Una subida que encuentra su archivo ya guardado no lo escribe, pero la
+tarea que lo usa todavía no se ha guardado: otro proceso que acaba de
+comprobar que nadie lo usa podría borrarlo. Para evitarlo, _save()
+renueva la fecha de modificación del archivo y delete_if_old() no borra
+los archivos más recientes que TASKS_IMAGE_DELETE_GRACE segundos; las
+dos operaciones se hacen bajo el mismo bloqueo de archivo. Lo que no se
+borra entonces lo borra después collect_images.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.core.files import locks
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import (MemoryFileUploadHandler,
+                                             TemporaryFileUploadHandler)
+
+# Prefijo de los archivos a medio escribir en el directorio de subida
+TEMP_PREFIX = '.upload-'
+
+
+def content_name(name, digest):
+    """Nombre definitivo del archivo name con el hash digest."""
+    directory = posixpath.dirname(name)
+    extension = posixpath.splitext(name)[1].lower()
+    # Un subdirectorio por los dos primeros caracteres del hash, para
+    # que ningún directorio tenga cientos de miles de archivos
+    return posixpath.join(directory, digest[:2], digest + extension)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage que nombra los archivos por su contenido."""
+    def get_available_name(self, name, max_length=None):
+        # El nombre definitivo lo decide _save(): no hace falta
+        # comprobar si name existe
+        return name
+
+    @contextmanager
+    def lock(self):
+        """Bloqueo entre procesos de la reutilización y el borrado."""
+        digest = hashlib.sha256(self.location.encode()).hexdigest()[:16]
+        path = os.path.join(tempfile.gettempdir(),
+                            f'task-images-{digest}.lock')
+        with open(path, 'ab') as file:
+            locks.lock(file, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(file)
+
+    def _reuse(self, target):
+        # Con el bloqueo tomado: renueva la fecha del archivo si existe
+        if not self.exists(target):
+            return False
+        os.utime(self.path(target))
+        return True
+
+    def delete_if_old(self, name, seconds):
+        """Borra name si nadie lo ha guardado en los últimos seconds segundos.
+
+        Devuelve False si el archivo es más reciente y no se borra.
+        """
+        with self.lock():
+            try:
+                modified = os.path.getmtime(self.path(name))
+            except FileNotFoundError:
+                return True
+            if time.time() - modified < seconds:
+                return False
+            self.delete(name)
+        return True
+
+    def _save(self, name, content):
+        digest = getattr(content, 'content_hash', None)
+        if digest is not None:
+            target = content_name(name, digest)
+            with self.lock():
+                # Un duplicado no escribe nada
+                if self._reuse(target):
+                    return target
+            if hasattr(content, 'temporary_file_path'):
+                # La subida ya está en disco: se mueve, sin copiarla
+                self._make_directory(target)
+                file_move_safe(content.temporary_file_path(),
+                               self.path(target), allow_overwrite=True)
+                self._set_permissions(target)
+                return target
+        self._make_directory(name)
+        fd, temp_path = tempfile.mkstemp(
+            prefix=TEMP_PREFIX, dir=os.path.dirname(self.path(name)))
+        try:
+            sha256 = hashlib.sha256()
+            with os.fdopen(fd, 'wb') as output:
+                for chunk in content.chunks():
+                    sha256.update(chunk)
+                    output.write(chunk)
+            target = content_name(name, sha256.hexdigest())
+            with self.lock():
+                if self._reuse(target):
+                    os.remove(temp_path)
+                else:
+                    self._make_directory(target)
+                    # os.replace() es atómico: dos subidas a la vez del
+                    # mismo contenido escriben el mismo archivo
+                    os.replace(temp_path, self.path(target))
+                    self._set_permissions(target)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return target
+
+    def _make_directory(self, name):
+        directory = os.path.dirname(self.path(name))
+        if self.directory_permissions_mode is None:
+            os.makedirs(directory, exist_ok=True)
+            return
+        # makedirs() no aplica mode a los directorios intermedios
+        old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+        try:
+            os.makedirs(directory, self.directory_permissions_mode,
+                        exist_ok=True)
+        finally:
+            os.umask(old_umask)
+
+    def _set_permissions(self, name):
+        if self.file_permissions_mode is not None:
+            os.chmod(self.path(name), self.file_permissions_mode)
+
+
+task_images = ContentAddressedStorage()
+
+
+class HashingUploadHandlerMixin:
+    """Calcula el SHA-256 de la subida a medida que llegan las partes.
+
+    El archivo resultante lleva el hash en content_hash, así que
+    ContentAddressedStorage no tiene que volver a leerlo.
+    """
+    def new_file(self, *args, **kwargs):
+        # Antes de super(): MemoryFileUploadHandler lanza
+        # StopFutureHandlers cuando se queda con el archivo
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        result = super().receive_data_chunk(raw_data, start)
+        if result is None:
+            # Este manejador se queda con los datos
+            self.sha256.update(raw_data)
+        return result
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.content_hash = self.sha256.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadHandlerMixin,
+                                     MemoryFileUploadHandler):
+    """Subidas de hasta FILE_UPLOAD_MAX_MEMORY_SIZE, en memoria."""
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadHandlerMixin,
+                                        TemporaryFileUploadHandler):
+    """Subidas mayores, escritas por partes en un archivo temporal."""
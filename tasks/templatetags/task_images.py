@@ -0,0 +1,44 @@
+from django import template
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from tasks.thumbnails import FORMATS, available_thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, alt='', sizes='100vw'):
+    """<picture> con srcset de las versiones reducidas de la imagen.
+
+    Las versiones que falten se encolan (ver tasks.thumbnails); mientras
+    no hay ninguna se muestra un <img> con el original.
+    """
+    if not image:
+        return ''
+    # Las versiones tienen nombres deterministas: se guardan con el
+    # almacenamiento por defecto, no con el de Task.image, que nombra
+    # los archivos por su contenido
+    storage = default_storage
+    srcsets = {}
+    for format, width, name in available_thumbnails(image.name, storage):
+        srcsets.setdefault(format, []).append(
+            f'{storage.url(name)} {width}w')
+    if not srcsets:
+        return format_html('<img src="{}" alt="{}">', image.url, alt)
+    formats = [format for format in settings.TASKS_THUMBNAIL_FORMATS
+               if format in srcsets]
+    # El último formato es el de respaldo del <img>; los anteriores
+    # se ofrecen como <source> a los navegadores que los admitan
+    fallback = formats.pop()
+    sources = format_html_join(
+        '',
+        '<source type="{}" srcset="{}" sizes="{}">',
+        ((FORMATS[format][2], ', '.join(srcsets[format]), sizes)
+         for format in formats)
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" alt="{}"></picture>',
+        sources, image.url, ', '.join(srcsets[fallback]), sizes, alt
+    )
@@ -0,0 +1,101 @@
+from unittest import mock
+
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks import models
+from tasks.cache import (DETAIL_CACHE_VERSION, detail_cache, detail_key,
+                         get_task)
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class TaskAdminTests(TestCase):
+    def setUp(self):
+        Task.objects.bulk_create([
+            Task(title=f'Tarea {number}', text=f'Texto número {number}',
+                 slug=f'task-{number}')
+            for number in range(250)
+        ])
+        Task.objects.create(title='Reunión semanal', text='Agenda',
+                            slug='meeting')
+        self.client = Client()
+        self.client.force_login(User.objects.create_superuser(
+            username='Admin', email='admin@example.com', password='pass'))
+        self.url = reverse('admin:tasks_task_changelist')
+
+    def slugs(self, response):
+        return [task.slug for task in response.context['cl'].result_list]
+
+    def test_changelist_pages_by_cursor_without_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.slugs(response)[:2], ['meeting', 'task-249'])
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('OFFSET', sql)
+        self.assertNotIn('"tasks_task"."text"', sql)
+        cl = response.context['cl']
+        self.assertEqual(cl.full_result_count, 251)
+        next_page = self.client.get(self.url + cl.next_url())
+        self.assertEqual(self.slugs(next_page)[0], 'task-150')
+        self.assertContains(next_page, 'Anterior')
+
+    def test_table_count_reads_the_counter(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(Task.objects.total_count(), 251)
+        self.assertNotIn('COUNT', ' '.join(q['sql'] for q in queries))
+        Task.objects.filter(slug='meeting').delete_in_bulk()
+        self.assertEqual(Task.objects.total_count(), 250)
+
+    def test_search_uses_full_text_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'q': 'reunion'})
+        self.assertEqual(self.slugs(response), ['meeting'])
+        self.assertIn('MATCH', ' '.join(q['sql'] for q in queries))
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_invalid_cursor_redirects(self):
+        response = self.client.get(self.url, {'cursor': 'nope'})
+        self.assertEqual(response.status_code, 302)
+
+    def test_delete_action_deletes_in_batches(self):
+        get_task('task-1')
+        data = {'action': 'delete_tasks', 'select_across': '1', 'index': '0',
+                helpers.ACTION_CHECKBOX_NAME: ['1']}
+        confirmation = self.client.post(self.url + '?q=tarea', data)
+        self.assertContains(confirmation, 'Se borrarán 250 tareas')
+        with mock.patch('tasks.admin.QUERY_BATCH', 100), \
+                CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url + '?q=tarea', {
+                'action': 'delete_tasks', 'select_across': '1', 'post': 'yes',
+                helpers.ACTION_CHECKBOX_NAME: ['1']})
+        deletes = [q['sql'] for q in queries
+                   if q['sql'].startswith('DELETE FROM "tasks_task"')]
+        self.assertEqual(len(deletes), 3)
+        self.assertEqual(list(Task.objects.values_list('slug', flat=True)),
+                         ['meeting'])
+        self.assertIsNone(detail_cache().get(
+            detail_key('task-1'), version=DETAIL_CACHE_VERSION))
+
+    def test_delete_confirmation_does_not_count_the_table(self):
+        data = {'action': 'delete_tasks', 'select_across': '1', 'index': '0',
+                helpers.ACTION_CHECKBOX_NAME: ['1']}
+        with mock.patch.object(models.TaskQuerySet, 'total_count',
+                               return_value=5000000):
+            confirmation = self.client.post(self.url, data)
+        self.assertContains(confirmation, 'Se borrarán 5000000 tareas')
+        data['select_across'] = '0'
+        confirmation = self.client.post(self.url, data)
+        self.assertContains(confirmation, 'Se borrarán 1 tareas')
+
+    def test_default_delete_action_is_removed(self):
+        response = self.client.get(self.url)
+        self.assertNotIn('delete_selected',
+                         dict(response.context['action_form']
+                              .fields['action'].choices))
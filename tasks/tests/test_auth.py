@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from tasks.auth import user_cache, user_key
+from tasks.cache import invalidate
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class CachedAuthTests(TestCase):
+    def setUp(self):
+        user_cache().clear()
+        Task.objects.create(title='Caliente', text='Cuerpo', slug='hot')
+        self.user = User.objects.create_user(
+            username='Cached', password='contraseña-1')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.detail_url = reverse('tasks:task_detail', kwargs={'slug': 'hot'})
+        # Primera petición: el usuario queda en la caché
+        self.authorized_client.get(self.detail_url)
+        invalidate('hot')
+
+    def test_hot_detail_page_does_one_query(self):
+        """Ni django_session ni auth_user: solo la consulta de la tarea."""
+        with self.assertNumQueries(1):
+            response = self.authorized_client.get(self.detail_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_hot_list_page_does_only_its_own_queries(self):
+        # Versión de la lista, límites de la página, totales y filas
+        with self.assertNumQueries(4):
+            response = self.authorized_client.get(reverse('tasks:task_list'))
+        self.assertContains(response, 'Caliente')
+
+    def test_password_change_ends_other_sessions(self):
+        self.user.set_password('contraseña-2')
+        self.user.save()
+        self.assertIsNone(user_cache().get(user_key(self.user.pk)))
+        response = self.authorized_client.get(self.detail_url)
+        self.assertRedirects(
+            response, f'/admin/login/?next={self.detail_url}',
+            fetch_redirect_response=False)
+
+    def test_deactivated_user_is_logged_out(self):
+        self.user.is_active = False
+        self.user.save()
+        response = self.authorized_client.get(self.detail_url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_logout_forgets_cached_user(self):
+        self.assertIsNotNone(user_cache().get(user_key(self.user.pk)))
+        self.authorized_client.logout()
+        self.assertIsNone(user_cache().get(user_key(self.user.pk)))
+        response = self.authorized_client.get(self.detail_url)
+        self.assertEqual(response.status_code, 302)
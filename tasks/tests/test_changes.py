@@ -0,0 +1,157 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import changes
+from tasks.models import ChangeCounter, Task, TaskTombstone
+
+User = get_user_model()
+
+
+class ChangeSequenceTests(TestCase):
+    def test_every_write_gets_a_higher_seq(self):
+        first = Task.objects.create(title='Uno', text='Texto')
+        second = Task.objects.create(title='Dos', text='Texto')
+        self.assertLess(first.seq, second.seq)
+        first.title = 'Uno editado'
+        first.save(update_fields=['title'])
+        first.refresh_from_db()
+        self.assertGreater(first.seq, second.seq)
+
+    def test_bulk_writes_get_seqs(self):
+        tasks = Task.objects.bulk_create(
+            [Task(title=f'T{number}', text='x', slug=f't-{number}')
+             for number in range(3)])
+        self.assertEqual([task.seq for task in tasks], [1, 2, 3])
+        Task.objects.filter(slug__in=['t-0', 't-1']).update(text='y')
+        self.assertEqual(
+            list(Task.objects.order_by('slug').values_list('seq', flat=True)),
+            [4, 4, 3])
+
+    def test_deletes_leave_tombstones(self):
+        task = Task.objects.create(title='Uno', text='x', slug='one')
+        Task.objects.create(title='Dos', text='x', slug='two')
+        Task.objects.create(title='Tres', text='x', slug='three')
+        task.delete()
+        Task.objects.filter(slug__in=['two', 'three']).delete_in_bulk()
+        self.assertEqual(
+            list(TaskTombstone.objects.order_by('seq', 'slug')
+                 .values_list('slug', 'seq')),
+            [('one', 4), ('three', 5), ('two', 5)])
+        self.assertEqual(ChangeCounter.current('default'), (5, 0))
+
+    def test_failed_save_does_not_consume_seq(self):
+        Task.objects.create(title='Uno', text='x', slug='one')
+        with self.assertRaises(Exception):
+            Task.objects.create(title='Otro', text='x', slug='one')
+        self.assertEqual(ChangeCounter.current('default')[0], 1)
+
+
+class TaskChangesViewTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(User.objects.create_user(username='User'))
+        self.url = reverse('tasks:changes')
+
+    def get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_login_required(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_returns_deltas_in_batches(self):
+        for number in range(5):
+            Task.objects.create(title=f'T{number}', text='x',
+                                slug=f't-{number}')
+        first = self.get(limit=3)
+        self.assertEqual([item['slug'] for item in first['changes']],
+                         ['t-0', 't-1', 't-2'])
+        self.assertTrue(first['more'])
+        second = self.get(since=first['next'], limit=3)
+        self.assertEqual([item['slug'] for item in second['changes']],
+                         ['t-3', 't-4'])
+        self.assertFalse(second['more'])
+
+        task = Task.objects.get(slug='t-1')
+        task.text = 'editado'
+        task.save()
+        Task.objects.get(slug='t-3').delete()
+        delta = self.get(since=second['next'])
+        self.assertEqual(
+            [(item['slug'], item['deleted']) for item in delta['changes']],
+            [('t-1', False), ('t-3', True)])
+        self.assertEqual(delta['changes'][0]['text'], 'editado')
+        self.assertEqual(self.get(since=delta['next'])['changes'], [])
+
+    def test_rows_sharing_a_seq_are_not_skipped(self):
+        Task.objects.bulk_create(
+            [Task(title=f'T{number}', text='x', slug=f't-{number}')
+             for number in range(4)])
+        Task.objects.update(text='y')
+        token, seen = '', []
+        while True:
+            page = self.get(since=token, limit=1)
+            seen += [item['slug'] for item in page['changes']]
+            token = page['next']
+            if not page['more']:
+                break
+        self.assertEqual(sorted(seen), ['t-0', 't-1', 't-2', 't-3'])
+
+    def test_invalid_token(self):
+        response = self.client.get(self.url, {'since': 'nope'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_non_finite_wait_is_rejected(self):
+        for wait in ('nan', 'inf', '-inf'):
+            with self.subTest(wait=wait):
+                response = self.client.get(self.url, {'wait': wait})
+                self.assertEqual(response.status_code, 400)
+
+    def test_long_poll_waits_for_a_change(self):
+        token = self.get()['next']
+
+        def write(seconds):
+            Task.objects.create(title='Nueva', text='x', slug='new')
+
+        with mock.patch('tasks.changes.time.sleep', side_effect=write) as sleep:
+            result = self.get(since=token, wait=5)
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual([item['slug'] for item in result['changes']], ['new'])
+
+    def test_long_poll_times_out_with_the_same_token(self):
+        token = self.get()['next']
+        with mock.patch('tasks.changes.time.sleep'), \
+                mock.patch('tasks.changes.time.monotonic',
+                           side_effect=[0, 0, 10]):
+            result = self.get(since=token, wait=5)
+        self.assertEqual(result['changes'], [])
+        self.assertEqual(result['next'], token)
+
+    def test_pruned_token_is_gone(self):
+        task = Task.objects.create(title='Uno', text='x', slug='one')
+        token = self.get()['next']
+        Task.objects.create(title='Dos', text='x', slug='two')
+        task.delete()
+        TaskTombstone.objects.update(
+            deleted_at=timezone.now() - timedelta(days=60))
+        call_command('prune_tombstones', stdout=io.StringIO())
+        self.assertFalse(TaskTombstone.objects.exists())
+        response = self.client.get(self.url, {'since': token})
+        self.assertEqual(response.status_code, 410)
+        # Sin token se vuelven a descargar todas las tareas
+        self.assertEqual([item['slug'] for item in self.get()['changes']],
+                         ['two'])
+
+    def test_token_round_trip(self):
+        self.assertEqual(changes.decode_token(changes.encode_token(7, 3)),
+                         (7, 3))
+        self.assertEqual(changes.decode_token(''), (0, 0))
@@ -0,0 +1,138 @@
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from tasks.models import Task
+
+
+class ImportExportCommandsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def write_jsonl(self, name, rows):
+        with open(self.path(name), 'w', encoding='utf-8') as output:
+            for row in rows:
+                output.write(json.dumps(row, ensure_ascii=False) + '\n')
+        return self.path(name)
+
+    def test_export_then_import_round_trip(self):
+        """Lo exportado en CSV y JSONL se importa sin cambios."""
+        Task.objects.create(title='Primera', text='Uno, "dos"\ny tres')
+        Task.objects.create(title='Вторая', text='Cuerpo', slug='second')
+        expected = list(Task.objects.order_by('pk')
+                        .values_list('title', 'text', 'slug'))
+        for name in ('tasks.csv', 'tasks.jsonl'):
+            with self.subTest(name=name):
+                call_command('export_tasks', self.path(name),
+                             stderr=io.StringIO())
+                Task.objects.all().delete()
+                call_command('import_tasks', self.path(name),
+                             stderr=io.StringIO())
+                self.assertEqual(
+                    list(Task.objects.order_by('pk')
+                         .values_list('title', 'text', 'slug')),
+                    expected
+                )
+
+    def test_export_selected_fields_to_stdout(self):
+        """--fields limita las columnas exportadas."""
+        Task.objects.create(title='Tarea', text='Cuerpo', slug='tarea')
+        stdout = io.StringIO()
+        call_command('export_tasks', '--format', 'jsonl',
+                     '--fields', 'slug,title',
+                     stdout=stdout, stderr=io.StringIO())
+        self.assertEqual(json.loads(stdout.getvalue()),
+                         {'slug': 'tarea', 'title': 'Tarea'})
+
+    def test_import_resolves_duplicate_slugs(self):
+        """Los slugs repetidos reciben sufijo y los explícitos ocupados se omiten."""
+        Task.objects.create(title='Comprar pan', text='Cuerpo')
+        Task.objects.create(title='Fija', text='Cuerpo', slug='fija')
+        path = self.write_jsonl('tasks.jsonl', [
+            {'title': 'Comprar pan', 'text': 'A'},
+            {'title': 'Comprar pan', 'text': 'B'},
+            {'title': 'Otra', 'text': 'C', 'slug': 'fija'},
+            {'title': 'Nueva', 'text': 'D'},
+        ])
+        stderr = io.StringIO()
+        call_command('import_tasks', path, stderr=stderr)
+        self.assertEqual(
+            list(Task.objects.filter(text__in='ABCD')
+                 .order_by('text').values_list('text', 'slug')),
+            [('A', 'comprar-pan-2'), ('B', 'comprar-pan-3'), ('D', 'nueva')]
+        )
+        self.assertIn('Importadas 3 tareas (1 omitidas', stderr.getvalue())
+
+    def test_import_queries_do_not_grow_per_row(self):
+        """Cada lote cuesta un número fijo de consultas, no una por fila."""
+        path = self.write_jsonl('tasks.jsonl', [
+            {'title': f'Tarea {number}', 'text': 'Cuerpo'}
+            for number in range(300)
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            call_command('import_tasks', path, '--batch-size', '300',
+                         stderr=io.StringIO())
+        self.assertEqual(Task.objects.count(), 300)
+        # Un lote: slugs existentes, SAVEPOINT, los contadores de cambios
+        # y de tareas, los INSERT que permita el límite de parámetros de
+        # SQLite y RELEASE
+        self.assertLess(len(queries), 12)
+
+
+class BenchCommandTests(SimpleTestCase):
+    def test_bench_reports_every_route(self):
+        """manage.py bench mide todas las rutas sin errores."""
+        # En otro proceso: el comando crea y borra su propia base de datos
+        result = subprocess.run(
+            [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'),
+             'bench', '--tasks', '30', '--requests', '20',
+             '--concurrency', '1'],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+        )
+        report = json.loads(result.stdout)
+        self.assertEqual(set(report['routes']), {
+            'GET tasks:home', 'POST tasks:home', 'GET tasks:task_list',
+            'GET tasks:task_detail', 'GET tasks:task_added',
+            'GET static_pages:about',
+        })
+        for route, stats in report['routes'].items():
+            with self.subTest(route=route):
+                self.assertEqual(stats['requests'], 20)
+                self.assertEqual(stats['errors'], 0)
+                self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+        self.assertEqual(
+            report['routes']['POST tasks:home']['statuses'], {'302': 20})
+        self.assertEqual(
+            report['routes']['GET tasks:task_list']['queries_max'], 4)
+
+    def test_bench_write_reports_every_step(self):
+        """manage.py bench_write mide cada paso en memoria y en disco."""
+        result = subprocess.run(
+            [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'),
+             'bench_write', '--sizes', '10,50', '--number', '3',
+             '--repeat', '2'],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+        )
+        report = json.loads(result.stdout)
+        self.assertEqual(
+            [(run['storage'], run['size']) for run in report['results']],
+            [('memory', 10), ('memory', 50), ('disk', 10), ('disk', 50)])
+        for run in report['results']:
+            self.assertIn('save_generated_slug', run['steps'])
+            for stats in run['steps'].values():
+                self.assertGreater(stats['ops_per_second'], 0)
+                self.assertLessEqual(stats['min'], stats['max'])
@@ -0,0 +1,106 @@
+import gzip
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from tasks import compression
+from tasks.compression import accepted_encodings
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class AcceptEncodingTests(TestCase):
+    def test_quality_values(self):
+        self.assertEqual(accepted_encodings('gzip, deflate, br'),
+                         {'gzip', 'deflate', 'br'})
+        self.assertEqual(accepted_encodings('br;q=0, GZIP;q=0.5'), {'gzip'})
+        self.assertEqual(accepted_encodings(''), set())
+
+
+@mock.patch.object(compression, 'brotli', None)
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        caches[settings.COMPRESSION_CACHE].clear()
+        for number in range(20):
+            Task.objects.create(title=f'Tarea comprimida {number}',
+                                text='Texto', slug=f'compressed-{number}')
+        self.client = Client()
+        self.client.force_login(User.objects.create_user(username='Gzip'))
+
+    def get_list(self, **headers):
+        return self.client.get(reverse('tasks:task_list'), **headers)
+
+    def test_list_is_gzipped_once_per_etag(self):
+        plain = self.get_list()
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        with mock.patch('gzip.compress', wraps=gzip.compress) as compress:
+            first = self.get_list(HTTP_ACCEPT_ENCODING='gzip')
+            second = self.get_list(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compress.call_count, 1)
+        for response in (first, second):
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(gzip.decompress(response.content), plain.content)
+            self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(first['ETag'], 'W/' + plain['ETag'])
+        # El ETag débil sigue sirviendo para revalidar
+        not_modified = self.get_list(HTTP_ACCEPT_ENCODING='gzip',
+                                     HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_changed_list_is_compressed_again(self):
+        first = self.get_list(HTTP_ACCEPT_ENCODING='gzip')
+        Task.objects.create(title='Nueva', text='Texto', slug='nueva')
+        second = self.get_list(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotEqual(first['ETag'], second['ETag'])
+        self.assertIn(b'Nueva', gzip.decompress(second.content))
+
+    def test_error_responses_are_not_compressed(self):
+        # GET no está permitido: 405
+        response = self.client.get(
+            reverse('tasks:task_batch_create'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class PrerenderedPagesTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        override = override_settings(PRERENDER_ROOT=root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_pages_are_rendered_only_when_not_prerendered(self):
+        url = reverse('static_pages:about')
+        rendered = self.client.get(url)
+        self.assertTemplateUsed(rendered, 'static_pages/about.html')
+        call_command('prerender_pages', stdout=io.StringIO())
+        with self.assertTemplateNotUsed('static_pages/about.html'):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), rendered.content)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        not_modified = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip',
+                                       HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        plain = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(plain.status_code, 200)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(plain.content, rendered.content)
+        self.assertNotEqual(plain['ETag'], response['ETag'])
+
+    def test_task_added_page_is_prerendered(self):
+        call_command('prerender_pages', stdout=io.StringIO())
+        with self.assertTemplateNotUsed('tasks/added.html'):
+            response = self.client.get(reverse('tasks:task_added'))
+        self.assertContains(response, 'Tarea añadida con éxito')
+        self.assertEqual(response['Cache-Control'], 'no-cache, public')
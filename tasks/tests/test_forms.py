@@ -1,5 +1,6 @@
 import shutil
 import tempfile
+from unittest import mock
 
 from tasks.forms import TaskCreateForm
 from tasks.models import Task
@@ -120,3 +121,41 @@ class TaskCreateFormTests(TestCase):
     def test_title_help_text(self):
         title_help_text = TaskCreateFormTests.form.fields['title'].help_text
         self.assertEqual(title_help_text, 'Introduce el nombre de la tarea')
+
+
+class TaskCreateRaceTests(TestCase):
+    def setUp(self):
+        self.guest_client = Client()
+        Task.objects.create(title='Primera', text='Cuerpo', slug='first')
+
+    def test_slug_taken_after_validation_shows_form_error(self):
+        """Un slug ocupado entre la validación y el INSERT no produce un 500."""
+        # Simula que otra petición guarda el slug después de clean_slug()
+        with mock.patch.object(TaskCreateForm, 'clean_slug',
+                               lambda form: form.cleaned_data['slug']):
+            response = self.guest_client.post(
+                reverse('tasks:home'),
+                data={'title': 'Segunda', 'text': 'Cuerpo', 'slug': 'first'},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(
+            response,
+            'form',
+            'slug',
+            'El slug "first" ya existe, introduce un valor único'
+        )
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_same_title_twice_creates_two_tasks(self):
+        """Dos envíos con el mismo título crean dos tareas."""
+        for _ in range(2):
+            response = self.guest_client.post(
+                reverse('tasks:home'),
+                data={'title': 'Repetida', 'text': 'Cuerpo'},
+            )
+            self.assertRedirects(response, reverse('tasks:task_added'))
+        self.assertEqual(
+            sorted(Task.objects.filter(title='Repetida')
+                   .values_list('slug', flat=True)),
+            ['repetida', 'repetida-2']
+        )
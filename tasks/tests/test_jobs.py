@@ -0,0 +1,107 @@
+import io
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from tasks import jobs
+from tasks.models import Job
+
+CALLS = []
+
+
+@jobs.register('test.record')
+def record(value):
+    CALLS.append(value)
+
+
+@jobs.register('test.flaky')
+def flaky(failures):
+    CALLS.append('flaky')
+    if CALLS.count('flaky') <= failures:
+        raise ValueError('Fallo temporal')
+
+
+@override_settings(TASKS_JOBS_RETRY_DELAY=0, TASKS_JOBS_MAX_ATTEMPTS=3)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueued_job_runs_with_payload(self):
+        """El trabajo encolado se ejecuta con sus datos."""
+        jobs.enqueue('test.record', {'value': 42})
+        self.assertEqual(jobs.run_pending(), 1)
+        self.assertEqual(CALLS, [42])
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+
+    def test_idempotency_key_enqueues_once(self):
+        """Dos trabajos con la misma clave solo se encolan una vez."""
+        jobs.enqueue('test.record', {'value': 1}, key='same')
+        jobs.enqueue('test.record', {'value': 2}, key='same')
+        jobs.run_pending()
+        self.assertEqual(CALLS, [1])
+
+    def test_idempotency_key_is_released_when_done(self):
+        """Al terminar el trabajo, la misma clave se puede volver a encolar."""
+        jobs.enqueue('test.record', {'value': 1}, key='same')
+        jobs.run_pending()
+        self.assertIsNone(Job.objects.get().idempotency_key)
+        jobs.enqueue('test.record', {'value': 2}, key='same')
+        jobs.run_pending()
+        self.assertEqual(CALLS, [1, 2])
+
+    def test_failed_job_is_retried(self):
+        """Un trabajo que falla se reintenta hasta terminar bien."""
+        jobs.enqueue('test.flaky', {'failures': 2})
+        with self.assertLogs('tasks.jobs', 'ERROR'):
+            jobs.run_pending()
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.attempts, 3)
+
+    def test_job_fails_after_max_attempts(self):
+        """Tras max_attempts fallos el trabajo queda como fallido."""
+        jobs.enqueue('test.flaky', {'failures': 10})
+        with self.assertLogs('tasks.jobs', 'ERROR'):
+            jobs.run_pending()
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 3)
+        self.assertIn('Fallo temporal', job.last_error)
+
+    def test_delayed_job_waits(self):
+        """Un trabajo con retraso no se ejecuta antes de tiempo."""
+        jobs.enqueue('test.record', {'value': 1}, delay=60)
+        self.assertEqual(jobs.run_pending(), 0)
+
+    def test_abandoned_job_is_claimed_again(self):
+        """Un trabajo bloqueado por un proceso caído se vuelve a ejecutar."""
+        jobs.enqueue('test.record', {'value': 7})
+        Job.objects.update(
+            status=Job.RUNNING,
+            attempts=1,
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        jobs.run_pending()
+        self.assertEqual(CALLS, [7])
+
+    def test_job_is_claimed_only_once(self):
+        """Un trabajo bloqueado no lo puede tomar otro proceso."""
+        jobs.enqueue('test.record', {'value': 1})
+        self.assertIsNotNone(jobs.claim_next())
+        self.assertIsNone(jobs.claim_next())
+
+
+class WorkerTests(TransactionTestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_run_worker_drains_queue_with_thread_pool(self):
+        """run_worker --drain ejecuta todos los trabajos y termina."""
+        for value in range(20):
+            jobs.enqueue('test.record', {'value': value})
+        call_command('run_worker', '--drain', '--concurrency', '4',
+                     '--poll-interval', '0.01', stderr=io.StringIO())
+        self.assertEqual(sorted(CALLS), list(range(20)))
+        self.assertFalse(Job.objects.exclude(status=Job.DONE).exists())
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+
+from todo.media import RangeNotSatisfiable, parse_range
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = bytes(range(256)) * 40
+
+User = get_user_model()
+
+
+class ParseRangeTests(TestCase):
+    def test_single_ranges(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-5000', 1000), (0, 999))
+        self.assertEqual(parse_range('bytes=990-2000', 1000), (990, 999))
+
+    def test_ignored_ranges_send_whole_file(self):
+        for header in (None, 'items=0-1', 'bytes=0-1,5-6', 'bytes=5-1',
+                       'bytes=a-b', 'bytes=-', 'bytes=1'):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 1000))
+
+    def test_unsatisfiable_ranges(self):
+        for header in ('bytes=1000-', 'bytes=-0'):
+            with self.subTest(header=header):
+                with self.assertRaises(RangeNotSatisfiable):
+                    parse_range(header, 1000)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'tasks'), exist_ok=True)
+        with open(os.path.join(TEMP_MEDIA_ROOT, 'tasks', 'foto.jpg'),
+                  'wb') as file:
+            file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(User.objects.create_user(username='Viewer'))
+
+    def get(self, path='/media/tasks/foto.jpg', **headers):
+        return self.client.get(path, **headers)
+
+    def test_anonymous_user_is_redirected(self):
+        response = Client().get('/media/tasks/foto.jpg')
+        self.assertEqual(response.status_code, 302)
+
+    def test_whole_file_with_cache_headers(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+        not_modified = self.get(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_byte_range(self):
+        response = self.get(HTTP_RANGE='bytes=100-299')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content),
+                         CONTENT[100:300])
+        self.assertEqual(response['Content-Length'], '200')
+        self.assertEqual(response['Content-Range'],
+                         f'bytes 100-299/{len(CONTENT)}')
+
+    def test_if_range_with_old_etag_sends_whole_file(self):
+        response = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"viejo"')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE=f'bytes={len(CONTENT)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_missing_and_outside_files_return_404(self):
+        self.assertEqual(self.get('/media/tasks/otra.jpg').status_code, 404)
+        self.assertEqual(self.get('/media/tasks/').status_code, 404)
+        self.assertEqual(
+            self.get('/media/../todo/settings.py').status_code, 404)
+
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect')
+    def test_x_accel_redirect(self):
+        response = self.get('/media/tasks/foto%20nueva.jpg')
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/protected-media/tasks/foto%20nueva.jpg')
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+
+    @override_settings(MEDIA_SENDFILE='x-sendfile')
+    def test_x_sendfile(self):
+        response = self.get()
+        self.assertEqual(response['X-Sendfile'],
+                         os.path.join(TEMP_MEDIA_ROOT, 'tasks', 'foto.jpg'))
@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from tasks.models import Task
+from todo import metrics
+
+User = get_user_model()
+
+
+class MetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        Task.objects.create(title='Medida', text='Cuerpo', slug='measured')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(
+            User.objects.create_user(username='Observer'))
+
+    def test_records_request_by_url_name(self):
+        """Se miden el tiempo, las consultas SQL y la plantilla por URL."""
+        self.authorized_client.get(reverse('tasks:task_list'))
+        view = 'tasks:task_list'
+        for histogram in metrics.HISTOGRAMS:
+            with self.subTest(histogram=histogram.name):
+                self.assertEqual(histogram.count(view), 1)
+        # Sesión, usuario y las consultas de la lista
+        counts, total = metrics.SQL_QUERIES._series[view]
+        self.assertGreaterEqual(total, 3)
+        self.assertGreater(metrics.TEMPLATE_DURATION._series[view][1], 0)
+        self.assertGreater(metrics.SQL_DURATION._series[view][1], 0)
+
+    def test_unresolved_urls_share_a_label(self):
+        self.client.get('/no/existe/')
+        self.assertEqual(
+            metrics.REQUEST_DURATION.count(metrics.UNRESOLVED), 1)
+
+    def test_metrics_endpoint(self):
+        """/metrics/ publica los histogramas en el formato de Prometheus."""
+        self.authorized_client.get(
+            reverse('tasks:task_detail', kwargs={'slug': 'measured'}))
+        self.client.force_login(
+            User.objects.create_user(username='Staff', is_staff=True))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        content = response.content.decode()
+        self.assertIn(
+            '# TYPE todo_request_duration_seconds histogram', content)
+        self.assertIn(
+            'todo_request_duration_seconds_bucket'
+            '{view="tasks:task_detail",le="+Inf"} 1', content)
+        self.assertIn(
+            'todo_request_sql_queries_count{view="tasks:task_detail"} 1',
+            content)
+
+    def test_metrics_endpoint_is_private(self):
+        url = reverse('metrics')
+        # Detrás de nginx todas las peticiones llegan desde 127.0.0.1
+        response = self.client.get(url, REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 403)
+        staff = User.objects.create_user(username='Staff', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_metrics_endpoint_accepts_token(self):
+        url = reverse('metrics')
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_SLOW_REQUEST_SECONDS=0)
+    def test_slow_request_log_includes_sql(self):
+        with self.assertLogs('todo.metrics', 'WARNING') as logs:
+            self.authorized_client.get(reverse('tasks:task_list'))
+        self.assertIn('tasks:task_list', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+
+class HistogramTests(TestCase):
+    def test_buckets_are_cumulative(self):
+        histogram = metrics.Histogram('test_seconds', 'Prueba.', (0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe('a"b', value)
+        self.assertEqual(histogram.collect()[2:], [
+            'test_seconds_bucket{view="a\\"b",le="0.1"} 2',
+            'test_seconds_bucket{view="a\\"b",le="1"} 3',
+            'test_seconds_bucket{view="a\\"b",le="+Inf"} 4',
+            'test_seconds_sum{view="a\\"b"} 3.65',
+            'test_seconds_count{view="a\\"b"} 4',
+        ])
@@ -1,7 +1,10 @@
 # tasks/tests/tests_models.py
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-from tasks.models import Task
+from tasks.forms import TaskCreateForm
+from tasks.models import SlugConflictError, Task, is_slug_conflict
 
 
 class TaskModelTest(TestCase):
@@ -70,3 +73,69 @@ class TaskModelTest(TestCase):
         task = TaskModelTest.task
         expected_object_name = task.title
         self.assertEqual(expected_object_name, str(task))
+
+
+class TaskSlugAllocationTests(TestCase):
+    def test_same_title_gets_numbered_slugs(self):
+        """Los títulos repetidos reciben los slugs title, title-2, title-3."""
+        slugs = [
+            Task.objects.create(title='Comprar pan', text='Cuerpo').slug
+            for _ in range(3)
+        ]
+        self.assertEqual(
+            slugs, ['comprar-pan', 'comprar-pan-2', 'comprar-pan-3'])
+
+    def test_insert_without_conflict_is_single_query(self):
+        """Sin colisión, crear una tarea es un único INSERT.
+
+        Los contadores de cambios (ver tasks.changes) y de tareas (ver
+        tasks.stats) se actualizan en sus propias tablas.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            Task.objects.create(title='Tarea única', text='Cuerpo')
+        statements = [query['sql'] for query in queries
+                      if '"tasks_task"' in query['sql']]
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith('INSERT'))
+
+    def test_slug_taken_after_validation_is_suffixed(self):
+        """Si otra petición ocupa el slug entre validar y guardar, no hay error."""
+        form = TaskCreateForm(data={'title': 'Carrera', 'text': 'Cuerpo'})
+        self.assertTrue(form.is_valid())
+        # Otra petición concurrente guarda una tarea con el mismo título
+        Task.objects.create(title='Carrera', text='Cuerpo')
+        task = form.save()
+        self.assertEqual(task.slug, 'carrera-2')
+
+    def test_long_slug_suffix_fits_max_length(self):
+        """El sufijo no hace que el slug supere max_length."""
+        first = Task.objects.create(title='a' * 150, text='Cuerpo')
+        second = Task.objects.create(title='a' * 150, text='Cuerpo')
+        self.assertEqual(len(first.slug), 100)
+        self.assertEqual(second.slug, 'a' * 98 + '-2')
+
+    def test_explicit_taken_slug_raises_conflict(self):
+        """Un slug explícito ocupado no se modifica: se informa del conflicto."""
+        Task.objects.create(title='Uno', text='Cuerpo', slug='fijo')
+        with self.assertRaises(SlugConflictError):
+            Task.objects.create(title='Dos', text='Cuerpo', slug='fijo')
+
+    def test_title_without_slug_characters_gets_fallback(self):
+        """Un título sin caracteres válidos para el slug no deja el slug vacío."""
+        slugs = [Task.objects.create(title='¡¿?!', text='Cuerpo').slug
+                 for _ in range(2)]
+        self.assertEqual(slugs, ['tarea', 'tarea-2'])
+        tasks = [Task(title='***', text='Cuerpo') for _ in range(2)]
+        Task.objects.allocate_slugs(tasks)
+        self.assertEqual([task.slug for task in tasks],
+                         ['tarea-3', 'tarea-4'])
+
+    def test_slug_conflict_is_detected_by_column(self):
+        """Solo la restricción UNIQUE de tasks_task.slug es un conflicto."""
+        self.assertTrue(is_slug_conflict(IntegrityError(
+            'UNIQUE constraint failed: tasks_task.slug')))
+        self.assertFalse(is_slug_conflict(IntegrityError(
+            'UNIQUE constraint failed: tasks_job.idempotency_key '
+            "(thumbnails:tasks/slug.png)")))
+        self.assertFalse(is_slug_conflict(IntegrityError(
+            'NOT NULL constraint failed: tasks_tasktombstone.slug')))
@@ -0,0 +1,113 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.cache import detail_cache
+from tasks.models import Task
+from tasks.routers import PRIMARY_COOKIE
+
+User = get_user_model()
+
+
+@override_settings(TASKS_READ_DATABASES=['replica'])
+class ReadReplicaTests(TransactionTestCase):
+    def setUp(self):
+        # Una réplica de verdad en un archivo aparte, que solo se
+        # actualiza con manage.py sync_replicas
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        connections.databases['replica'] = {
+            **connections.databases['default'],
+            'NAME': os.path.join(directory, 'replica.sqlite3'),
+        }
+        self.addCleanup(self.remove_replica)
+        detail_cache().clear()
+        self.user = User.objects.create_user(username='Reader')
+        self.client = Client()
+        self.client.force_login(self.user)
+        Task.objects.create(title='Copiada', text='Cuerpo', slug='copied')
+        self.sync()
+
+    def remove_replica(self):
+        connections['replica'].close()
+        del connections.databases['replica']
+        delattr(connections._connections, 'replica')
+
+    def sync(self):
+        call_command('sync_replicas', stdout=io.StringIO())
+
+    def detail(self, slug):
+        return self.client.get(
+            reverse('tasks:task_detail', kwargs={'slug': slug}))
+
+    def test_views_read_tasks_from_replica(self):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(reverse('tasks:task_list'))
+            self.assertContains(response, 'Copiada')
+            response = self.client.get(reverse('tasks:task_export'))
+            self.assertIn(b'copied', b''.join(response.streaming_content))
+        self.assertTrue(replica.captured_queries)
+        # Lo que no se ha copiado todavía no se ve
+        Task.objects.create(title='Sin copiar', text='Cuerpo', slug='fresh')
+        self.assertNotContains(self.client.get(reverse('tasks:task_list')),
+                               'Sin copiar')
+        self.sync()
+        self.assertContains(self.client.get(reverse('tasks:task_list')),
+                            'Sin copiar')
+
+    def test_detail_cache_is_filled_from_primary(self):
+        """La caché es común: no guarda filas antiguas de la réplica."""
+        task = Task.objects.get(slug='copied')
+        task.title = 'Editada sin copiar'
+        task.save()
+        with CaptureQueriesContext(connections['replica']) as replica:
+            self.assertContains(self.detail('copied'), 'Editada sin copiar')
+        self.assertEqual(replica.captured_queries, [])
+        other = Client()
+        other.force_login(self.user)
+        self.assertContains(
+            other.get(reverse('tasks:task_detail', kwargs={'slug': 'copied'})),
+            'Editada sin copiar')
+
+    def test_sessions_and_writes_use_primary(self):
+        """Sesión, usuario, validación y guardado no van a la réplica."""
+        # Solo en default: la réplica no sabe que el slug está ocupado
+        Task.objects.create(title='Nueva', text='Cuerpo', slug='taken')
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.post(
+                reverse('tasks:home'),
+                {'title': 'Otra', 'text': 'Cuerpo', 'slug': 'taken'})
+        self.assertFormError(
+            response, 'form', 'slug',
+            'El slug "taken" ya existe, introduce un valor único')
+        self.assertEqual(replica.captured_queries, [])
+
+    def test_writer_reads_own_writes(self):
+        """Tras un POST, ese navegador lee de default durante un tiempo."""
+        response = self.client.post(
+            reverse('tasks:home'),
+            {'title': 'Recién creada', 'text': 'Cuerpo', 'slug': 'mine'})
+        self.assertRedirects(response, reverse('tasks:task_added'))
+        self.assertIn(PRIMARY_COOKIE, response.cookies)
+        self.assertContains(self.client.get(reverse('tasks:task_list')),
+                            'Recién creada')
+        other = Client()
+        other.force_login(self.user)
+        self.assertNotContains(other.get(reverse('tasks:task_list')),
+                               'Recién creada')
+
+    def test_loaded_from_replica_saves_to_primary(self):
+        task = Task.objects.using('replica').get(slug='copied')
+        task.title = 'Editada'
+        task.save()
+        self.assertEqual(Task.objects.get(slug='copied').title, 'Editada')
+        self.assertEqual(
+            Task.objects.using('replica').get(slug='copied').title, 'Copiada')
@@ -0,0 +1,109 @@
+import io
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from tasks import search
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class TaskSearchTests(TestCase):
+    def setUp(self):
+        self.assertTrue(search.fts_available())
+        Task.objects.create(
+            title='Reunión con el equipo',
+            text='Preparar la agenda de la reunión semanal')
+        Task.objects.create(
+            title='Comprar pan',
+            text='Después de la reunión pasar por la panadería')
+        Task.objects.create(title='Otra', text='Nada que ver <b>aquí</b>')
+
+    def titles(self, query):
+        return [task.title for task in Task.objects.search(query)]
+
+    def test_title_matches_rank_first(self):
+        """bm25 pondera más el título; sin acentos también coincide."""
+        self.assertEqual(
+            self.titles('reunion'), ['Reunión con el equipo', 'Comprar pan'])
+
+    def test_all_words_and_prefixes(self):
+        """Se exigen todas las palabras; la última puede estar incompleta."""
+        self.assertEqual(self.titles('reunión panad'), ['Comprar pan'])
+        self.assertEqual(self.titles('reun panadería'), [])
+        self.assertEqual(self.titles('reunión inexistente'), [])
+
+    def test_operators_are_not_syntax(self):
+        """La sintaxis de FTS5 escrita por el usuario no da errores."""
+        for query in ('"reunión', 'NEAR(', 'equipo AND', '*', '  '):
+            with self.subTest(query=query):
+                list(Task.objects.search(query))
+
+    def test_index_follows_changes(self):
+        """Los disparadores actualizan el índice también en bloque."""
+        task = Task.objects.get(title='Otra')
+        task.text = 'Ahora habla de la cometa'
+        task.save()
+        Task.objects.bulk_create([Task(title='Cometa roja', slug='kite')])
+        self.assertEqual(
+            sorted(self.titles('cometa')), ['Cometa roja', 'Otra'])
+        Task.objects.filter(slug='kite').update(title='Globo')
+        Task.objects.filter(pk=task.pk).delete()
+        self.assertEqual(self.titles('cometa'), [])
+        self.assertEqual(self.titles('globo'), ['Globo'])
+
+    @override_settings(TASKS_SEARCH_CANDIDATES=1)
+    def test_only_recent_candidates_are_ranked(self):
+        """Solo se ordenan las coincidencias más recientes."""
+        self.assertEqual(self.titles('reunión'), ['Comprar pan'])
+
+    def test_fallback_without_fts(self):
+        """Sin FTS5 se busca con icontains y el mismo criterio."""
+        with mock.patch('tasks.search.fts_available', return_value=False):
+            self.assertEqual(
+                sorted(self.titles('reunión')),
+                ['Comprar pan', 'Reunión con el equipo'])
+            self.assertEqual(self.titles('reunión panadería'), ['Comprar pan'])
+
+    def test_snippet_is_escaped_and_highlighted(self):
+        snippet = Task.objects.search('aquí').get().snippet
+        self.assertEqual(
+            search.highlight(snippet),
+            'Nada que ver &lt;b&gt;<mark>aquí</mark>&lt;/b&gt;')
+        self.assertEqual(
+            search.highlight(search.text_snippet('Ver <i>aquí</i>', ['aquí'])),
+            'Ver <mark>&lt;i&gt;aquí&lt;/i&gt;</mark>')
+
+    def test_rebuild_command(self):
+        """rebuild_search_index vuelve a indexar todas las tareas."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {search.FTS_TABLE}({search.FTS_TABLE}) "
+                "VALUES ('delete-all')")
+        self.assertEqual(self.titles('reunion'), [])
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        self.assertEqual(len(self.titles('reunion')), 2)
+
+    def test_search_view(self):
+        client = Client()
+        client.force_login(User.objects.create_user(username='Searcher'))
+        response = client.get(reverse('tasks:task_search'), {'q': 'panadería'})
+        self.assertContains(response, 'Comprar pan')
+        self.assertContains(response, '<mark>panadería</mark>')
+        self.assertNotContains(response, 'Reunión con el equipo')
+
+
+    def test_query_plan_uses_index(self):
+        """La búsqueda parte del índice FTS5, no recorre tasks_task."""
+        queryset = Task.objects.search('reunión')
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn(f'{search.FTS_TABLE} VIRTUAL TABLE', plan)
+        self.assertNotIn('SCAN tasks_task ', plan + ' ')
@@ -0,0 +1,62 @@
+import random
+
+from django.test import SimpleTestCase
+from pytils.translit import slugify as pytils_slugify
+
+from tasks.slugs import slugify
+
+TITLES = [
+    'Comprar pan y leche',
+    'I am a str',
+    'Revisar el informe & enviar',
+    'Tom &amp; Jerry',
+    'Reunión con el equipo de diseño',
+    'Año nuevo, vida nueva: ¡organízate!',
+    '¿Qué tareas quedan pendientes?',
+    'Pingüino   en  la   nieve',
+    'Niño_pequeño-grande',
+    'Купить хлеб и молоко',
+    'Щука — это рыба',
+    'Съешь же ещё этих мягких французских булок',
+    'ЁЖИК В ТУМАНЕ',
+    '«Война и мир» — Лев Толстой',
+    'Задача № 42…',
+    'Mañana: купить ёлку',
+    '   пробелы   по краям   ',
+    '',
+]
+
+
+class SlugifyTests(SimpleTestCase):
+    def test_same_output_as_pytils(self):
+        """El slug coincide byte a byte con el de pytils."""
+        for title in TITLES:
+            with self.subTest(title=title):
+                self.assertEqual(
+                    slugify(title).encode(),
+                    pytils_slugify(title).encode()
+                )
+
+    def test_same_output_as_pytils_for_random_text(self):
+        """Coincide también con texto aleatorio de latín y cirílico."""
+        alphabet = (
+            'abcxyzABCXYZ0189 -_&;.,!?\'"`#\t\n'
+            'áéíóúüñÁÉÍÓÚÜÑ¿¡'
+            'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+            'АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ'
+            '«»“”‘’–—‒−…№'
+        )
+        generator = random.Random(42)
+        for _ in range(2000):
+            title = ''.join(generator.choice(alphabet)
+                            for _ in range(generator.randint(0, 40)))
+            with self.subTest(title=title):
+                self.assertEqual(slugify.__wrapped__(title),
+                                 pytils_slugify(title))
+
+    def test_result_is_cached(self):
+        """Los títulos repetidos se sirven desde la caché."""
+        slugify.cache_clear()
+        slugify('Tarea repetida')
+        slugify('Tarea repetida')
+        self.assertEqual(slugify.cache_info().hits, 1)
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+
+from django.db import OperationalError, connection, connections, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+from tasks.sqlite import write_transaction
+
+# Sin espera: un lector bloqueado falla al instante en lugar de esperar
+NO_WAIT = {'busy_timeout': 0}
+ROWS = 20000
+
+
+class SQLiteProfileTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, 'profile.sqlite3')
+
+    def open(self, pragmas=None):
+        """Conexión nueva a la base de datos en archivo del test."""
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': self.path}, 'profile')
+        self.addCleanup(wrapper.close)
+        with wrapper.cursor() as cursor:
+            for name, value in (pragmas or {}).items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(TASKS_SQLITE_PROFILE=True)
+    def test_profile_pragmas(self):
+        wrapper = self.open()
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 5000)
+        self.assertEqual(self.pragma(wrapper, 'cache_size'), -64000)
+
+    def test_profile_is_opt_in(self):
+        wrapper = self.open()
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+
+    def bulk_write_while_reading(self, pragmas=None):
+        """Escribe ROWS filas en una transacción y lee entre cada bloque.
+
+        Devuelve lo que ha contado el lector en cada lectura.
+        """
+        writer = self.open(pragmas)
+        with writer.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (name TEXT)')
+        reader = self.open(pragmas)
+        counts = []
+        with writer.cursor() as cursor:
+            writer._start_transaction_under_autocommit()
+            for start in range(0, ROWS, 1000):
+                cursor.executemany(
+                    'INSERT INTO item (name) VALUES (%s)',
+                    [(f'item {number}',)
+                     for number in range(start, start + 1000)])
+                with reader.cursor() as read:
+                    read.execute('SELECT COUNT(*) FROM item')
+                    counts.append(read.fetchone()[0])
+            cursor.execute('COMMIT')
+        with reader.cursor() as read:
+            read.execute('SELECT COUNT(*) FROM item')
+            counts.append(read.fetchone()[0])
+        return counts
+
+    @override_settings(TASKS_SQLITE_PROFILE=True, TASKS_SQLITE_PRAGMAS=NO_WAIT)
+    def test_readers_keep_going_during_bulk_write(self):
+        """Con WAL, el lector ve la versión anterior sin esperar."""
+        counts = self.bulk_write_while_reading()
+        self.assertEqual(counts, [0] * (ROWS // 1000) + [ROWS])
+
+    def test_readers_block_without_wal(self):
+        """Sin WAL, la escritura que no cabe en la caché bloquea al lector."""
+        with self.assertRaisesMessage(OperationalError, 'locked'):
+            self.bulk_write_while_reading({'cache_size': 10, **NO_WAIT})
+
+    def use(self, wrapper):
+        """Registra la conexión con su alias para usar atomic(using=...)."""
+        connections[wrapper.alias] = wrapper
+        self.addCleanup(delattr, connections._connections, wrapper.alias)
+
+    @override_settings(TASKS_SQLITE_PROFILE=True, TASKS_SQLITE_PRAGMAS=NO_WAIT)
+    def test_write_transactions_take_the_write_lock(self):
+        """write_transaction() toma el bloqueo de escritura al empezar."""
+        first, second = self.open(), self.open()
+        self.use(first)
+        with write_transaction(using=first.alias):
+            with self.assertRaisesMessage(OperationalError, 'locked'):
+                second.cursor().execute('BEGIN IMMEDIATE')
+
+    @override_settings(TASKS_SQLITE_PROFILE=True, TASKS_SQLITE_PRAGMAS=NO_WAIT)
+    def test_read_transactions_do_not_block_writers(self):
+        """atomic() sigue empezando con BEGIN diferido."""
+        first, second = self.open(), self.open()
+        self.use(first)
+        with transaction.atomic(using=first.alias):
+            self.pragma(first, 'user_version')
+            second.cursor().execute('BEGIN IMMEDIATE')
+            second.cursor().execute('ROLLBACK')
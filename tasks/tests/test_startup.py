@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.template import Engine, engines
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from todo import startup
+
+CACHED_LOADERS = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+
+class WarmUpTests(SimpleTestCase):
+    def test_project_templates_are_compiled_once(self):
+        engine = Engine(dirs=[os.path.join(settings.BASE_DIR, 'templates')],
+                        loaders=CACHED_LOADERS,
+                        libraries=engines['django'].engine.libraries)
+        names = startup.project_templates(engine)
+        self.assertIn('tasks/task_list.html', names)
+        self.assertIn('static_pages/about.html', names)
+        # Las plantillas del admin de Django no se precargan
+        self.assertNotIn('admin/base.html', names)
+
+        self.assertEqual(startup.warm_templates(engine), len(names))
+        cache = engine.template_loaders[0].get_template_cache
+        self.assertIn('tasks/task_list.html', cache)
+
+    def test_urls(self):
+        count = startup.warm_urls()
+        self.assertGreater(count, 5)
+        self.assertEqual(reverse('tasks:task_list'), '/task/')
+
+    def test_warm_up_report(self):
+        report = startup.warm_up()
+        self.assertEqual(
+            set(report),
+            {'templates', 'form_widgets', 'urls', 'prerendered', 'seconds'})
+        self.assertGreater(report['templates'], 0)
+
+
+class StartupProfileCommandTests(SimpleTestCase):
+    def test_reports_imports_and_first_requests(self):
+        """manage.py startup_profile mide un proceso nuevo."""
+        result = subprocess.run(
+            [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'),
+             'startup_profile', '--top', '3'],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+        )
+        report = json.loads(result.stdout)
+        self.assertGreater(report['application_seconds'], 0)
+        self.assertGreater(report['imports']['modules'], 0)
+        self.assertEqual(len(report['imports']['slowest']), 3)
+        self.assertEqual(
+            [request['status'] for request in report['requests']],
+            [200, 200, 200])
+        # El proceso web no importa lo que solo usan los trabajos
+        # en segundo plano
+        packages = {item['package'] for item in report['imports']['packages']}
+        self.assertNotIn('PIL', packages)
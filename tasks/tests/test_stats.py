@@ -0,0 +1,94 @@
+import io
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import stats
+from tasks.models import Task, TaskStat
+
+User = get_user_model()
+
+
+class TaskStatCountersTests(TestCase):
+    def assertCountersMatchRebuild(self):
+        """Los contadores incrementales coinciden con recalcularlos."""
+        counters = dict(TaskStat.objects.exclude(value=0)
+                        .values_list('name', 'value'))
+        rebuilt = {name: value for name, value in
+                   stats.rebuild().items() if value}
+        self.assertEqual(counters, rebuilt)
+        return rebuilt
+
+    def test_counters_follow_every_write_path(self):
+        today = TaskStat.day_name(timezone.localdate())
+        task = Task.objects.create(title='Uno', text='x', slug='one',
+                                   image='tasks/aa/a.png')
+        Task.objects.create(title='Dos', text='x', slug='two')
+        Task.objects.bulk_create(
+            [Task(title=f'T{number}', text='x', slug=f't-{number}')
+             for number in range(4)])
+        self.assertEqual(stats.get_totals(),
+                         {TaskStat.TOTAL: 6, TaskStat.WITH_IMAGE: 1})
+
+        Task.objects.filter(slug__in=['t-0', 't-1']).update(
+            image='tasks/bb/b.png')
+        task.image = ''
+        task.save()
+        two = Task.objects.only('id', 'title').get(slug='two')
+        two.title = 'Dos editada'
+        two.save()
+        self.assertEqual(stats.get_totals()[TaskStat.WITH_IMAGE], 2)
+
+        Task.objects.get(slug='t-0').delete()
+        # created_at no se ha leído
+        Task.objects.only('id', 'slug', 'image').get(slug='t-2').delete()
+        Task.objects.filter(slug__in=['t-1', 't-3']).delete_in_bulk()
+        rebuilt = self.assertCountersMatchRebuild()
+        self.assertEqual(rebuilt, {TaskStat.TOTAL: 2, today: 2})
+
+    def test_created_per_day(self):
+        task = Task.objects.create(title='Uno', text='x')
+        Task.objects.filter(pk=task.pk).update(
+            created_at=timezone.now() - timedelta(days=2))
+        Task.objects.create(title='Dos', text='x')
+        stats.rebuild()
+        per_day = stats.created_per_day(3)
+        self.assertEqual([count for _, count in per_day], [1, 0, 1])
+        self.assertEqual(per_day[-1][0], timezone.localdate())
+
+    def test_rebuild_command(self):
+        Task.objects.create(title='Uno', text='x')
+        TaskStat.objects.update(value=0)
+        output = io.StringIO()
+        call_command('rebuild_task_stats', stdout=output)
+        self.assertIn('1 tareas', output.getvalue())
+        self.assertEqual(stats.get_totals()[TaskStat.TOTAL], 1)
+
+
+class TaskStatsViewTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(User.objects.create_user(username='User'))
+        Task.objects.create(title='Uno', text='x', slug='one')
+
+    def test_stats_view_does_not_scan_tasks(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('tasks:stats'), {'days': 7})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data[TaskStat.TOTAL], 1)
+        self.assertEqual(len(data['created_per_day']), 7)
+        self.assertEqual(data['created_per_day'][-1]['count'], 1)
+        self.assertFalse(any('"tasks_task"' in query['sql']
+                             for query in queries))
+
+    def test_task_list_header_count(self):
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertContains(response, '1 tareas, 0 con imagen')
@@ -0,0 +1,177 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import time
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+from PIL import Image
+
+from tasks.models import Task
+from tasks.storage import task_images
+from tasks.thumbnails import (generate_thumbnails, manifest_name,
+                              thumbnail_name)
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+
+def png_bytes(color='navy'):
+    output = BytesIO()
+    Image.new('RGB', (40, 30), color).save(output, 'PNG')
+    return output.getvalue()
+
+
+def stored_files():
+    return sorted(
+        os.path.relpath(os.path.join(directory, filename), TEMP_MEDIA_ROOT)
+        for directory, _, filenames in os.walk(TEMP_MEDIA_ROOT)
+        for filename in filenames
+    )
+
+
+class MediaRootMixin:
+    def setUp(self):
+        super().setUp()
+        os.makedirs(TEMP_MEDIA_ROOT, exist_ok=True)
+        self.addCleanup(shutil.rmtree, TEMP_MEDIA_ROOT, ignore_errors=True)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, TASKS_THUMBNAIL_WIDTHS=(20,),
+                   TASKS_THUMBNAIL_FORMATS=('jpeg',))
+class ContentAddressedStorageTests(MediaRootMixin, TestCase):
+    def create_task(self, content, filename='foto.PNG'):
+        return Task.objects.create(
+            title='Con imagen', text='Cuerpo',
+            image=SimpleUploadedFile(filename, content, 'image/png'))
+
+    def test_files_are_named_by_content(self):
+        content = png_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        task = self.create_task(content)
+        self.assertEqual(task.image.name, f'tasks/{digest[:2]}/{digest}.png')
+        with task_images.open(task.image.name) as file:
+            self.assertEqual(file.read(), content)
+
+    def test_duplicates_share_one_file(self):
+        first = self.create_task(png_bytes(), 'uno.png')
+        second = self.create_task(png_bytes(), 'dos.png')
+        other = self.create_task(png_bytes('red'), 'uno.png')
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, other.image.name)
+        self.assertEqual(stored_files(),
+                         sorted([first.image.name, other.image.name]))
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=10)
+    def test_upload_is_hashed_while_received(self):
+        """Una subida grande llega a disco y se mueve sin volver a leerla."""
+        content = png_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        client = Client()
+        client.force_login(User.objects.create_user(username='Uploader'))
+        for _ in range(2):
+            upload = SimpleUploadedFile('grande.png', content, 'image/png')
+            client.post(reverse('tasks:home'), {
+                'title': 'Subida', 'text': 'Texto', 'image': upload})
+        names = set(Task.objects.values_list('image', flat=True))
+        self.assertEqual(names, {f'tasks/{digest[:2]}/{digest}.png'})
+        self.assertEqual(stored_files(), sorted(names))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, TASKS_THUMBNAIL_WIDTHS=(20,),
+                   TASKS_THUMBNAIL_FORMATS=('jpeg',),
+                   TASKS_IMAGE_DELETE_GRACE=0)
+class ImageReferenceTests(MediaRootMixin, TransactionTestCase):
+    def create_task(self, content):
+        task = Task.objects.create(
+            title='Con imagen', text='Cuerpo',
+            image=SimpleUploadedFile('foto.png', content, 'image/png'))
+        generate_thumbnails(task.image.name)
+        return task
+
+    def test_file_is_deleted_with_its_last_task(self):
+        first = self.create_task(png_bytes())
+        second = self.create_task(png_bytes())
+        name = first.image.name
+        thumbnail = thumbnail_name(name, 20, 'jpeg')
+        first.delete()
+        self.assertTrue(task_images.exists(name))
+        self.assertTrue(default_storage.exists(thumbnail))
+        second.delete()
+        self.assertFalse(task_images.exists(name))
+        self.assertFalse(default_storage.exists(thumbnail))
+        self.assertFalse(default_storage.exists(manifest_name(name)))
+
+    @override_settings(TASKS_IMAGE_DELETE_GRACE=60)
+    def test_reused_file_is_not_deleted(self):
+        """Subir el mismo archivo antes de guardar su tarea lo conserva."""
+        task = self.create_task(png_bytes())
+        name = task.image.name
+        old = time.time() - 7200
+        os.utime(task_images.path(name), (old, old))
+        # Otra petición sube el mismo contenido; su tarea aún no existe
+        self.assertEqual(
+            task_images.save('tasks/otra.png', io.BytesIO(png_bytes())), name)
+        task.delete()
+        self.assertTrue(task_images.exists(name))
+        os.utime(task_images.path(name), (old, old))
+        self.assertTrue(task_images.delete_if_old(name, 60))
+        self.assertFalse(task_images.exists(name))
+
+    def test_collect_images_deletes_orphans(self):
+        used = self.create_task(png_bytes())
+        replaced = self.create_task(png_bytes('red'))
+        orphan = replaced.image.name
+        # Editar la imagen no borra la anterior
+        replaced.image = used.image.name
+        replaced.save()
+        stale = default_storage.save(
+            thumbnail_name(used.image.name, 999, 'jpeg'), io.BytesIO(b'x'))
+        call_command('collect_images', stderr=io.StringIO())
+        self.assertTrue(task_images.exists(orphan))
+        # Los archivos recientes se conservan hasta cumplir --min-age
+        old = time.time() - 7200
+        for name in (orphan, thumbnail_name(orphan, 20, 'jpeg'),
+                     manifest_name(orphan), stale):
+            os.utime(task_images.path(name), (old, old))
+        call_command('collect_images', stderr=io.StringIO())
+        self.assertFalse(task_images.exists(orphan))
+        self.assertFalse(task_images.exists(stale))
+        self.assertEqual(stored_files(), sorted([
+            used.image.name, thumbnail_name(used.image.name, 20, 'jpeg'),
+            manifest_name(used.image.name)]))
+
+    def test_collect_images_keeps_originals_reused_meanwhile(self):
+        content = png_bytes('red')
+        replaced = self.create_task(content)
+        orphan = replaced.image.name
+        replaced.image = ''
+        replaced.save()
+        old = time.time() - 7200
+        os.utime(task_images.path(orphan), (old, old))
+        size = task_images.size
+
+        def upload_same_image(name):
+            # Otra subida con el mismo contenido reutiliza el archivo
+            # después de que collect_images lo haya visto antiguo
+            if name == orphan:
+                task_images.save('tasks/foto.png', ContentFile(content))
+            return size(name)
+
+        stderr = io.StringIO()
+        with mock.patch.object(task_images, 'size', upload_same_image):
+            call_command('collect_images', stderr=stderr)
+        self.assertTrue(task_images.exists(orphan))
+        self.assertIn('Borrados 0 archivos', stderr.getvalue())
@@ -0,0 +1,163 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from tasks.cache import detail_cache
+from tasks.jobs import run_pending
+from tasks.models import Job, Task
+from tasks.thumbnails import (delete_unused_images, thumbnail_cache,
+                              thumbnail_name)
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_jpeg(width, height):
+    output = BytesIO()
+    Image.new('RGB', (width, height), 'orange').save(output, 'JPEG')
+    return SimpleUploadedFile(
+        'photo.jpg', output.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    TASKS_THUMBNAIL_WIDTHS=(200, 800),
+    TASKS_THUMBNAIL_FORMATS=('webp', 'jpeg'),
+    TASKS_IMAGE_DELETE_GRACE=0,
+)
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        thumbnail_cache().clear()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_task(self, width, height):
+        task = Task.objects.create(
+            title='Con imagen', text='Cuerpo', image=make_jpeg(width, height))
+        # Las versiones se crean fuera de la petición, en la cola de trabajos
+        run_pending()
+        return task
+
+    def thumbnail_size(self, task, width, format):
+        name = thumbnail_name(task.image.name, width, format)
+        with default_storage.open(name) as thumbnail:
+            return Image.open(thumbnail).size
+
+    def test_upload_creates_all_variants(self):
+        """Al subir la imagen se crean todas las versiones reducidas."""
+        task = self.create_task(1600, 1200)
+        for format in ('webp', 'jpeg'):
+            with self.subTest(format=format):
+                self.assertEqual(
+                    self.thumbnail_size(task, 200, format), (200, 150))
+                self.assertEqual(
+                    self.thumbnail_size(task, 800, format), (800, 600))
+
+    def test_upload_enqueues_job_once(self):
+        """Guardar la tarea encola un único trabajo por imagen subida."""
+        task = Task.objects.create(
+            title='Con imagen', text='Cuerpo', image=make_jpeg(100, 100))
+        task.title = 'Editada'
+        task.save()
+        self.assertEqual(Job.objects.filter(name='thumbnails').count(), 1)
+        self.assertFalse(default_storage.exists(
+            thumbnail_name(task.image.name, 200, 'jpeg')))
+
+    def test_reupload_after_delete_enqueues_again(self):
+        """Al volver a subir una imagen borrada se crean sus versiones."""
+        task = self.create_task(400, 300)
+        name = task.image.name
+        thumbnail = thumbnail_name(name, 200, 'jpeg')
+        task.delete()
+        # TestCase no ejecuta on_commit: se borra como release_image()
+        delete_unused_images([name])
+        self.assertFalse(default_storage.exists(thumbnail))
+        self.create_task(400, 300)
+        self.assertTrue(default_storage.exists(thumbnail))
+
+    def test_small_image_is_not_upscaled(self):
+        """No se crean versiones más anchas que la imagen original."""
+        task = self.create_task(300, 100)
+        self.assertEqual(self.thumbnail_size(task, 200, 'jpeg'), (200, 67))
+        self.assertFalse(default_storage.exists(
+            thumbnail_name(task.image.name, 800, 'jpeg')))
+        html = self.render(task)
+        self.assertIn(' 200w', html)
+        self.assertNotIn(' 800w', html)
+
+    def render(self, task):
+        return Template(
+            '{% load task_images %}{% responsive_image task.image alt="Foto" %}'
+        ).render(Context({'task': task}))
+
+    def test_template_tag_uses_created_variants(self):
+        """La etiqueta emite srcset sin comprobar cada versión."""
+        task = self.create_task(1000, 500)
+        self.render(task)
+        with mock.patch.object(default_storage, 'exists') as exists:
+            html = self.render(task)
+        exists.assert_not_called()
+        self.assertIn('<source type="image/webp"', html)
+        webp = thumbnail_name(task.image.name, 800, 'webp')
+        self.assertIn(f'{default_storage.url(webp)} 800w', html)
+        jpeg = thumbnail_name(task.image.name, 200, 'jpeg')
+        self.assertIn(f'{default_storage.url(jpeg)} 200w', html)
+        self.assertIn(f'src="{task.image.url}"', html)
+        self.assertTrue(os.path.exists(
+            os.path.join(TEMP_MEDIA_ROOT, task.image.name)))
+
+    def test_template_tag_enqueues_missing_variants(self):
+        """Sin versiones se muestra el original y se encola su creación."""
+        task = Task.objects.create(
+            title='Con imagen', text='Cuerpo', image=make_jpeg(1000, 500))
+        Job.objects.all().delete()
+        html = self.render(task)
+        self.assertEqual(
+            html, f'<img src="{task.image.url}" alt="Foto">')
+        self.assertFalse(default_storage.exists(
+            thumbnail_name(task.image.name, 200, 'jpeg')))
+        self.assertEqual(Job.objects.filter(name='thumbnails').count(), 1)
+        run_pending()
+        thumbnail_cache().clear()
+        self.assertIn(' 800w', self.render(task))
+
+    def test_detail_etag_changes_when_variants_are_created(self):
+        """La página revalidada muestra el srcset cuando ya hay versiones."""
+        # Un tamaño que no usan las demás pruebas: otro archivo
+        task = Task.objects.create(
+            title='Con imagen', text='Cuerpo', image=make_jpeg(1000, 600))
+        detail_cache().clear()
+        client = Client()
+        client.force_login(User.objects.create_user(username='Viewer'))
+        url = reverse('tasks:task_detail', kwargs={'slug': task.slug})
+        first = client.get(url)
+        self.assertNotContains(first, 'srcset')
+        response = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        run_pending()
+        response = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'srcset')
+
+    def test_template_tag_without_original(self):
+        """Si falta el original no hay error: se muestra un <img>."""
+        task = Task.objects.create(
+            title='Con imagen', text='Cuerpo', image=make_jpeg(100, 100))
+        os.remove(os.path.join(TEMP_MEDIA_ROOT, task.image.name))
+        html = self.render(task)
+        self.assertEqual(html, f'<img src="{task.image.url}" alt="Foto">')
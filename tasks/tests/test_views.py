@@ -1,8 +1,16 @@
+import json
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.db import connection, transaction
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django import forms
 
+from tasks.cache import (DETAIL_CACHE_VERSION, detail_cache, detail_key,
+                         stats)
 from tasks.models import Task
 
 User = get_user_model()
@@ -106,3 +114,368 @@ class TaskPagesTests(TestCase):
         response = self.guest_client.get(reverse('tasks:home'))
         title_inital = response.context['form'].fields['title'].initial
         self.assertEqual(title_inital, 'Valor por defecto')
+
+
+@override_settings(TASKS_PAGE_SIZE=2)
+class TaskListPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Cinco tareas: con dos por página salen tres páginas
+        for number in range(5):
+            Task.objects.create(
+                title=f'Tarea {number}',
+                text='Cuerpo',
+                slug=f'task-{number}',
+            )
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='PageReader')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get_page(self, cursor=None):
+        data = {'cursor': cursor} if cursor else {}
+        return self.authorized_client.get(reverse('tasks:task_list'), data)
+
+    def slugs(self, response):
+        return [task.slug for task in response.context['object_list']]
+
+    def test_first_page_has_page_size_tasks(self):
+        """La primera página contiene las tareas más nuevas."""
+        response = self.get_page()
+        self.assertEqual(self.slugs(response), ['task-4', 'task-3'])
+        self.assertTrue(response.context['page_obj'].has_next())
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+    def test_next_and_previous_cursors(self):
+        """Los cursores recorren todas las tareas en ambos sentidos."""
+        first = self.get_page()
+        second = self.get_page(first.context['page_obj'].next_cursor)
+        self.assertEqual(self.slugs(second), ['task-2', 'task-1'])
+        third = self.get_page(second.context['page_obj'].next_cursor)
+        self.assertEqual(self.slugs(third), ['task-0'])
+        self.assertFalse(third.context['page_obj'].has_next())
+        back = self.get_page(third.context['page_obj'].previous_cursor)
+        self.assertEqual(self.slugs(back), ['task-2', 'task-1'])
+        top = self.get_page(back.context['page_obj'].previous_cursor)
+        self.assertEqual(self.slugs(top), ['task-4', 'task-3'])
+        self.assertFalse(top.context['page_obj'].has_previous())
+
+    def test_page_query_count_is_constant(self):
+        """Una página profunda no cuesta más consultas que la primera."""
+        first = self.get_page()
+        second = self.get_page(first.context['page_obj'].next_cursor)
+        cursor = second.context['page_obj'].next_cursor
+        # Versión de la lista (ETag), límites de la página, totales de la
+        # cabecera y filas de la página; la sesión y el usuario no
+        # consultan la base de datos
+        with self.assertNumQueries(4):
+            self.get_page(cursor)
+
+    def test_invalid_cursor_returns_404(self):
+        """Un cursor manipulado devuelve 404."""
+        response = self.get_page('no-es-un-cursor')
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskListDeferredFieldsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Task.objects.create(
+            title='Tarea larga',
+            text='Descripción muy larga ' * 1000,
+            slug='long-task',
+        )
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='Admin', email='admin@example.com', password='pass')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.admin)
+
+    def assertTextNotSelected(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        task_queries = [query['sql'] for query in queries
+                        if '"tasks_task"' in query['sql']]
+        self.assertTrue(task_queries)
+        for sql in task_queries:
+            with self.subTest(sql=sql):
+                self.assertNotIn('"tasks_task"."text"', sql)
+                self.assertNotIn('"tasks_task"."image"', sql)
+
+    def test_task_list_does_not_select_text(self):
+        """La lista de tareas no lee las columnas text e image."""
+        self.assertTextNotSelected(reverse('tasks:task_list'))
+
+    def test_admin_changelist_does_not_select_text(self):
+        """La lista del admin no lee las columnas text e image."""
+        self.assertTextNotSelected(reverse('admin:tasks_task_changelist'))
+
+
+class TaskExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Task.objects.create(title='Primera', text='Uno', slug='first')
+        Task.objects.create(title='Segunda', text='Dos, "tres"', slug='second')
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='Exporter')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get_export(self, **params):
+        response = self.authorized_client.get(
+            reverse('tasks:task_export'), params)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_export_is_streamed_as_ndjson(self):
+        """Por defecto se exportan todas las tareas en NDJSON."""
+        response, body = self.get_export()
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'],
+                         'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['slug'] for row in rows], ['first', 'second'])
+        self.assertEqual(rows[1]['text'], 'Dos, "tres"')
+
+    def test_export_csv_with_selected_fields(self):
+        """?format=csv&fields=... devuelve solo las columnas pedidas."""
+        response, body = self.get_export(format='csv', fields='slug,title')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(body.splitlines(),
+                         ['slug,title', 'first,Primera', 'second,Segunda'])
+
+    def test_export_rejects_unknown_field(self):
+        """Un campo desconocido devuelve 400."""
+        response = self.authorized_client.get(
+            reverse('tasks:task_export'), {'fields': 'password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_redirects_anonymous(self):
+        """La exportación solo está disponible para usuarios autorizados."""
+        response = Client().get(reverse('tasks:task_export'))
+        self.assertRedirects(
+            response, '/admin/login/?next=' + reverse('tasks:task_export'),
+            fetch_redirect_response=False)
+
+
+class TaskDetailCacheTests(TransactionTestCase):
+    # Las entradas se borran en transaction.on_commit
+    def setUp(self):
+        detail_cache().clear()
+        stats.reset()
+        self.task = Task.objects.create(
+            title='Original', text='Texto original', slug='cached')
+        self.user = User.objects.create_user(username='Reader')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get_detail(self, slug='cached'):
+        return self.authorized_client.get(
+            reverse('tasks:task_detail', kwargs={'slug': slug}))
+
+    def test_second_hit_is_served_from_cache(self):
+        """La segunda visita no consulta la tabla de tareas."""
+        self.get_detail()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_detail()
+        self.assertContains(response, 'Texto original')
+        self.assertFalse(any('"tasks_task"' in query['sql']
+                             for query in queries))
+        self.assertEqual((stats.hits, stats.misses), (1, 1))
+
+    def test_edited_task_is_shown_immediately(self):
+        """Al editar la tarea la página muestra el contenido nuevo."""
+        self.get_detail()
+        self.task.text = 'Texto editado'
+        self.task.save()
+        self.assertContains(self.get_detail(), 'Texto editado')
+
+    def test_deleted_task_returns_404(self):
+        """Una tarea borrada deja de estar en la caché."""
+        self.get_detail()
+        self.task.delete()
+        self.assertEqual(self.get_detail().status_code, 404)
+
+    def test_changed_slug_invalidates_old_slug(self):
+        """Al cambiar el slug, el anterior deja de responder."""
+        self.get_detail()
+        task = Task.objects.get(pk=self.task.pk)
+        task.slug = 'renamed'
+        task.save()
+        self.assertEqual(self.get_detail().status_code, 404)
+        self.assertContains(self.get_detail('renamed'), 'Texto original')
+
+    def test_read_before_commit_does_not_keep_old_row(self):
+        """Una lectura durante la transacción no deja la fila anterior."""
+        self.get_detail()
+        key, version = detail_key('cached'), DETAIL_CACHE_VERSION
+        old_row = detail_cache().get(key, version=version)
+        with transaction.atomic():
+            self.task.text = 'Texto editado'
+            self.task.save()
+            # Otra petición vuelve a guardar la fila antes de confirmar
+            detail_cache().set(key, old_row, version=version)
+        self.assertContains(self.get_detail(), 'Texto editado')
+
+
+class ConditionalGetTests(TransactionTestCase):
+    def setUp(self):
+        detail_cache().clear()
+        self.task = Task.objects.create(
+            title='Condicional', text='Cuerpo', slug='conditional')
+        self.user = User.objects.create_user(username='Revalidator')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def assertNotModified(self, url):
+        first = self.authorized_client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.has_header('ETag'))
+        response = self.authorized_client.get(
+            url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response.templates, [])
+        return first
+
+    def test_unchanged_detail_returns_304(self):
+        """La página de la tarea sin cambios responde 304 sin renderizar."""
+        url = reverse('tasks:task_detail', kwargs={'slug': 'conditional'})
+        first = self.assertNotModified(url)
+        response = self.authorized_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_unchanged_list_returns_304(self):
+        """La lista sin cambios responde 304 sin renderizar."""
+        first = self.assertNotModified(reverse('tasks:task_list'))
+        self.assertEqual(first['Cache-Control'], 'no-cache, private')
+
+    def test_edited_task_returns_200(self):
+        """Al editar la tarea cambian los ETag de la tarea y de la lista."""
+        urls = [
+            reverse('tasks:task_detail', kwargs={'slug': 'conditional'}),
+            reverse('tasks:task_list'),
+        ]
+        etags = [self.authorized_client.get(url)['ETag'] for url in urls]
+        self.task.title = 'Editada'
+        self.task.save()
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertContains(response, 'Editada')
+
+    def test_deleted_task_changes_list_etag(self):
+        """Al borrar una tarea cambia el ETag de la lista."""
+        other = Task.objects.create(title='Otra', text='Cuerpo')
+        url = reverse('tasks:task_list')
+        etag = self.authorized_client.get(url)['ETag']
+        other.delete()
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_bulk_update_changes_list_etag(self):
+        """update() en bloque también cambia el ETag de la lista."""
+        url = reverse('tasks:task_list')
+        etag = self.authorized_client.get(url)['ETag']
+        Task.objects.filter(pk=self.task.pk).update(title='En bloque')
+        response = self.authorized_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'En bloque')
+
+    def test_list_revalidation_reads_one_row(self):
+        """El 304 de la lista solo lee el contador de cambios."""
+        url = reverse('tasks:task_list')
+        etag = self.authorized_client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(
+                url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"tasks_changecounter"', queries[0]['sql'])
+
+
+class TaskBatchCreateTests(TestCase):
+    def setUp(self):
+        Task.objects.create(title='Existente', text='Texto', slug='existente')
+        self.client = Client()
+        self.client.force_login(User.objects.create_user(username='Batcher'))
+
+    def post_batch(self, items):
+        return self.client.post(
+            reverse('tasks:task_batch_create'), json.dumps(items),
+            content_type='application/json')
+
+    def test_creates_tasks_and_reports_each_item(self):
+        response = self.post_batch([
+            {'title': 'Existente', 'text': 'Sin slug'},
+            {'title': 'Otra', 'text': 'Texto', 'slug': 'existente'},
+            {'title': 'Sin texto'},
+            {'title': 'Propia', 'text': 'Texto', 'slug': 'propia'},
+            {'title': 'Repetida', 'text': 'Texto', 'slug': 'propia'},
+            'no es un objeto',
+        ])
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report['created'], report['invalid']), (2, 4))
+        statuses = [result['status'] for result in report['results']]
+        self.assertEqual(statuses, ['created', 'invalid', 'invalid',
+                                    'created', 'invalid', 'invalid'])
+        self.assertEqual(report['results'][0]['slug'], 'existente-2')
+        self.assertEqual(report['results'][0]['url'],
+                         reverse('tasks:task_detail', args=['existente-2']))
+        self.assertIn('text', report['results'][2]['errors'])
+        self.assertEqual(report['results'][4]['errors']['slug'][0]['code'],
+                         'unique')
+        self.assertEqual(
+            sorted(Task.objects.values_list('slug', flat=True)),
+            ['existente', 'existente-2', 'propia'])
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        items = [{'title': f'Tarea {number}', 'text': 'Texto'}
+                 for number in range(300)]
+        # Slugs ocupados, transacción, contadores de cambios y de tareas e
+        # INSERT (Django divide el INSERT según el límite de parámetros de
+        # SQLite)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_batch(items)
+        self.assertEqual(response.json()['created'], 300)
+        self.assertLessEqual(len(queries), 12)
+        self.assertEqual(Task.objects.count(), 301)
+
+    def test_rejects_malformed_body(self):
+        for body in ('{"title": "Sola"}', 'no json'):
+            with self.subTest(body=body):
+                response = self.client.post(
+                    reverse('tasks:task_batch_create'), body,
+                    content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    @override_settings(TASKS_BATCH_MAX_SIZE=2)
+    def test_rejects_too_many_tasks(self):
+        response = self.post_batch([{'title': 'T', 'text': 'T'}] * 3)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_slug_taken_during_insert_creates_nothing(self):
+        with mock.patch.object(Task.objects, 'allocate_slugs',
+                               return_value=[]):
+            response = self.post_batch([
+                {'title': 'Nueva', 'text': 'Texto', 'slug': 'nueva'},
+                {'title': 'Choca', 'text': 'Texto', 'slug': 'existente'},
+            ])
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Task.objects.filter(slug='nueva').exists())
+
+    def test_redirects_anonymous(self):
+        response = Client().post(
+            reverse('tasks:task_batch_create'), '[]',
+            content_type='application/json')
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,222 @@
+"""Versiones reducidas de Task.image para srcset.
+
+Cada imagen subida se reduce, en la cola de trabajos, a los anchos de
+TASKS_THUMBNAIL_WIDTHS que no superan el suyo, en los formatos de
+TASKS_THUMBNAIL_FORMATS. Los nombres son deterministas
+(tasks/thumbs/foto-800w.webp). Al terminar se guarda un índice
+(tasks/thumbs/foto.json) con el ancho del original y las versiones
+creadas: al mostrar la imagen se lee el índice, en caché, en lugar de
+comprobar si existe cada versión.
+"""
+import json
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .jobs import enqueue, register
+from .models import Task
+from .storage import task_images
+from .utils import QUERY_BATCH, batched
+
+# Formato de Pillow, extensión y tipo MIME de cada formato de salida
+FORMATS = {
+    'webp': ('WEBP', 'webp', 'image/webp'),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+}
+# Altura máxima "infinita" para reducir solo por el ancho
+UNBOUNDED = 100000
+# Valores de la etiqueta EXIF Orientation que giran la imagen 90°
+ROTATED = {5, 6, 7, 8}
+# Extensión del índice de las versiones de cada imagen
+MANIFEST_EXTENSION = '.json'
+# Segundos que se guarda en caché el índice de una imagen a la que le
+# faltan versiones, mientras la cola de trabajos las crea
+MISSING_TIMEOUT = 60
+
+
+def thumbnail_name(name, width, format):
+    """Nombre determinista de una versión reducida de la imagen name."""
+    directory, filename = os.path.split(name)
+    root = os.path.splitext(filename)[0]
+    extension = FORMATS[format][1]
+    return os.path.join(directory, 'thumbs', f'{root}-{width}w.{extension}')
+
+
+def manifest_name(name):
+    """Nombre del índice de las versiones reducidas de la imagen name."""
+    directory, filename = os.path.split(name)
+    root = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'thumbs', root + MANIFEST_EXTENSION)
+
+
+def variants(name, max_width=None):
+    """Devuelve [(formato, ancho, nombre)] de las versiones de name.
+
+    Con max_width, solo las que no son más anchas que el original.
+    """
+    return [
+        (format, width, thumbnail_name(name, width, format))
+        for format in settings.TASKS_THUMBNAIL_FORMATS
+        for width in settings.TASKS_THUMBNAIL_WIDTHS
+        if max_width is None or width <= max_width
+    ]
+
+
+def _open(name, width, storage):
+    # Devuelve la imagen (reducida al leerla si es posible) y el ancho
+    # del original. Pillow solo se importa en el proceso que crea las
+    # versiones, no al arrancar los procesos web
+    from PIL import Image, ImageOps
+    with storage.open(name, 'rb') as original:
+        image = Image.open(original)
+        stored_width, stored_height = image.size
+        rotated = image.getexif().get(0x0112) in ROTATED
+        if rotated:
+            stored_width, stored_height = stored_height, stored_width
+        height = -(-stored_height * width // stored_width)
+        # draft() hace que el decodificador JPEG reduzca la imagen mientras
+        # la lee (1/2, 1/4, 1/8), así no se descomprime el original entero
+        image.draft('RGB', (height, width) if rotated else (width, height))
+        image.load()
+    return ImageOps.exif_transpose(image), stored_width
+
+
+def _encode(image, format):
+    pillow_format = FORMATS[format][0]
+    if pillow_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    output = BytesIO()
+    image.save(output, pillow_format, quality=settings.TASKS_THUMBNAIL_QUALITY)
+    return output.getvalue()
+
+
+def generate_thumbnails(name, storage=default_storage, only_missing=False):
+    """Crea las versiones reducidas de la imagen name y su índice.
+
+    No se crean las versiones más anchas que el original: la imagen no
+    se amplía. Devuelve los nombres de las versiones creadas.
+    """
+    largest = max(settings.TASKS_THUMBNAIL_WIDTHS)
+    image, source_width = _open(name, largest, storage)
+    pending = [
+        (format, width, thumbnail)
+        for format, width, thumbnail in variants(name, source_width)
+        if not (only_missing and storage.exists(thumbnail))
+    ]
+    created = []
+    # Del ancho mayor al menor: cada versión se reduce desde la anterior
+    for width in sorted({width for _, width, _ in pending}, reverse=True):
+        # reducing_gap usa Image.reduce() antes de remuestrear: más rápido
+        # y con menos memoria en reducciones grandes
+        image.thumbnail((width, UNBOUNDED), reducing_gap=2.0)
+        for format, variant_width, thumbnail in pending:
+            if variant_width != width:
+                continue
+            if storage.exists(thumbnail):
+                storage.delete(thumbnail)
+            created.append(storage.save(
+                thumbnail, ContentFile(_encode(image, format))))
+    _save_manifest(name, source_width, storage)
+    return created
+
+
+def _save_manifest(name, source_width, storage):
+    manifest = manifest_name(name)
+    content = json.dumps({
+        'width': source_width,
+        'formats': list(settings.TASKS_THUMBNAIL_FORMATS),
+        'widths': [width for width in settings.TASKS_THUMBNAIL_WIDTHS
+                   if width <= source_width],
+    })
+    if storage.exists(manifest):
+        storage.delete(manifest)
+    storage.save(manifest, ContentFile(content.encode()))
+    thumbnail_cache().delete(manifest_key(name))
+
+
+def request_thumbnails(name):
+    """Encola la creación de las versiones de la imagen name."""
+    enqueue('thumbnails', {'name': name}, key=f'thumbnails:{name}')
+
+
+@register('thumbnails')
+def thumbnails_job(name):
+    """Trabajo en segundo plano que crea las versiones de una imagen subida."""
+    generate_thumbnails(name, only_missing=True)
+
+
+def delete_image(name):
+    """Borra la imagen name de Task.image y todas sus versiones reducidas.
+
+    No borra nada si se ha subido de nuevo hace menos de
+    TASKS_IMAGE_DELETE_GRACE segundos (ver tasks.storage).
+    """
+    if not task_images.delete_if_old(name, settings.TASKS_IMAGE_DELETE_GRACE):
+        return
+    for _, _, thumbnail in variants(name):
+        default_storage.delete(thumbnail)
+    default_storage.delete(manifest_name(name))
+    thumbnail_cache().delete(manifest_key(name))
+
+
+def delete_unused_images(names, using='default'):
+    """Borra las imágenes de names que ya no usa ninguna tarea."""
+    names = set(names)
+    used = set()
+    for chunk in batched(names, QUERY_BATCH):
+        used.update(Task.objects.using(using).filter(image__in=chunk)
+                    .order_by().values_list('image', flat=True))
+    for name in names - used:
+        delete_image(name)
+
+
+def thumbnail_cache():
+    return caches[settings.TASKS_THUMBNAIL_CACHE]
+
+
+def manifest_key(name):
+    return f'tasks:thumbnails:{name}'
+
+
+def _read_manifest(name, storage):
+    try:
+        with storage.open(manifest_name(name), 'rb') as manifest:
+            return json.loads(manifest.read().decode())
+    except (OSError, ValueError):
+        return None
+
+
+def _available(name, manifest):
+    created = {(format, width) for format in manifest['formats']
+               for width in manifest['widths']}
+    return [variant for variant in variants(name, manifest['width'])
+            if variant[:2] in created]
+
+
+def available_thumbnails(name, storage=default_storage):
+    """Devuelve [(formato, ancho, nombre)] de las versiones ya creadas.
+
+    Lee el índice de la imagen, que se guarda en caché. Si no existe o le
+    faltan versiones de la configuración actual, encola su creación y
+    devuelve las que haya (quizá ninguna): nunca las crea al mostrar la
+    imagen.
+    """
+    cache = thumbnail_cache()
+    key = manifest_key(name)
+    manifest = cache.get(key)
+    if manifest is None:
+        manifest = _read_manifest(name, storage) or {}
+        timeout = settings.TASKS_THUMBNAIL_CACHE_TIMEOUT
+        if not manifest or (len(_available(name, manifest))
+                            < len(variants(name, manifest['width']))):
+            request_thumbnails(name)
+            # Se vuelve a leer el índice cuando el trabajo haya terminado
+            timeout = MISSING_TIMEOUT
+        cache.set(key, manifest, timeout)
+    return _available(name, manifest) if manifest else []
@@ -1,12 +1,18 @@
 from django.urls import path
 
-from .views import Home, TaskAddSuccess, TaskDetail, TaskList
+from .views import (Home, TaskAddSuccess, TaskBatchCreate, TaskChanges,
+                    TaskDetail, TaskExport, TaskList, TaskSearch, TaskStats)
 
 app_name = 'tasks'
 
 urlpatterns = [
     path('', Home.as_view(), name='home'),
     path('task/', TaskList.as_view(), name='task_list'),
+    path('search/', TaskSearch.as_view(), name='task_search'),
+    path('batch/', TaskBatchCreate.as_view(), name='task_batch_create'),
+    path('export/', TaskExport.as_view(), name='task_export'),
+    path('changes/', TaskChanges.as_view(), name='changes'),
+    path('stats/', TaskStats.as_view(), name='stats'),
     path('task/<slug:slug>/', TaskDetail.as_view(), name='task_detail'),
     path('added/', TaskAddSuccess.as_view(), name='task_added'),
 ]
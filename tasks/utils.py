@@ -0,0 +1,23 @@
+from itertools import islice
+
+from django.utils.cache import patch_cache_control
+
+# Valores por consulta IN/LIKE (SQLite admite 999 parámetros)
+QUERY_BATCH = 500
+
+
+def batched(iterable, size):
+    """Divide iterable en listas de como máximo size elementos."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def patch_revalidate(response, public=False):
+    """Permite guardar response en caché si se revalida en cada uso."""
+    # El navegador guarda la página, pero la revalida en cada visita
+    visibility = {'public': True} if public else {'private': True}
+    patch_cache_control(response, no_cache=True, **visibility)
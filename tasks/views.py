@@ -1,10 +1,27 @@
+import json
+import math
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
-from django.views.generic import DetailView, ListView, TemplateView
+from django.core.paginator import InvalidPage
+from django.db import IntegrityError, router
+from django.http import (Http404, HttpResponseBadRequest, JsonResponse,
+                         StreamingHttpResponse)
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.generic import DetailView, ListView, TemplateView, View
 from django.views.generic.edit import CreateView
 
-from .forms import TaskCreateForm
-from .models import Task
+from . import cache, changes, search, stats, thumbnails
+from .formats import EXPORT_FIELDS, FORMATS, iter_lines
+from .forms import TaskBatchForm, TaskCreateForm
+from .models import (ChangeCounter, SlugConflictError, Task,
+                     is_slug_conflict)
+from .pagination import KeysetPaginator
+from .prerender import PrerenderedMixin
+from .sqlite import write_transaction
+from .utils import batched, patch_revalidate
 
 
 class Home(CreateView):
@@ -13,22 +30,316 @@ class Home(CreateView):
     form_class = TaskCreateForm
     success_url = reverse_lazy('tasks:task_added')
 
+    def form_valid(self, form):
+        try:
+            return super().form_valid(form)
+        except SlugConflictError:
+            form.add_slug_conflict_error()
+            return self.form_invalid(form)
+
+
+class TaskBatchCreate(LoginRequiredMixin, View):
+    """Crea muchas tareas en una petición.
+
+    El cuerpo es una lista JSON de objetos con title, text y slug. Cada
+    tarea se valida con las reglas de TaskCreateForm, los slugs de todo
+    el lote se resuelven juntos (Task.objects.allocate_slugs()) y las
+    tareas válidas se insertan con bulk_create() en una sola transacción.
+    La respuesta lleva el resultado de cada tarea en el mismo orden.
+
+    bulk_create() no envía post_save: como no hay imágenes, no hace
+    falta encolar miniaturas, y las tareas nuevas no están en la caché.
+    """
+    login_url = '/admin/login/'
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        try:
+            items = json.loads(request.body)
+        except ValueError:
+            return self.error('El cuerpo no es JSON válido')
+        if not isinstance(items, list):
+            return self.error('Se espera una lista de tareas')
+        if len(items) > settings.TASKS_BATCH_MAX_SIZE:
+            return self.error(
+                f'Como máximo {settings.TASKS_BATCH_MAX_SIZE} tareas por '
+                f'petición')
+        results = []
+        # (resultado, tarea) de las tareas válidas
+        pending = []
+        for index, item in enumerate(items):
+            result = {'index': index}
+            results.append(result)
+            if not isinstance(item, dict):
+                result.update(status='invalid', errors={'__all__': [{
+                    'message': 'Cada tarea debe ser un objeto JSON',
+                    'code': 'invalid',
+                }]})
+                continue
+            form = TaskBatchForm(item)
+            if not form.is_valid():
+                result.update(status='invalid',
+                              errors=form.errors.get_json_data())
+                continue
+            pending.append((result, form.instance))
+
+        conflicts = {id(task) for task in Task.objects.allocate_slugs(
+            [task for _, task in pending])}
+        created = []
+        for result, task in pending:
+            if id(task) in conflicts:
+                result.update(status='invalid', errors={'slug': [{
+                    'message': TaskCreateForm.slug_exists_message(task.slug),
+                    'code': 'unique',
+                }]})
+            else:
+                created.append((result, task))
+        try:
+            with write_transaction():
+                Task.objects.bulk_create([task for _, task in created])
+        except IntegrityError as e:
+            if not is_slug_conflict(e):
+                raise
+            # Otra petición ha ocupado un slug después de allocate_slugs();
+            # no se ha insertado ninguna tarea del lote
+            return self.error(
+                'Alguno de los slugs se acaba de ocupar; vuelve a enviar '
+                'el lote', status=409)
+        for result, task in created:
+            result.update(
+                status='created', slug=task.slug,
+                url=reverse('tasks:task_detail', args=[task.slug]))
+        return JsonResponse({
+            'created': len(created),
+            'invalid': len(results) - len(created),
+            'results': results,
+        })
+
+    @staticmethod
+    def error(message, status=400):
+        return JsonResponse({'error': message}, status=status)
+
 
-class TaskList(LoginRequiredMixin, ListView):
+class ConditionalGetMixin:
+    """Responde 304 sin renderizar si la página no ha cambiado.
+
+    Las subclases definen get_validators(), que devuelve el ETag (sin
+    comillas) y la fecha de última modificación o None.
+    """
+    def get_validators(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        etag = quote_etag(etag) if etag else None
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if etag and not response.has_header('ETag'):
+            response['ETag'] = etag
+        if timestamp and not response.has_header('Last-Modified'):
+            response['Last-Modified'] = http_date(timestamp)
+        patch_revalidate(response)
+        return response
+
+
+class TaskList(LoginRequiredMixin, ConditionalGetMixin, ListView):
     """Lista de todas las tareas disponibles."""
     login_url = '/admin/login/'
+    # Lee las tareas de una réplica (ver tasks.routers)
+    read_replica = True
     model = Task
     template_name = 'tasks/task_list.html'
+    page_kwarg = 'cursor'
+
+    def get_queryset(self):
+        return Task.objects.for_list()
 
+    def get_validators(self):
+        # Sin Last-Modified: el ETag cambia con cualquier escritura de
+        # tareas, también con los borrados
+        version = Task.objects.list_version()
+        cursor = self.request.GET.get(self.page_kwarg, '')
+        return (f'{version}-{settings.TASKS_PAGE_SIZE}-{cursor}', None)
 
+    def get_paginate_by(self, queryset):
+        return settings.TASKS_PAGE_SIZE
 
-class TaskDetail(LoginRequiredMixin, DetailView):
+    def paginate_queryset(self, queryset, page_size):
+        """Paginación por cursor en lugar de OFFSET."""
+        paginator = KeysetPaginator(queryset, page_size)
+        cursor = self.request.GET.get(self.page_kwarg)
+        try:
+            page = paginator.page(cursor)
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class TaskDetail(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     """Detalles de la tarea."""
     login_url = '/admin/login/'
     model = Task
     template_name = 'tasks/task_detail.html'
 
+    def get_object(self, queryset=None):
+        """La tarea se lee de la caché por slug (ver tasks.cache)."""
+        if not hasattr(self, '_task'):
+            try:
+                self._task = cache.get_task(self.kwargs[self.slug_url_kwarg])
+            except Task.DoesNotExist:
+                raise Http404('No existe la tarea')
+        return self._task
+
+    def get_validators(self):
+        task = self.get_object()
+        etag = f'{task.pk}-{task.updated_at.timestamp()}'
+        if not task.image:
+            return etag, task.updated_at
+        # La página cambia cuando la cola crea las versiones reducidas
+        # (srcset en lugar del <img> del original), sin cambiar la
+        # tarea: entran en el ETag y no hay Last-Modified
+        variants = thumbnails.available_thumbnails(task.image.name)
+        return f'{etag}-{len(variants)}', None
+
+
+class TaskSearch(LoginRequiredMixin, ListView):
+    """Búsqueda de tareas por título y texto."""
+    login_url = '/admin/login/'
+    template_name = 'tasks/task_search.html'
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        tasks = list(
+            Task.objects.for_list().search(self.get_query())
+            [:settings.TASKS_SEARCH_LIMIT]
+        )
+        terms = search.search_terms(self.get_query())
+        for task in tasks:
+            # Sin el índice FTS5 el fragmento se construye en Python
+            snippet = getattr(task, 'snippet', None)
+            if snippet is None:
+                snippet = search.text_snippet(task.text, terms)
+            task.snippet_html = search.highlight(snippet)
+        return tasks
+
+    def get_context_data(self, **kwargs):
+        kwargs['query'] = self.get_query()
+        return super().get_context_data(**kwargs)
+
+
+class TaskExport(LoginRequiredMixin, View):
+    """Exportación de todas las tareas en NDJSON o CSV.
+
+    La respuesta se envía por partes a medida que se leen las filas,
+    así que la memoria no depende del tamaño de la tabla.
+    """
+    login_url = '/admin/login/'
+    read_replica = True
+    content_types = {
+        'jsonl': 'application/x-ndjson; charset=utf-8',
+        'csv': 'text/csv; charset=utf-8',
+    }
+
+    def get(self, request, *args, **kwargs):
+        format = request.GET.get('format', 'jsonl')
+        if format not in FORMATS:
+            return HttpResponseBadRequest(
+                f'Formato desconocido: {format}')
+        fields = request.GET.get('fields')
+        fields = fields.split(',') if fields else list(EXPORT_FIELDS)
+        unknown = set(fields) - set(EXPORT_FIELDS)
+        if unknown:
+            return HttpResponseBadRequest(
+                f'Campos desconocidos: {", ".join(sorted(unknown))}')
+        chunk_size = settings.TASKS_EXPORT_CHUNK_SIZE
+        # La respuesta se genera después de la vista: la réplica se
+        # fija ahora, no al leer las filas
+        rows = (
+            Task.objects.using(router.db_for_read(Task))
+            .order_by('pk')
+            .values_list(*fields)
+            .iterator(chunk_size=chunk_size)
+        )
+        # Cada parte de la respuesta agrupa las líneas de un bloque de filas
+        chunks = (''.join(lines) for lines in
+                  batched(iter_lines(rows, fields, format), chunk_size))
+        response = StreamingHttpResponse(
+            chunks, content_type=self.content_types[format])
+        response['Content-Disposition'] = (
+            f'attachment; filename="tasks.{format}"')
+        return response
+
+
+class TaskChanges(LoginRequiredMixin, View):
+    """Cambios de las tareas posteriores a un token (ver tasks.changes).
+
+    ?since= es el token next de la respuesta anterior (sin él, todas las
+    tareas), ?limit= el tamaño del lote (como máximo TASKS_CHANGES_BATCH)
+    y ?wait= los segundos que la petición espera a que haya cambios si no
+    los hay (como máximo TASKS_CHANGES_MAX_WAIT). Mientras espera, la
+    petición ocupa un hilo del servidor.
+    """
+    login_url = '/admin/login/'
+    read_replica = True
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        try:
+            seq, pk = changes.decode_token(request.GET.get('since'))
+            limit = int(request.GET.get('limit', settings.TASKS_CHANGES_BATCH))
+            wait = float(request.GET.get('wait', 0))
+            # nan e inf no respetan TASKS_CHANGES_MAX_WAIT
+            if not math.isfinite(wait):
+                raise ValueError(wait)
+        except ValueError:
+            return JsonResponse({'error': 'Parámetros no válidos'}, status=400)
+        limit = min(max(limit, 1), settings.TASKS_CHANGES_BATCH)
+        wait = min(max(wait, 0), settings.TASKS_CHANGES_MAX_WAIT)
+        using = router.db_for_read(Task)
+        if seq and seq < ChangeCounter.current(using)[1]:
+            # Ya no están las lápidas de las tareas borradas desde entonces
+            return JsonResponse({
+                'error': 'El token ha caducado; vuelve a pedir todas las '
+                         'tareas sin since',
+            }, status=410)
+        response = JsonResponse(
+            changes.wait_for_changes(seq, pk, limit, wait, using).as_json())
+        patch_cache_control(response, private=True, no_store=True)
+        return response
+
+
+class TaskStats(LoginRequiredMixin, View):
+    """Totales de tareas y tareas creadas por día (ver tasks.stats).
+
+    ?days= es el número de días, como máximo TASKS_STATS_MAX_DAYS. Lee
+    los contadores de TaskStat: no recorre la tabla de tareas.
+    """
+    login_url = '/admin/login/'
+    read_replica = True
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        try:
+            days = int(request.GET.get('days', settings.TASKS_STATS_DAYS))
+        except ValueError:
+            return JsonResponse({'error': 'Parámetros no válidos'}, status=400)
+        days = min(max(days, 1), settings.TASKS_STATS_MAX_DAYS)
+        response = JsonResponse({
+            **stats.get_totals(),
+            'created_per_day': [
+                {'date': day, 'count': count}
+                for day, count in stats.created_per_day(days)
+            ],
+        })
+        patch_revalidate(response)
+        return response
+
 
-class TaskAddSuccess(TemplateView):
+class TaskAddSuccess(PrerenderedMixin, TemplateView):
     """La tarea se agregó correctamente."""
     template_name = 'tasks/added.html'
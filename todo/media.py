@@ -0,0 +1,163 @@
+"""Archivos subidos (MEDIA_URL) en producción.
+
+Las imágenes de las tareas solo las ven los usuarios con la sesión
+iniciada, igual que TaskDetail. Con MEDIA_SENDFILE la vista solo
+comprueba el acceso y el servidor web envía el archivo
+('x-accel-redirect' en nginx, 'x-sendfile' en Apache o lighttpd), así
+que ningún proceso de Django queda ocupado enviando bytes. Para nginx:
+
+    location /protected-media/ {
+        internal;
+        alias /ruta/de/MEDIA_ROOT/;
+    }
+
+Sin MEDIA_SENDFILE, Django envía el archivo por bloques con ETag,
+Last-Modified, Cache-Control de larga duración y peticiones Range de un
+solo tramo (los vídeos y las descargas interrumpidas las usan).
+"""
+import mimetypes
+import os
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.generic import View
+
+# Bytes que se leen del archivo en cada parte de la respuesta
+BLOCK_SIZE = 64 * 1024
+RANGE_UNIT = 'bytes='
+
+
+class RangeNotSatisfiable(Exception):
+    """El tramo pedido empieza después del final del archivo."""
+
+
+def parse_range(header, size):
+    """(inicio, fin) inclusivos del tramo de la cabecera Range.
+
+    Devuelve None si la cabecera no se puede interpretar o pide varios
+    tramos: entonces se envía el archivo entero, como permite RFC 7233.
+    """
+    if not header or not header.startswith(RANGE_UNIT):
+        return None
+    spec = header[len(RANGE_UNIT):].strip()
+    if ',' in spec:
+        return None
+    start, separator, end = (part.strip() for part in spec.partition('-'))
+    if (not separator or not (start or end)
+            or not all(part.isdigit() for part in (start, end) if part)):
+        return None
+    if not start:
+        # bytes=-500: los últimos 500 bytes
+        length = int(end)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size:
+        raise RangeNotSatisfiable
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(BLOCK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+class MediaView(LoginRequiredMixin, View):
+    """Envía un archivo de MEDIA_ROOT a los usuarios con la sesión iniciada."""
+    login_url = '/admin/login/'
+    http_method_names = ['get', 'head']
+
+    def get(self, request, path):
+        try:
+            full_path = safe_join(settings.MEDIA_ROOT, path)
+        except SuspiciousFileOperation:
+            raise Http404('No existe el archivo')
+        content_type = (mimetypes.guess_type(full_path)[0]
+                        or 'application/octet-stream')
+        if settings.MEDIA_SENDFILE:
+            response = self.sendfile(path, full_path, content_type)
+        else:
+            response = self.serve(request, full_path, content_type)
+        patch_cache_control(response, private=True,
+                            max_age=settings.MEDIA_CACHE_MAX_AGE)
+        return response
+
+    def sendfile(self, path, full_path, content_type):
+        """Respuesta vacía: el servidor web busca y envía el archivo."""
+        response = HttpResponse(content_type=content_type)
+        if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = (
+                settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path))
+        elif settings.MEDIA_SENDFILE == 'x-sendfile':
+            response['X-Sendfile'] = full_path
+        else:
+            raise ValueError(
+                f'MEDIA_SENDFILE desconocido: {settings.MEDIA_SENDFILE}')
+        return response
+
+    def serve(self, request, full_path, content_type):
+        try:
+            info = os.stat(full_path)
+        except OSError:
+            raise Http404('No existe el archivo')
+        if not stat.S_ISREG(info.st_mode):
+            raise Http404('No existe el archivo')
+        size = info.st_size
+        etag = quote_etag(f'{info.st_mtime_ns:x}-{size:x}')
+        last_modified = http_date(info.st_mtime)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(info.st_mtime))
+        if response is None:
+            response = self.file_response(
+                request, full_path, size, content_type,
+                validators=(etag, last_modified))
+        response['ETag'] = etag
+        response['Last-Modified'] = last_modified
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    def file_response(self, request, full_path, size, content_type,
+                      validators):
+        requested = request.META.get('HTTP_RANGE')
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if requested and if_range and if_range not in validators:
+            # El archivo ha cambiado desde que el cliente pidió el
+            # primer tramo: se envía entero
+            requested = None
+        try:
+            byte_range = parse_range(requested, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range is None:
+            response = FileResponse(
+                open(full_path, 'rb'), content_type=content_type)
+            response.block_size = BLOCK_SIZE
+            return response
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            read_range(full_path, start, length), status=206,
+            content_type=content_type)
+        response['Content-Length'] = length
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        return response
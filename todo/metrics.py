@@ -0,0 +1,215 @@
+"""Métricas de rendimiento de las peticiones en formato Prometheus.
+
+MetricsMiddleware mide, por nombre de URL (tasks:task_list, ...), el
+tiempo total de la petición, el número y el tiempo de las consultas SQL
+y el tiempo de renderizado de la plantilla. Los histogramas se guardan
+en memoria en cada proceso y se publican en /metrics/.
+
+El coste por petición es un execute_wrapper por conexión y unas sumas
+bajo un lock, así que se puede dejar activado en producción. Con
+METRICS_SLOW_REQUEST_SECONDS se registran en el log las peticiones
+lentas junto con sus consultas SQL.
+"""
+import hmac
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores de las cubetas de los histogramas
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                    10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+# Consultas que se guardan como máximo para el log de peticiones lentas
+SLOW_LOG_MAX_QUERIES = 50
+# Etiqueta de las peticiones que no corresponden a ninguna URL
+UNRESOLVED = '<unresolved>'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return (str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Histograma con una serie por valor de la etiqueta view."""
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # view -> [recuentos por cubeta (+Inf al final), suma]
+        self._series = {}
+
+    def observe(self, view, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(view)
+            if series is None:
+                series = self._series[view] = [
+                    [0] * (len(self.buckets) + 1), 0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, view):
+        with self._lock:
+            series = self._series.get(view)
+            return sum(series[0]) if series else 0
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def collect(self):
+        """Líneas del histograma en el formato de texto de Prometheus."""
+        with self._lock:
+            series = {view: (list(counts), total)
+                      for view, (counts, total) in self._series.items()}
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        for view, (counts, total) in sorted(series.items()):
+            label = f'view="{_escape(view)}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label}}} {_format_number(total)}')
+            lines.append(f'{self.name}_count{{{label}}} {cumulative}')
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    'todo_request_duration_seconds',
+    'Tiempo total de la petición.', DURATION_BUCKETS)
+SQL_QUERIES = Histogram(
+    'todo_request_sql_queries',
+    'Consultas SQL por petición.', QUERY_BUCKETS)
+SQL_DURATION = Histogram(
+    'todo_request_sql_duration_seconds',
+    'Tiempo de las consultas SQL de la petición.', DURATION_BUCKETS)
+TEMPLATE_DURATION = Histogram(
+    'todo_request_template_duration_seconds',
+    'Tiempo de renderizado de la plantilla (incluye las consultas que '
+    'hace la plantilla).', DURATION_BUCKETS)
+HISTOGRAMS = (REQUEST_DURATION, SQL_QUERIES, SQL_DURATION, TEMPLATE_DURATION)
+
+
+def reset():
+    for histogram in HISTOGRAMS:
+        histogram.reset()
+
+
+def render_metrics():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.collect())
+    return '\n'.join(lines) + '\n'
+
+
+class RequestTimer:
+    """Tiempos de una petición; se usa como execute_wrapper."""
+    def __init__(self, capture_sql=False):
+        self.capture_sql = capture_sql
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.captured = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.sql_time += elapsed
+            if (self.capture_sql
+                    and len(self.captured) < SLOW_LOG_MAX_QUERIES):
+                self.captured.append((elapsed, sql))
+
+
+class MetricsMiddleware:
+    """Registra los tiempos de cada petición en los histogramas."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        slow_threshold = settings.METRICS_SLOW_REQUEST_SECONDS
+        timer = RequestTimer(capture_sql=slow_threshold is not None)
+        request._metrics_timer = timer
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else UNRESOLVED
+        REQUEST_DURATION.observe(view, elapsed)
+        SQL_QUERIES.observe(view, timer.queries)
+        SQL_DURATION.observe(view, timer.sql_time)
+        TEMPLATE_DURATION.observe(view, timer.template_time)
+        if slow_threshold is not None and elapsed >= slow_threshold:
+            self.log_slow_request(request, view, elapsed, timer)
+        return response
+
+    def process_template_response(self, request, response):
+        # TemplateResponse se renderiza justo después de los
+        # process_template_response() de los middleware
+        timer = request._metrics_timer
+        started = time.perf_counter()
+
+        def rendered(response):
+            timer.template_time += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def log_slow_request(self, request, view, elapsed, timer):
+        queries = '\n'.join(
+            f'  {duration * 1000:8.1f} ms  {sql}'
+            for duration, sql in timer.captured)
+        logger.warning(
+            'Petición lenta %s %s (%s): %.3f s, %d consultas SQL (%.3f s), '
+            'plantilla %.3f s\n%s',
+            request.method, request.path, view, elapsed, timer.queries,
+            timer.sql_time, timer.template_time, queries,
+        )
+
+
+def has_metrics_token(request):
+    """True si la petición trae Authorization: Bearer METRICS_TOKEN."""
+    token = settings.METRICS_TOKEN
+    if not token:
+        return False
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    scheme, _, value = header.partition(' ')
+    return (scheme.lower() == 'bearer'
+            and hmac.compare_digest(value.strip().encode(), token.encode()))
+
+
+def metrics_view(request):
+    """Métricas de este proceso para Prometheus.
+
+    Solo para el personal y para quien envía METRICS_TOKEN. No se fía de
+    la dirección de origen: detrás de un proxy todas son la del proxy.
+    """
+    if not (request.user.is_staff or has_metrics_token(request)):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
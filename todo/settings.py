@@ -16,21 +16,33 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'static_pages',
-    'tasks',
+    'tasks.apps.TasksConfig',
 ]
 
 MIDDLEWARE = [
+    # El primero, para medir también el resto de middleware
+    'todo.metrics.MetricsMiddleware',
+    # Antes que el resto, para comprimir la respuesta definitiva
+    'tasks.compression.CompressionMiddleware',
+    'tasks.routers.ReadReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Lee el usuario de la caché (ver tasks.auth)
+    'tasks.auth.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'todo.urls'
 
+# Perfil de arranque de producción (todo.startup): plantillas con el
+# cargador con caché y, en todo/wsgi.py, plantillas, URL y páginas
+# prerenderizadas precargadas antes de la primera petición. Con
+# DEBUG = True las plantillas modificadas no se vuelven a leer
+TASKS_STARTUP_PROFILE = False
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -42,18 +54,63 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'tasks.context_processors.task_stats',
             ],
         },
     },
 ]
 
+if TASKS_STARTUP_PROFILE:
+    # Cada plantilla se compila una vez por proceso
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'todo.wsgi.application'
 
+# Perfil de producción de SQLite (tasks.sqlite): WAL, synchronous=NORMAL,
+# busy_timeout, caché y mmap en cada conexión nueva, y conexiones que se
+# reutilizan entre peticiones. TASKS_SQLITE_PRAGMAS cambia valores sueltos
+TASKS_SQLITE_PROFILE = False
+TASKS_SQLITE_PRAGMAS = {}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        # Segundos que se reutiliza una conexión; 0 abre una por petición
+        'CONN_MAX_AGE': 60 if TASKS_SQLITE_PROFILE else 0,
+    },
+    # Réplica de solo lectura para probar tasks.routers en local; se
+    # activa añadiéndola a TASKS_READ_DATABASES y se llena con
+    # manage.py sync_replicas
+    # 'replica': {
+    #     'ENGINE': 'django.db.backends.sqlite3',
+    #     'NAME': os.path.join(BASE_DIR, 'db-replica.sqlite3'),
+    #     'TEST': {'MIRROR': 'default'},
+    # },
+}
+
+# Alias de DATABASES de los que TaskList, TaskDetail y la exportación
+# leen las tareas (ver tasks.routers); vacío lee de 'default'
+TASKS_READ_DATABASES = []
+# Segundos que un navegador lee de 'default' después de escribir
+TASKS_READ_STICKY_SECONDS = 10
+DATABASE_ROUTERS = ['tasks.routers.ReadReplicaRouter']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Para compartir la caché entre los procesos de un mismo servidor:
+    # 'default': {
+    #     'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    #     'LOCATION': os.path.join(BASE_DIR, 'cache'),
+    # },
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -87,3 +144,98 @@ STATIC_URL = '/static/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
+# Los archivos de MEDIA_URL los envía el servidor web después de que
+# todo.media compruebe el acceso: None (los envía Django),
+# 'x-accel-redirect' (nginx) o 'x-sendfile' (Apache, lighttpd)
+MEDIA_SENDFILE = None
+# Location internal de nginx que apunta a MEDIA_ROOT
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+# Los nombres cambian con el contenido (tasks.storage): el navegador
+# puede guardar los archivos un año
+MEDIA_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+# Número de tareas por página en la lista de tareas
+TASKS_PAGE_SIZE = 20
+
+# Filas que se leen de la base de datos en cada bloque de la exportación
+TASKS_EXPORT_CHUNK_SIZE = 500
+
+# Calculan el hash de las imágenes subidas mientras se reciben (ver
+# tasks.storage); las mayores de FILE_UPLOAD_MAX_MEMORY_SIZE se escriben
+# por partes en un archivo temporal
+FILE_UPLOAD_HANDLERS = [
+    'tasks.storage.HashingMemoryFileUploadHandler',
+    'tasks.storage.HashingTemporaryFileUploadHandler',
+]
+# Las imágenes guardadas o subidas de nuevo hace menos de estos segundos
+# no se borran al quedar sin tareas (las borra después collect_images)
+TASKS_IMAGE_DELETE_GRACE = 5 * 60
+
+# Anchos (px), formatos y calidad de las versiones reducidas de Task.image
+TASKS_THUMBNAIL_WIDTHS = (200, 800, 1600)
+TASKS_THUMBNAIL_FORMATS = ('webp', 'jpeg')
+TASKS_THUMBNAIL_QUALITY = 80
+# Alias de CACHES y tiempo de vida (s) de los índices de las versiones
+TASKS_THUMBNAIL_CACHE = 'default'
+TASKS_THUMBNAIL_CACHE_TIMEOUT = 60 * 60
+
+# Cola de trabajos en segundo plano (tasks.jobs, manage.py run_worker):
+# intentos por trabajo, espera base entre reintentos (s) y tiempo tras el
+# que un trabajo bloqueado se considera abandonado (s)
+TASKS_JOBS_MAX_ATTEMPTS = 5
+TASKS_JOBS_RETRY_DELAY = 10
+TASKS_JOBS_TIMEOUT = 600
+
+# Páginas sin datos por petición que manage.py prerender_pages guarda
+# ya renderizadas y comprimidas en PRERENDER_ROOT (ver tasks.prerender)
+PRERENDER_ROOT = os.path.join(BASE_DIR, 'prerendered')
+PRERENDER_PAGES = ['static_pages:about', 'tasks:task_added']
+
+# Alias de CACHES y tiempo de vida (s) de las respuestas comprimidas por
+# CompressionMiddleware, guardadas por ETag
+COMPRESSION_CACHE = 'default'
+COMPRESSION_CACHE_TIMEOUT = 60 * 60
+
+# Cambios por respuesta como máximo en tasks:changes, segundos que una
+# petición con ?wait= puede esperar a que haya cambios y cada cuántos
+# segundos consulta el contador mientras espera
+TASKS_CHANGES_BATCH = 500
+TASKS_CHANGES_MAX_WAIT = 30
+TASKS_CHANGES_POLL_INTERVAL = 1
+# Días que se guardan las lápidas de las tareas borradas
+# (manage.py prune_tombstones)
+TASKS_TOMBSTONE_DAYS = 30
+
+# Días de tareas creadas por día que devuelve tasks:stats por defecto y
+# como máximo
+TASKS_STATS_DAYS = 30
+TASKS_STATS_MAX_DAYS = 366
+
+# Tareas por petición como máximo en la creación en bloque (batch/);
+# el cuerpo JSON de un lote grande supera el límite de 2,5 MB de Django
+TASKS_BATCH_MAX_SIZE = 5000
+DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
+
+# Alias de CACHES y tiempo de vida (s) de la caché de TaskDetail
+TASKS_DETAIL_CACHE = 'default'
+TASKS_DETAIL_CACHE_TIMEOUT = 60 * 60
+
+# Número máximo de resultados de la búsqueda de tareas y coincidencias
+# más recientes entre las que se eligen los más relevantes
+TASKS_SEARCH_LIMIT = 50
+TASKS_SEARCH_CANDIDATES = 1000
+
+# Las peticiones más lentas que este número de segundos se registran
+# en el log todo.metrics junto con sus consultas SQL; None lo desactiva
+METRICS_SLOW_REQUEST_SECONDS = None
+# Token compartido con Prometheus para leer /metrics/ sin iniciar sesión
+# (cabecera Authorization: Bearer <token>); con None solo el personal
+METRICS_TOKEN = None
+
+# Sesiones firmadas en la cookie y usuario en caché (tasks.auth): las
+# páginas con LoginRequiredMixin no consultan django_session ni auth_user
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+# Alias de CACHES y tiempo de vida (s) del usuario en caché
+TASKS_AUTH_CACHE = 'default'
+TASKS_AUTH_CACHE_TIMEOUT = 5 * 60
@@ -0,0 +1,126 @@
+"""Precarga de un proceso web antes de su primera petición.
+
+Con TASKS_STARTUP_PROFILE, todo/wsgi.py llama a warm_up() al crear la
+aplicación: compila las plantillas del proyecto en el cargador con
+caché y las de los widgets de los formularios, construye las tablas de
+URL (resolver y reverse()) y lee las páginas prerenderizadas. Así las
+primeras peticiones de un proceso recién arrancado cuestan lo mismo que
+las siguientes.
+
+No abre conexiones a la base de datos: se puede usar con
+gunicorn --preload, que carga la aplicación antes de crear los procesos.
+manage.py startup_profile mide el arranque con y sin el perfil.
+"""
+import logging
+import os
+import time
+
+import django.forms
+from django.conf import settings
+from django.forms.renderers import get_default_renderer
+from django.template import TemplateSyntaxError, engines
+from django.urls import NoReverseMatch, URLResolver, get_resolver, reverse
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt')
+
+
+def template_dirs(engine):
+    """Directorios de plantillas de los cargadores del motor."""
+    dirs = []
+    for loader in engine.template_loaders:
+        # El cargador con caché envuelve a los demás
+        for inner in getattr(loader, 'loaders', [loader]):
+            dirs.extend(str(directory) for directory in inner.get_dirs())
+    return dirs
+
+
+def project_templates(engine):
+    """Nombres de las plantillas del proyecto (no las de Django)."""
+    names = set()
+    for directory in template_dirs(engine):
+        if not os.path.abspath(directory).startswith(settings.BASE_DIR):
+            continue
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(TEMPLATE_EXTENSIONS):
+                    path = os.path.relpath(os.path.join(root, filename),
+                                           directory)
+                    names.add(path.replace(os.sep, '/'))
+    return sorted(names)
+
+
+def warm_templates(engine=None):
+    """Compila las plantillas del proyecto; devuelve cuántas."""
+    engine = engine or engines['django'].engine
+    count = 0
+    for name in project_templates(engine):
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError:
+            logger.exception('No se puede compilar la plantilla %s', name)
+            continue
+        count += 1
+    return count
+
+
+def warm_form_widgets():
+    """Compila las plantillas de los widgets de los formularios.
+
+    El renderizador de formularios tiene su propio motor de plantillas,
+    con caché cuando DEBUG = False. Devuelve cuántas plantillas compila.
+    """
+    renderer = get_default_renderer()
+    directory = os.path.join(os.path.dirname(django.forms.__file__),
+                             'templates', 'django', 'forms', 'widgets')
+    names = sorted(filename for filename in os.listdir(directory)
+                   if filename.endswith('.html'))
+    for filename in names:
+        renderer.get_template(f'django/forms/widgets/{filename}')
+    return len(names)
+
+
+def warm_urls(resolver=None, namespace=''):
+    """Compila los patrones de URL y llena las tablas de reverse().
+
+    Devuelve el número de URL con nombre.
+    """
+    resolver = resolver or get_resolver()
+    count = 0
+    for pattern in resolver.url_patterns:
+        # La expresión regular se compila al usarla por primera vez
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            prefix = (f'{namespace}{pattern.namespace}:'
+                      if pattern.namespace else namespace)
+            count += warm_urls(pattern, prefix)
+        elif pattern.name:
+            try:
+                reverse(namespace + pattern.name)
+            except NoReverseMatch:
+                # La URL necesita argumentos; las tablas ya están llenas
+                pass
+            count += 1
+    return count
+
+
+def warm_prerendered():
+    """Lee las páginas prerenderizadas; devuelve cuántas hay."""
+    from tasks import prerender
+    return sum(prerender.get_page(name) is not None
+               for name in settings.PRERENDER_PAGES)
+
+
+def warm_up():
+    """Precarga plantillas, URL y páginas prerenderizadas."""
+    started = time.perf_counter()
+    report = {
+        'templates': warm_templates(),
+        'form_widgets': warm_form_widgets(),
+        'urls': warm_urls(),
+        'prerendered': warm_prerendered(),
+    }
+    report['seconds'] = round(time.perf_counter() - started, 4)
+    logger.info('Proceso precargado: %s', report)
+    return report
@@ -3,15 +3,20 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from .media import MediaView
+from .metrics import metrics_view
+
 urlpatterns = [
     path('', include('tasks.urls', namespace='tasks')),
     path('page/', include('static_pages.urls', namespace='static_pages')),
     path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
+    # También en producción: comprueba el acceso (ver todo.media)
+    path(settings.MEDIA_URL.lstrip('/') + '<path:path>', MediaView.as_view(),
+         name='media'),
 ]
 
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL,
-                          document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL,
                           document_root=settings.STATIC_ROOT)
@@ -9,8 +9,17 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo.settings')
 
 application = get_wsgi_application()
+
+# Con el perfil de arranque de producción, el proceso llega a la primera
+# petición con las plantillas y las URL ya preparadas (ver todo.startup)
+warm_up_report = None
+if settings.TASKS_STARTUP_PROFILE:
+    from todo import startup
+
+    warm_up_report = startup.warm_up()